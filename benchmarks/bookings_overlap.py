@@ -0,0 +1,209 @@
+"""
+Бенчмарк пересечения периодов бронирований.
+
+Сравнивает старый фильтр по двум колонкам date_from/date_to с фильтром
+stay && daterange(...) по GiST-индексу ix_bookings_room_id_stay.
+
+Запуск: python benchmarks/bookings_overlap.py --bookings 1000000
+Таблицы создаются в отдельной схеме bench и удаляются после замера.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import NullPool, select, func, text
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.config import settings
+from src.database import Base
+from src.models import *  # noqa F403
+from src.repos.utils import stay_overlaps
+
+SCHEMA = "bench"
+FIRST_DAY = date(2023, 1, 1)
+DAYS = 3 * 365
+
+
+def overlap_two_columns(date_from: date, date_to: date):
+    return (BookingsOrm.date_from < date_to) & (BookingsOrm.date_to > date_from)
+
+
+def room_query(overlap):
+    return lambda room_id, hotel_id, d1, d2: (
+        select(func.count())
+        .select_from(BookingsOrm)
+        .filter(BookingsOrm.room_id == room_id, overlap(d1, d2))
+    )
+
+
+def hotel_query(overlap):
+    return lambda room_id, hotel_id, d1, d2: (
+        select(func.count())
+        .select_from(BookingsOrm)
+        .join(RoomsOrm, RoomsOrm.id == BookingsOrm.room_id)
+        .filter(RoomsOrm.hotel_id == hotel_id, overlap(d1, d2))
+    )
+
+
+# Как было: две колонки и никаких индексов по bookings
+BEFORE = {
+    "номер: date_from/date_to без индекса": room_query(overlap_two_columns),
+    "отель: date_from/date_to без индекса": hotel_query(overlap_two_columns),
+}
+# Как стало: stay && daterange по GiST-индексу (room_id, stay)
+AFTER = {
+    "номер: stay && daterange, GiST": room_query(stay_overlaps),
+    "отель: stay && daterange, GiST": hotel_query(stay_overlaps),
+}
+
+
+async def seed(conn, hotels: int, rooms: int, bookings: int):
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.execute(
+        text(
+            f"insert into {SCHEMA}.hotels (title, location) "
+            "select 'Отель ' || i, 'Город ' || (i % 100) from generate_series(1, :hotels) i"
+        ),
+        {"hotels": hotels},
+    )
+    await conn.execute(
+        text(
+            f"insert into {SCHEMA}.rooms (hotel_id, title, price, quantity) "
+            "select 1 + i % :hotels, 'Номер ' || i, 1000 + i % 5000, 5 "
+            "from generate_series(1, :rooms) i"
+        ),
+        {"hotels": hotels, "rooms": rooms},
+    )
+    await conn.execute(
+        text(
+            f"insert into {SCHEMA}.users (email, hashed_password) "
+            "values ('bench@bench.ru', 'bench')"
+        )
+    )
+    await conn.execute(
+        text(
+            f"insert into {SCHEMA}.bookings (user_id, room_id, date_from, date_to, price) "
+            "select 1, room_id, day, day + nights, 1000 from ("
+            "    select 1 + floor(random() * :rooms)::int as room_id,"
+            "           cast(:first_day as date) + floor(random() * :days)::int as day,"
+            "           1 + floor(random() * 14)::int as nights"
+            "    from generate_series(1, :bookings)"
+            ") as b"
+        ),
+        {"rooms": rooms, "bookings": bookings, "first_day": FIRST_DAY, "days": DAYS},
+    )
+    await conn.execute(text(f"ANALYZE {SCHEMA}.rooms, {SCHEMA}.bookings"))
+
+
+def literal_sql(query) -> str:
+    """SQL запроса с подставленными параметрами и схемой bench, для EXPLAIN"""
+    return str(
+        query.compile(
+            dialect=asyncpg.dialect(),
+            schema_translate_map={None: SCHEMA},
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def plan_summary(plan: dict) -> str:
+    """Узлы плана, читающие таблицы: тип узла и индекс"""
+    nodes = []
+
+    def walk(node):
+        if "Relation Name" in node or "Index Name" in node:
+            relation = f" {node['Relation Name']}" if "Relation Name" in node else ""
+            index = f" ({node['Index Name']})" if "Index Name" in node else ""
+            nodes.append(f"{node['Node Type']}{relation}{index}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return "; ".join(nodes)
+
+
+async def measure(conn, queries: dict, params: list[tuple]):
+    for name, build in queries.items():
+        explain = await conn.execute(
+            text(f"EXPLAIN (ANALYZE, FORMAT JSON) {literal_sql(build(*params[0]))}")
+        )
+        plan = explain.scalar()
+        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+
+        timings = []
+        for query_params in params:
+            query = build(*query_params)
+            started = time.perf_counter()
+            await conn.execute(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"{name}")
+        print(f"  план: {plan_summary(plan)}")
+        print(
+            f"  среднее {statistics.mean(timings):.2f} мс, "
+            f"p50 {timings[len(timings) // 2]:.2f} мс, "
+            f"p95 {timings[int(len(timings) * 0.95)]:.2f} мс"
+        )
+
+
+async def run(args):
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool).execution_options(
+        schema_translate_map={None: SCHEMA}
+    )
+    try:
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await seed(conn, args.hotels, args.rooms, args.bookings)
+        print(f"Заполнено {args.bookings} бронирований за {time.perf_counter() - started:.1f} с\n")
+
+        rnd = random.Random(42)
+        params = []
+        for _ in range(args.iterations):
+            date_from = FIRST_DAY + timedelta(days=rnd.randrange(DAYS))
+            params.append(
+                (
+                    rnd.randint(1, args.rooms),
+                    rnd.randint(1, args.hotels),
+                    date_from,
+                    date_from + timedelta(days=rnd.randint(1, 14)),
+                )
+            )
+
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP INDEX {SCHEMA}.ix_bookings_room_id_stay"))
+            await conn.execute(text(f"ANALYZE {SCHEMA}.bookings"))
+            await measure(conn, BEFORE, params)
+            await conn.execute(
+                text(
+                    f"CREATE INDEX ix_bookings_room_id_stay ON {SCHEMA}.bookings "
+                    "USING gist (room_id, stay)"
+                )
+            )
+            await conn.execute(text(f"ANALYZE {SCHEMA}.bookings"))
+            await measure(conn, AFTER, params)
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--rooms", type=int, default=20_000)
+    parser.add_argument("--hotels", type=int, default=2_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="не удалять схему bench")
+    asyncio.run(run(parser.parse_args()))
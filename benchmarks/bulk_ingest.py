@@ -0,0 +1,102 @@
+"""
+Бенчмарк массовой загрузки через репозитории: add_bulk бинарным COPY
+против add_bulk(returning=True) пачками INSERT ... RETURNING id.
+
+Загружаются отели, номера и связи номеров с удобствами (вместе с пересчетом
+rooms.facilities_mask), результат — строк в секунду.
+
+Запуск: python benchmarks/bulk_ingest.py --rows 200000
+Таблицы создаются в отдельной схеме bench и удаляются после замера.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import NullPool, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.bookings_overlap import SCHEMA
+from src.config import settings
+from src.database import Base
+from src.models import *  # noqa F403
+from src.repos.facilities import FacilitiesRepository, RoomsFacilitiesRepository
+from src.repos.hotels import HotelRepository
+from src.repos.rooms import RoomsRepository
+from src.schemas.facilities import FacilitiesAdd, RoomFacilityAdd
+from src.schemas.hotels import HotelAdd
+from src.schemas.rooms import RoomsAdd
+
+CITIES = ["Сочи", "Казань", "Анапа", "Суздаль", "Калининград", "Мурманск", "Иркутск"]
+FACILITIES = 10
+
+
+async def timed(name: str, rows: int, coro):
+    started = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - started
+    print(f"  {name}: {rows} строк за {elapsed:.2f} с, {rows / elapsed:,.0f} строк/с")
+    return result
+
+
+async def load(session, rows: int, returning: bool):
+    hotels = [
+        HotelAdd(title=f"Отель {i}", location=f"{CITIES[i % len(CITIES)]}, ул. Морская, {i}")
+        for i in range(rows)
+    ]
+    await timed("отели", rows, HotelRepository(session).add_bulk(hotels, returning))
+    # id отелей и удобств в свежей схеме идут подряд с единицы
+    rooms = [
+        RoomsAdd(hotel_id=1 + i, title=f"Номер {i}", price=1000 + i % 5000, quantity=5)
+        for i in range(rows)
+    ]
+    await timed("номера", rows, RoomsRepository(session).add_bulk(rooms, returning))
+    await FacilitiesRepository(session).add_bulk(
+        [FacilitiesAdd(title=f"Удобство {i}") for i in range(FACILITIES)]
+    )
+    links = [
+        RoomFacilityAdd(rooms_id=1 + i // 2, facilities_id=1 + (i * 7) % FACILITIES)
+        for i in range(rows * 2)
+    ]
+    await timed(
+        "удобства номеров", rows * 2, RoomsFacilitiesRepository(session).add_bulk(links, returning)
+    )
+
+
+async def reset(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def run(args):
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool).execution_options(
+        schema_translate_map={None: SCHEMA}
+    )
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        for name, returning in (
+            ("INSERT ... RETURNING id пачками", True),
+            ("COPY", False),
+        ):
+            await reset(engine)
+            print(name)
+            async with session_factory() as session:
+                await load(session, args.rows, returning)
+                await session.commit()
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--keep", action="store_true", help="не удалять схему bench")
+    asyncio.run(run(parser.parse_args()))
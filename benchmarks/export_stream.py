@@ -0,0 +1,79 @@
+"""
+Пиковая память выгрузки: весь результат через get_filtered против серверного курсора
+BaseRepository.stream_filtered с разными размерами пачки.
+
+Выгрузка в обоих случаях кодируется в NDJSON и отбрасывается, память меряется tracemalloc.
+С курсором пик должен зависеть от размера пачки и не расти с числом строк.
+
+Запуск: python benchmarks/export_stream.py --rows 500000
+Таблицы создаются в отдельной схеме bench и удаляются после замера.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy import NullPool, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.bookings_overlap import SCHEMA
+from benchmarks.mapping import seed
+from src.config import settings
+from src.repos.rooms import RoomsRepository
+from src.utils.exports import encode_batches
+
+
+async def whole(repo):
+    """Как GET без курсора: весь список схем в памяти"""
+    yield await repo.get_filtered()
+
+
+async def measure(session_factory, name: str, batches, rows: int):
+    async with session_factory() as session:
+        repo = RoomsRepository(session)
+        tracemalloc.start()
+        started = time.perf_counter()
+        exported = 0
+        async for chunk in encode_batches(batches(repo), repo.mapper.schema, "ndjson"):
+            exported += chunk.count(b"\n")
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    assert exported == rows
+    print(f"{name:<32} пик {peak / 2**20:8.1f} МиБ, {rows / elapsed:,.0f} строк/с")
+
+
+async def run(args):
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool).execution_options(
+        schema_translate_map={None: SCHEMA}
+    )
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await seed(conn, args.rows)
+        print(f"Заполнено {args.rows} номеров\n")
+        await measure(session_factory, "get_filtered", whole, args.rows)
+        for batch_size in args.batch_sizes:
+            await measure(
+                session_factory,
+                f"stream_filtered({batch_size})",
+                lambda repo: repo.stream_filtered(batch_size=batch_size),
+                args.rows,
+            )
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--keep", action="store_true", help="не удалять схему bench")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,165 @@
+"""
+Бенчмарк поиска отелей по названию и адресу.
+
+Сравнивает старые условия (title ILIKE, location ~ '(?i)\\y...\\y' без индексов)
+с условиями из src/repos/search.py по триграммным GIN-индексам и ранжированием
+по word_similarity.
+
+Запуск: python benchmarks/hotels_search.py --hotels 500000
+Таблицы создаются в отдельной схеме bench и удаляются после замера.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import NullPool, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.bookings_overlap import SCHEMA, measure
+from src.config import settings
+from src.database import Base
+from src.models import *  # noqa F403
+from src.repos.search import hotel_search_filters, hotel_search_rank
+
+ADJECTIVES = [
+    "Grand", "Royal", "Blue", "Golden", "Silver", "Green", "Old", "New", "Sunny", "Quiet",
+    "Central", "Park", "River", "Lake", "Mountain", "Sea", "Forest", "City", "White", "Red",
+]
+NOUNS = [
+    "Hotel", "Resort", "Inn", "Palace", "House", "Lodge", "Suites", "Residence", "Villa", "Plaza",
+]
+CITIES = [
+    "Moscow", "Sochi", "Kazan", "Altay", "Sirius", "Anapa", "Kaliningrad", "Murmansk",
+    "Irkutsk", "Vladivostok", "Tver", "Suzdal", "Yalta", "Derbent", "Pskov", "Samara",
+]
+STREETS = ["Lenina", "Mira", "Sadovaya", "Morskaya", "Lesnaya", "Tsentralnaya", "Shkolnaya"]
+
+
+def old_query(title: str | None, location: str | None):
+    query = select(HotelsOrm)
+    if title:
+        query = query.filter(HotelsOrm.title.ilike(f"%{title}%"))
+    if location:
+        query = query.filter(HotelsOrm.location.op("~")(rf"(?i)\y{location}\y"))
+    return query.order_by(HotelsOrm.id).limit(10)
+
+
+def new_query(title: str | None, location: str | None):
+    rank = hotel_search_rank(title, location)
+    return (
+        select(HotelsOrm, rank.label("rank"))
+        .filter(*hotel_search_filters(title, location))
+        .order_by(rank.desc(), HotelsOrm.id)
+        .limit(10)
+    )
+
+
+def by_title(build):
+    return lambda title, street, city: build(title, None)
+
+
+def by_location(build):
+    return lambda title, street, city: build(None, street)
+
+
+def by_title_and_location(build):
+    return lambda title, street, city: build(title, city)
+
+
+# Как было: ILIKE и регулярное выражение без индексов
+BEFORE = {
+    "название: ILIKE без индекса": by_title(old_query),
+    "адрес: ~ (?i)\\y без индекса": by_location(old_query),
+    "название и город: без индекса": by_title_and_location(old_query),
+}
+# Как стало: триграммные GIN-индексы и сортировка по релевантности
+AFTER = {
+    "название: ILIKE, GIN trgm": by_title(new_query),
+    "адрес: ~* \\y, GIN trgm": by_location(new_query),
+    "название и город: GIN trgm": by_title_and_location(new_query),
+}
+
+
+def pick(words: str) -> str:
+    """SQL случайного элемента массива-параметра :words"""
+    return f"(cast(:{words} as text[]))[1 + floor(random() * cardinality(cast(:{words} as text[])))::int]"
+
+
+async def seed(conn, hotels: int):
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.execute(
+        text(
+            f"insert into {SCHEMA}.hotels (title, location) "
+            f"select {pick('adjectives')} || ' ' || {pick('nouns')} || ' ' || i, "
+            f"    {pick('cities')} || ', ul. ' || {pick('streets')} || ' '"
+            "    || (1 + floor(random() * 200)::int) "
+            "from generate_series(1, :hotels) i"
+        ),
+        {
+            "hotels": hotels,
+            "adjectives": ADJECTIVES,
+            "nouns": NOUNS,
+            "cities": CITIES,
+            "streets": STREETS,
+        },
+    )
+    await conn.execute(text(f"ANALYZE {SCHEMA}.hotels"))
+
+
+async def run(args):
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool).execution_options(
+        schema_translate_map={None: SCHEMA}
+    )
+    try:
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await seed(conn, args.hotels)
+        print(f"Заполнено {args.hotels} отелей за {time.perf_counter() - started:.1f} с\n")
+
+        rnd = random.Random(42)
+        params = [
+            (
+                f"{rnd.choice(ADJECTIVES)} {rnd.choice(NOUNS)} {rnd.randint(1, args.hotels)}",
+                f"{rnd.choice(STREETS)} {rnd.randint(1, 200)}",
+                rnd.choice(CITIES),
+            )
+            for _ in range(args.iterations)
+        ]
+
+        async with engine.connect() as conn:
+            for index in ("ix_hotels_title_trgm", "ix_hotels_location_trgm"):
+                await conn.execute(text(f"DROP INDEX {SCHEMA}.{index}"))
+            await conn.execute(text(f"ANALYZE {SCHEMA}.hotels"))
+            await measure(conn, BEFORE, params)
+            for index, column in (
+                ("ix_hotels_title_trgm", "title"),
+                ("ix_hotels_location_trgm", "location"),
+            ):
+                await conn.execute(
+                    text(
+                        f"CREATE INDEX {index} ON {SCHEMA}.hotels "
+                        f"USING gin ({column} gin_trgm_ops)"
+                    )
+                )
+            await conn.execute(text(f"ANALYZE {SCHEMA}.hotels"))
+            await measure(conn, AFTER, params)
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hotels", type=int, default=500_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="не удалять схему bench")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+Задержка других эндпоинтов во время шквала входов.
+
+Приложение запускается в процессе (httpx поверх ASGI, один event loop, как у воркера uvicorn).
+Сначала меряется p50/p99 двух эндпоинтов без нагрузки: GET /metrics/db (только event loop)
+и GET /hotels/{hotel_id}/rooms/{room_id} (без кэша, запрос к базе через пул и допуск),
+затем то же во время --logins параллельных бесконечных POST /auth/login.
+Перед замерами пул прогревается: открытие соединений не попадает в хвост.
+С --inline хеширование выполняется прямо в event loop, как до переноса в пул потоков, —
+для сравнения.
+
+Запуск: python benchmarks/login_storm.py --seconds 5 --logins 32 [--inline]
+Пользователь для входа создается в базе из .env и удаляется после замера.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from contextlib import AsyncExitStack
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.config import settings
+from src.database import async_session, engine
+from src.init import password_hasher
+from src.main import app
+from src.utils.db_manager import DBManager
+
+EMAIL = "storm@bench.com"
+PASSWORD = "storm-password"
+
+
+async def probe(ac: AsyncClient, path: str, seconds: float, interval: float = 0.02) -> list[float]:
+    """
+    Задержки GET path по расписанию раз в interval. Задержка считается от момента,
+    когда запрос должен был уйти: иначе время, пока event loop занят и запрос даже
+    не отправлен, в замер не попадает
+    """
+    latencies = []
+    started = time.perf_counter()
+    scheduled = started
+    while scheduled < started + seconds:
+        await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+        response = await ac.get(path)
+        assert response.status_code == 200
+        latencies.append(time.perf_counter() - scheduled)
+        scheduled += interval
+    return latencies
+
+
+async def login_loop(ac: AsyncClient, deadline: float, statuses: dict[int, int]):
+    while time.perf_counter() < deadline:
+        response = await ac.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 503:
+            await asyncio.sleep(0.05)
+
+
+async def warm_pool():
+    """Открывает DB_POOL_SIZE соединений разом, после возврата они остаются в пуле"""
+    async with AsyncExitStack() as stack:
+        for _ in range(settings.DB_POOL_SIZE):
+            conn = await stack.enter_async_context(engine.connect())
+            await conn.execute(text("select 1"))
+
+
+async def probe_all(ac: AsyncClient, paths: list[str], seconds: float, phase: str):
+    results = await asyncio.gather(*(probe(ac, path, seconds) for path in paths))
+    for path, latencies in zip(paths, results):
+        report(f"{phase}: {path}", latencies)
+
+
+def report(name: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<48} p50 {p50:8.1f} мс  p99 {p99:8.1f} мс  ({len(latencies)} запросов)")
+
+
+async def run(args):
+    if args.inline:
+        async def inline(fn, *fn_args):
+            return fn(*fn_args)
+
+        password_hasher.run = inline
+    async with AsyncClient(app=app, base_url="http://bench") as ac:
+        await ac.post("/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        try:
+            async with DBManager(session_factory=async_session) as db:
+                room = (await db.rooms.get_all())[0]
+            paths = ["/metrics/db", f"/hotels/{room.hotel_id}/rooms/{room.id}"]
+            await warm_pool()
+            await probe_all(ac, paths, args.seconds, "без нагрузки")
+
+            statuses: dict[int, int] = {}
+            deadline = time.perf_counter() + args.seconds
+            storm = [
+                asyncio.create_task(login_loop(ac, deadline, statuses))
+                for _ in range(args.logins)
+            ]
+            await probe_all(ac, paths, args.seconds, f"{args.logins} входов")
+            await asyncio.gather(*storm)
+            print(f"ответы /auth/login: {dict(sorted(statuses.items()))}")
+        finally:
+            async with DBManager(session_factory=async_session) as db:
+                await db.users.delete(email=EMAIL)
+                await db.commit()
+            await engine.dispose()
+            password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--inline", action="store_true", help="хешировать в event loop")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""
+Микробенчмарк преобразования строк БД в pydantic-схемы.
+
+Сравнивает прежний путь BaseRepository.get_filtered (ORM-объекты через identity map
+и model_validate(from_attributes=True) на каждую строку) с быстрым путем
+(кортежи колонок и один TypeAdapter(list[Schema]) на весь список).
+
+Запуск: python benchmarks/mapping.py --rows 100000
+Таблицы создаются в отдельной схеме bench и удаляются после замера.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import NullPool, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.bookings_overlap import SCHEMA
+from src.config import settings
+from src.database import Base
+from src.models import *  # noqa F403
+from src.repos.mapper.mappers import RoomsDataMapper
+
+mapper = RoomsDataMapper
+
+
+async def orm_path(session):
+    """Как было: ORM-объекты и model_validate на каждую строку"""
+    result = await session.execute(select(mapper.db_model))
+    rows = result.scalars().all()
+    started = time.perf_counter()
+    schemas = [mapper.map_to_schema(model) for model in rows]
+    return schemas, time.perf_counter() - started
+
+
+async def columns_path(session):
+    """Как стало: кортежи колонок и TypeAdapter на весь список"""
+    result = await session.execute(select(*mapper.schema_columns()))
+    rows = result.all()
+    started = time.perf_counter()
+    schemas = mapper.map_rows_to_schemas(rows)
+    return schemas, time.perf_counter() - started
+
+
+async def seed(conn, rows: int):
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.execute(
+        text(f"insert into {SCHEMA}.hotels (title, location) values ('Отель', 'Сочи')")
+    )
+    await conn.execute(
+        text(
+            f"insert into {SCHEMA}.rooms (hotel_id, title, description, price, quantity) "
+            "select 1, 'Номер ' || i, 'Описание номера ' || i, 1000 + i % 5000, 5 "
+            "from generate_series(1, :rows) i"
+        ),
+        {"rows": rows},
+    )
+
+
+async def measure(session_factory, name: str, path, rows: int, iterations: int):
+    totals, mappings = [], []
+    for _ in range(iterations):
+        # Новая сессия на каждый замер, как у запроса к API: пустая identity map
+        async with session_factory() as session:
+            started = time.perf_counter()
+            schemas, mapping = await path(session)
+            totals.append(time.perf_counter() - started)
+            mappings.append(mapping)
+        assert len(schemas) == rows
+    total, mapping = statistics.median(totals), statistics.median(mappings)
+    print(f"{name}")
+    print(f"  запрос и преобразование: {total * 1000:.0f} мс, {rows / total:,.0f} строк/с")
+    print(f"  только преобразование:  {mapping * 1000:.0f} мс, {rows / mapping:,.0f} строк/с")
+
+
+async def run(args):
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool).execution_options(
+        schema_translate_map={None: SCHEMA}
+    )
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await seed(conn, args.rows)
+        print(f"Заполнено {args.rows} номеров, схема {mapper.schema.__name__}\n")
+        await measure(session_factory, "ORM + model_validate", orm_path, args.rows, args.iterations)
+        await measure(
+            session_factory, "колонки + TypeAdapter(list[Schema])", columns_path, args.rows, args.iterations
+        )
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="не удалять схему bench")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""
+Накладные расходы на сборку, компиляцию и подготовку запросов горячих эндпоинтов.
+
+Сравнивает прежнюю сборку запроса на каждый вызов (select().filter_by(), фильтры
+свободных номеров со значениями) с запросами из кэша репозиториев (bindparam по форме фильтра)
+при выключенном и включенном кэше подготовленных запросов asyncpg.
+
+Запуск: python benchmarks/statement_cache.py --rows 50
+Таблицы создаются в отдельной схеме bench и удаляются после замера.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.bookings_overlap import SCHEMA
+from benchmarks.mapping import seed
+from src.config import settings
+from src.models import HotelsOrm, RoomsOrm
+from src.repos.hotels import HotelRepository
+from src.repos.mapper.mappers import HotelDataMapper, RoomDataWithRelationshipMapper
+from src.repos.rooms import RoomsRepository
+from src.repos.utils import rooms_ids_for_booking, rooms_with_facilities_filter
+
+DATE_FROM, DATE_TO = date(2030, 1, 1), date(2030, 1, 8)
+
+
+async def hotel_rebuilt(session):
+    """GET /hotels/{id} как было: запрос собирается на каждый вызов"""
+    result = await session.execute(select(HotelsOrm).filter_by(id=1))
+    return HotelDataMapper.map_to_schema(result.scalars().one())
+
+
+async def hotel_cached(session):
+    return await HotelRepository(session).one_or_none(id=1)
+
+
+async def rooms_rebuilt(session):
+    """GET /hotels/{id}/rooms как было"""
+    query = (
+        select(RoomsOrm)
+        .options(selectinload(RoomsOrm.facilities))
+        .filter(RoomsOrm.id.in_(rooms_ids_for_booking(DATE_FROM, DATE_TO, 1)))
+        .filter(rooms_with_facilities_filter([]))
+    )
+    result = await session.execute(query)
+    return [
+        RoomDataWithRelationshipMapper.map_to_schema(model)
+        for model in result.unique().scalars().all()
+    ]
+
+
+async def rooms_cached(session):
+    return await RoomsRepository(session).get_filtered_by_time(1, DATE_FROM, DATE_TO)
+
+
+async def measure(session_factory, path, iterations: int) -> float:
+    # Одна сессия и одно соединение, как у запросов к API через пул
+    async with session_factory() as session:
+        for _ in range(50):
+            await path(session)
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await path(session)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+async def run(args):
+    engines = {
+        cache_size: create_async_engine(
+            settings.DB_URL,
+            connect_args={"prepared_statement_cache_size": cache_size},
+        ).execution_options(schema_translate_map={None: SCHEMA})
+        for cache_size in (0, settings.DB_PREPARED_STATEMENT_CACHE_SIZE)
+    }
+    engine = engines[0]
+    try:
+        async with engine.begin() as conn:
+            await seed(conn, args.rows)
+        print(f"Заполнено {args.rows} номеров, медиана на вызов\n")
+        print(f"{'':<34}{'без кэша asyncpg':>18}{'с кэшем asyncpg':>18}")
+        for name, path in (
+            ("отель: сборка на каждый вызов", hotel_rebuilt),
+            ("отель: кэш репозитория", hotel_cached),
+            ("номера: сборка на каждый вызов", rooms_rebuilt),
+            ("номера: кэш репозитория", rooms_cached),
+        ):
+            timings = [
+                await measure(async_sessionmaker(engine_), path, args.iterations)
+                for engine_ in engines.values()
+            ]
+            print(f"{name:<34}" + "".join(f"{t * 1e6:>15.0f} мкс" for t in timings))
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        for engine_ in engines.values():
+            await engine_.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="не удалять схему bench")
+    asyncio.run(run(parser.parse_args()))
@@ -3,10 +3,14 @@ from sqlalchemy.exc import NoResultFound
 from fastapi import APIRouter, HTTPException, Response
 
 from src.api.dependencies import UserIdDepends
-from src.exception import ObjectAlreadyExistsException
+from src.exception import (
+    AuthOverloadedHTTPException,
+    ExecutorOverloadedException,
+    ObjectAlreadyExistsException,
+)
 from src.schemas.users import UserRequestAdd, UserAdd, User
 from src.services.auth import AuthService
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, DBScopeDep
 
 router = APIRouter(prefix="/auth", tags=["Аутентификация и Авторизация"])
 
@@ -16,23 +20,27 @@ async def register_user(
     # Принимаем pydantic-схему
     data: UserRequestAdd,
     # Используем зависимость см. src/api/dependencies.py
-    db: DBDep,
+    db_scope: DBScopeDep,
 ):
     try:
-        # Хеширование пароля
-        hashed_password = AuthService().hash_password(data.password)
-        # Создание пользователя на основе pydantic-схемы
-        new_user = UserAdd(email=data.email, hashed_password=hashed_password)
-        # Добавление в БД
-        await db.users.add(new_user)
-    except ObjectAlreadyExistsException:
-        raise HTTPException(status_code=409, detail="Пользователь уже существует")
-    try:
-        # Сохранение в БД
-        await db.commit()
-        return {"status": "OK"}
-    except Exception:
-        raise HTTPException(status_code=500)
+        # Хеширование пароля в пуле потоков, до обращения к базе
+        hashed_password = await AuthService().hash_password(data.password)
+    except ExecutorOverloadedException:
+        raise AuthOverloadedHTTPException
+    async with db_scope() as db:
+        try:
+            # Создание пользователя на основе pydantic-схемы
+            new_user = UserAdd(email=data.email, hashed_password=hashed_password)
+            # Добавление в БД
+            await db.users.add(new_user)
+        except ObjectAlreadyExistsException:
+            raise HTTPException(status_code=409, detail="Пользователь уже существует")
+        try:
+            # Сохранение в БД
+            await db.commit()
+            return {"status": "OK"}
+        except Exception:
+            raise HTTPException(status_code=500)
 
 
 @router.post("/login", summary="Аутентификация")
@@ -42,17 +50,29 @@ async def login_user(
     # Инструмент настройки ответа
     response: Response,
     # Используем зависимость см. src/api/dependencies.py
-    db: DBDep,
+    db_scope: DBScopeDep,
 ):
-
+    # Соединение нужно только на поиск пользователя, пароль проверяется уже без него
+    async with db_scope() as db:
+        try:
+            # Получаем пользователя из БД по email
+            user = await db.users.get_user_with_hashed_password(email=data.email)
+        except NoResultFound:
+            raise HTTPException(status_code=404, detail="User не найден")
+    # Проверяем пароль пользователя в пуле потоков
     try:
-        # Получаем пользователя из БД по email
-        user = await db.users.get_user_with_hashed_password(email=data.email)
-    except NoResultFound:
-        raise HTTPException(status_code=404, detail="User не найден")
-    # Проверяем пароль пользователя
-    if not AuthService().verify_password(data.password, user.hashed_password):
+        password_ok, new_hash = await AuthService().verify_and_update(
+            data.password, user.hashed_password
+        )
+    except ExecutorOverloadedException:
+        raise AuthOverloadedHTTPException
+    if not password_ok:
         raise HTTPException(status_code=401, detail="Неверный пароль")
+    # Схема или стоимость хеша устарела: сохраняем пересчитанный, миграция не нужна
+    if new_hash is not None:
+        async with db_scope() as db:
+            await db.users.set_hashed_password(user.id, new_hash)
+            await db.commit()
 
     # Генерируем JWT-токен
     access_token = AuthService().create_access_token(data={"user_id": user.id})
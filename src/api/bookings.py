@@ -1,26 +1,60 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from fastapi import HTTPException
 
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, DBFactoryDep, DBReadDep
 from src.exception import AllRoomsByBookedException
+from src.exception import InvalidCursorException, InvalidCursorHTTPException
 from src.exception import ObjectNotFoundException
-from src.schemas.bookings import BookingAddRequest, BookingAdd
+from src.exception import check_date_correct
+from src.schemas.bookings import Booking, BookingAddRequest
 from src.api.dependencies import UserIdDepends
-from src.schemas.rooms import Room
 from fastapi_cache.decorator import cache
+from src.utils.exports import ExportFormat, export_response
 
 router = APIRouter(prefix="/bookings", tags=["Бронирования"])
 
 
 @router.get("", summary="Получение бронирования")
 @cache(expire=50)
-async def get_all_booking(db: DBDep):
+async def get_all_booking(db: DBReadDep):
     return await db.bookings.get_all()
 
 
+@router.get(
+    "/export",
+    summary="Выгрузка бронирований в NDJSON или CSV",
+    description="Ответ отдается потоком, база читается серверным курсором",
+)
+async def export_bookings(
+    db_factory: DBFactoryDep,
+    format: ExportFormat = Query("ndjson", description="Формат выгрузки"),
+):
+    return export_response(
+        db_factory, lambda db: db.bookings.stream_filtered(), Booking, format, "bookings"
+    )
+
+
+@router.get(
+    "/changes",
+    summary="Лента изменений бронирований",
+    description="Бронирования, созданные, измененные или удаленные после курсора since. "
+    "next_cursor передается в since следующего запроса",
+)
+async def get_booking_changes(
+    db: DBDep,
+    since: str | None = Query(None, description="next_cursor предыдущего ответа"),
+    limit: int = Query(100, ge=1, le=1000, description="Сколько изменений читать за раз"),
+):
+    try:
+        page = await db.bookings_changes.get_changes(since, limit)
+    except InvalidCursorException:
+        raise InvalidCursorHTTPException
+    return {"status": "OK", "data": page.changes, "next_cursor": page.next_cursor}
+
+
 @router.get("/me", summary="Мои бронирования")
 @cache(expire=100)
-async def get_all_booking_me(user_id: UserIdDepends, db: DBDep):
+async def get_all_booking_me(user_id: UserIdDepends, db: DBReadDep):
     return await db.bookings.get_filtered(user_id=user_id)
 
 
@@ -30,17 +64,11 @@ async def add_booking(
     user_id: UserIdDepends,
     booking_data: BookingAddRequest,
 ):
+    check_date_correct(booking_data.date_from, booking_data.date_to)
     try:
-        room: Room = await db.rooms.get_one(id=booking_data.room_id)
+        booking = await db.bookings.book_room(user_id, booking_data)
     except ObjectNotFoundException:
         raise HTTPException(status_code=404, detail=f"Номер не найден ")
-    hotel = await db.hotels.get_one(id=room.hotel_id)
-    room_price = room.price
-    _booking_data = BookingAdd(
-        user_id=user_id, price=room_price, **booking_data.model_dump()
-    )
-    try:
-        booking = await db.bookings.add_bookings(_booking_data, hotel_id=hotel.id)
     except AllRoomsByBookedException as ex:
         raise HTTPException(status_code=409, detail=ex.detail)
     await db.commit()
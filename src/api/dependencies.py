@@ -1,9 +1,11 @@
-from typing import Annotated
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Annotated, Callable
 
 from fastapi import Depends, Query, Request, HTTPException
 from pydantic import BaseModel
 
-from src.database import async_session
+from src.database import async_session, db_admission, replicas
+from src.exception import DatabaseOverloadedException, DatabaseOverloadedHTTPException
 from src.services.auth import AuthService
 from src.utils.db_manager import DBManager
 
@@ -15,6 +17,8 @@ class PaginationParams(BaseModel):
     page_number: Annotated[int, Query(default=1, ge=1)]
     # Тип int со значением по умолчанию None и ограничениями больше или равно 1 и меньше 30
     page_size: Annotated[int | None, Query(None, ge=1, lt=30)]
+    # Курсор из next_cursor предыдущей страницы, при его наличии page_number игнорируется
+    cursor: Annotated[str | None, Query(None, description="Курсор следующей страницы")]
 
 
 # Создаем зависимость
@@ -47,14 +51,82 @@ def get_current_user_id(token: str = Depends(get_token)) -> int:
 UserIdDepends = Annotated[int, Depends(get_current_user_id)]
 
 
-async def get_db():
+def get_db_sticky_key(request: Request) -> str | None:
+    """Ключ read-your-writes: токен пользователя (у анонимных запросов ключа нет)"""
+    return request.cookies.get("access_token")
+
+
+@asynccontextmanager
+async def db_admission_slot():
+    """Место в допуске к базе (src/utils/admission.py), при перегрузке — 503 до запуска обработчика"""
+    try:
+        await db_admission.acquire()
+    except DatabaseOverloadedException:
+        raise DatabaseOverloadedHTTPException
+    try:
+        yield
+    finally:
+        db_admission.release()
+
+
+@asynccontextmanager
+async def open_db(sticky_key: str | None = None, read_only: bool = False):
+    """Место в допуске к базе и DBManager: общее для get_db, get_db_read и get_db_scope"""
+    async with db_admission_slot(), DBManager(
+        session_factory=async_session,
+        replicas=replicas,
+        sticky_key=sticky_key,
+        read_only=read_only,
+    ) as db:
+        yield db
+
+
+async def get_db(sticky_key: str | None = Depends(get_db_sticky_key)):
     """Функция-зависимость для получения сессии базы данных"""
     # Контекстный менеджер для работы с DBManager, который управляет соединением с базой данных.
     # 'async with' гарантирует, что сессия будет закрыта после выхода из блока кода.
-    async with DBManager(session_factory=async_session) as db:
+    async with open_db(sticky_key) as db:
         # 'yield' передает объект сессии 'db' в FastAPI для дальнейшего использования в обработчиках.
         yield db
 
 
 # Создаем зависимость
 DBDep = Annotated[DBManager, Depends(get_db)]
+
+
+async def get_db_read(sticky_key: str | None = Depends(get_db_sticky_key)):
+    """
+    Функция-зависимость для обработчиков, которые только читают:
+    сессия на реплике, если они настроены (DB_REPLICA_URLS) и доступны
+    """
+    async with open_db(sticky_key, read_only=True) as db:
+        yield db
+
+
+# Создаем зависимость
+DBReadDep = Annotated[DBManager, Depends(get_db_read)]
+
+
+def get_db_factory() -> Callable[[], DBManager]:
+    """
+    Функция-зависимость для ответов, которые читают из базы после выхода из обработчика
+    (StreamingResponse): сессию открывает и закрывает сам ответ
+    """
+    return lambda: DBManager(session_factory=async_session)
+
+
+# Создаем зависимость
+DBFactoryDep = Annotated[Callable[[], DBManager], Depends(get_db_factory)]
+
+
+def get_db_scope() -> Callable[..., AbstractAsyncContextManager[DBManager]]:
+    """
+    Функция-зависимость для обработчиков, которым база нужна не все время:
+    async with db_scope(read_only=True) as db: ... — место в допуске и соединение заняты
+    только внутри блока, а не пока идет долгая работа без базы (проверка пароля)
+    """
+    return open_db
+
+
+# Создаем зависимость
+DBScopeDep = Annotated[Callable[..., AbstractAsyncContextManager[DBManager]], Depends(get_db_scope)]
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Body
 from fastapi_cache.decorator import cache
 
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, DBReadDep
 
 from src.schemas.facilities import FacilitiesAdd
 from src.services.facilities import FacilityService
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/facilities", tags=["Удобства"])
 
 @router.get("", summary="Получение списка услуг")
 @cache(expire=10)
-async def get_facilities(db: DBDep):
+async def get_facilities(db: DBReadDep):
     print("Иду в базу данных")
     return await db.facilities.get_all()
 
@@ -2,21 +2,54 @@ from datetime import date
 from typing import List
 
 from fastapi_cache.decorator import cache
-from fastapi import Query, APIRouter, Body
+from fastapi import Query, APIRouter, Body, Request
 
-from src.api.dependencies import PaginationDep, DBDep
+from src.api.dependencies import PaginationDep, DBDep, DBFactoryDep, DBReadDep
 
 from src.exception import HotelNotFoundHTTPException
 from src.exception import ObjectNotFoundException
-from src.schemas.hotels import HotelPATCH, HotelAdd
+from src.exception import InvalidCursorException, InvalidCursorHTTPException
+from src.exception import ImportFormatException, ImportFormatHTTPException
+from src.schemas.hotels import Hotel, HotelPATCH, HotelAdd, HotelsSort
+from src.init import cities_index
 from src.services.hotels import HotelsService
+from src.utils.exports import ExportFormat, export_response
+from src.utils.imports import import_format
 
 router = APIRouter(prefix="/hotels", tags=["Отели"])
 
 
+@router.get("/locations/suggest", summary="Подсказки городов")
+async def suggest_locations(
+    q: str = Query(min_length=1, description="Начало названия города", example="Соч"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    return {"status": "OK", "data": cities_index.suggest(q, limit)}
+
+
+@router.get(
+    "/export",
+    summary="Выгрузка отелей в NDJSON или CSV",
+    description="Ответ отдается потоком, база читается серверным курсором",
+)
+async def export_hotels(
+    db_factory: DBFactoryDep,
+    format: ExportFormat = Query("ndjson", description="Формат выгрузки"),
+    city_id: int | None = Query(None, description="ID города из /hotels/locations/suggest"),
+):
+    filter_by = {} if city_id is None else {"city_id": city_id}
+    return export_response(
+        db_factory,
+        lambda db: HotelsService(db).stream_hotels(**filter_by),
+        Hotel,
+        format,
+        "hotels",
+    )
+
+
 @router.get("/{hotel_id}", summary="Получение отеля")
 @cache(expire=100)
-async def get_hotel(hotel_id: int, db: DBDep):
+async def get_hotel(hotel_id: int, db: DBReadDep):
     try:
         return await HotelsService(db).get_hotel(hotel_id)
     except ObjectNotFoundException:
@@ -27,16 +60,37 @@ async def get_hotel(hotel_id: int, db: DBDep):
 @cache(expire=100)
 async def get_hotels(
     pagination: PaginationDep,
-    db: DBDep,
+    db: DBReadDep,
     title: str | None = Query(None, description="Название или описание отеля"),
     location: str | None = Query(None, description="Адрес отеля", example=["Сочи"]),
     date_from: date | None = Query(None, description="Дата заезда", example="2024-11-01"),
     date_to: date | None = Query(None, description="Дата выезда", example="2024-11-07"),
+    city_id: int | None = Query(None, description="ID города из /hotels/locations/suggest"),
+    facilities_ids: list[int] = Query(
+        [], description="В отеле есть свободный номер со всеми этими удобствами"
+    ),
+    with_stats: bool = Query(
+        False, description="Минимальная цена и остаток свободных номеров по каждому отелю"
+    ),
+    sort: HotelsSort | None = Query(
+        None, description="price — сначала дешевые, -price — сначала дорогие"
+    ),
 ):
-    data = await HotelsService(db).get_filtered_by_time(
-        pagination, date_from, date_to, location, title
-    )
-    return {"status": "OK", "data": data}
+    try:
+        page = await HotelsService(db).get_filtered_by_time(
+            pagination,
+            date_from,
+            date_to,
+            location,
+            title,
+            city_id,
+            facilities_ids,
+            with_stats,
+            sort,
+        )
+    except InvalidCursorException:
+        raise InvalidCursorHTTPException
+    return {"status": "OK", "data": page.hotels, "next_cursor": page.next_cursor}
 
 
 @router.post("", summary="Создание отеля")
@@ -82,6 +136,35 @@ async def create_hotels(
     return {"status": "OK", "data": result}
 
 
+@router.post(
+    "/import",
+    summary="Загрузка отелей из NDJSON или CSV",
+    description="Тело читается потоком, ошибки возвращаются по номерам строк",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {"type": "string"},
+                    "example": '{"title": "Отель Сочи", "location": "Сочи, ул. Морская, 1"}\n',
+                },
+                "text/csv": {
+                    "schema": {"type": "string"},
+                    "example": 'title,location\nОтель Сочи,"Сочи, ул. Морская, 1"\n',
+                },
+            },
+        }
+    },
+)
+async def import_hotels(request: Request, db: DBDep):
+    try:
+        format = import_format(request.headers.get("content-type"))
+        result = await HotelsService(db).import_hotels(request.stream(), format)
+    except ImportFormatException as e:
+        raise ImportFormatHTTPException(": ".join(e.args))
+    return {"status": "OK", "data": result}
+
+
 @router.put("", summary="Редактирование отеля")
 async def edit_hotels(hotel_id: int, hotel_data: HotelAdd, db: DBDep):
     await HotelsService(db).edit_hotel(hotel_id, hotel_data)
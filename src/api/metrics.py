@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Response
+
+from src.database import db_admission, engine, replicas
+from src.init import loop_monitor, password_hasher, redis_manager
+from src.schemas.metrics import DBStats, ExecutorStats, LoopMonitorStats
+from src.utils.metrics import render_metrics, update_celery_queue_length
+
+router = APIRouter(prefix="/metrics", tags=["Метрики"])
+
+
+@router.get("", summary="Метрики Prometheus", include_in_schema=False)
+async def get_metrics():
+    await update_celery_queue_length(redis_manager.redis)
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@router.get("/db", summary="Состояние пулов соединений и допуска к базе")
+async def get_db_stats() -> DBStats:
+    return DBStats(
+        pool=engine.pool.stats(),
+        replicas={replica.name: replica.engine.pool.stats() for replica in replicas.replicas},
+        admission=db_admission.stats(),
+    )
+
+
+@router.get("/loop", summary="Задержка event loop и последние блокировки со стеком")
+async def get_loop_stats() -> LoopMonitorStats:
+    return loop_monitor.stats()
+
+
+@router.get("/executors", summary="Пулы потоков для тяжелых вызовов: очередь и отказы")
+async def get_executors_stats() -> dict[str, ExecutorStats]:
+    return {password_hasher.name: password_hasher.stats()}
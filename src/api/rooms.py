@@ -1,16 +1,18 @@
 from datetime import date
 
 
-from fastapi import APIRouter, Body, Query
+from fastapi import APIRouter, Body, Query, Request
 from fastapi import HTTPException
 
-from src.exception import HotelNotFoundHTTPException
+from src.exception import HotelNotFoundException, HotelNotFoundHTTPException
+from src.exception import ImportFormatException, ImportFormatHTTPException
 from src.exception import ObjectAlreadyExistsException
 from src.exception import ObjectNotFoundException
 from src.exception import RoomsNotFoundHTTPException
-from src.schemas.rooms import RoomsAddRequest, RoomsPatchRequest
-from src.api.dependencies import DBDep
+from src.schemas.rooms import RoomsAddRequest, RoomsPatchRequest, AvailabilityRequest
+from src.api.dependencies import DBDep, DBReadDep
 from src.services.rooms import RoomService
+from src.utils.imports import import_format
 
 router = APIRouter(prefix="/hotels", tags=["Комнаты"])
 
@@ -18,15 +20,73 @@ router = APIRouter(prefix="/hotels", tags=["Комнаты"])
 @router.get("/{hotel_id}/rooms", summary="Получение всех номеров")
 async def get_rooms(
     hotel_id: int,
-    db: DBDep,
+    db: DBReadDep,
     date_from: date = Query(example="2024-11-01"),
     date_to: date = Query(example="2024-11-07"),
+    facilities_ids: list[int] = Query([], description="Номер должен иметь все эти удобства"),
+):
+    return await RoomService(db).get_filtered_by_time(
+        hotel_id, date_from, date_to, facilities_ids
+    )
+
+
+@router.post("/rooms/availability", summary="Свободные номера для нескольких отелей и дат")
+async def get_rooms_availability(
+    db: DBReadDep,
+    requests: list[AvailabilityRequest] = Body(
+        max_length=100,
+        openapi_examples={
+            "1": {
+                "summary": "Два отеля, два периода",
+                "value": [
+                    {"hotel_id": 1, "date_from": "2024-11-01", "date_to": "2024-11-07"},
+                    {"hotel_id": 1, "date_from": "2024-12-01", "date_to": "2024-12-07"},
+                    {"hotel_id": 2, "date_from": "2024-11-01", "date_to": "2024-11-07"},
+                ],
+            },
+        },
+    ),
 ):
-    return RoomService(db).get_filtered_by_time(hotel_id, date_from, date_to)
+    data = await RoomService(db).get_available_batch(requests)
+    return {"status": "OK", "data": data}
+
+
+@router.post(
+    "/{hotel_id}/rooms/import",
+    summary="Загрузка номеров отеля из NDJSON или CSV",
+    description="Тело читается потоком, ошибки возвращаются по номерам строк. "
+    "В CSV id удобств в колонке facilities_ids разделяются ';'",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {"type": "string"},
+                    "example": '{"title": "Люкс", "price": 5000, "quantity": 2, '
+                    '"facilities_ids": [1, 2]}\n',
+                },
+                "text/csv": {
+                    "schema": {"type": "string"},
+                    "example": "title,description,price,quantity,facilities_ids\n"
+                    "Люкс,С видом на море,5000,2,1;2\n",
+                },
+            },
+        }
+    },
+)
+async def import_rooms(hotel_id: int, request: Request, db: DBDep):
+    try:
+        format = import_format(request.headers.get("content-type"))
+        result = await RoomService(db).import_rooms(hotel_id, request.stream(), format)
+    except ImportFormatException as e:
+        raise ImportFormatHTTPException(": ".join(e.args))
+    except HotelNotFoundException:
+        raise HotelNotFoundHTTPException
+    return {"status": "OK", "data": result}
 
 
 @router.get("/{hotel_id}/rooms/{room_id}", summary="Получение комнаты")
-async def get_room(hotel_id: int, room_id: int, db: DBDep):
+async def get_room(hotel_id: int, room_id: int, db: DBReadDep):
     try:
         return await RoomService(db).get_room(hotel_id, room_id)
     except ObjectNotFoundException:
@@ -32,6 +32,86 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Хеширование паролей (см. src/utils/password_hashing.py): схема новых хешей и стоимость —
+    # rounds bcrypt или time_cost argon2id. None — подбор при старте под время проверки
+    # AUTH_HASH_TARGET_MS: хеши другой схемы или дешевле подобранной пересчитываются при входе,
+    # более дорогие не трогаются. Настройка стоимости на всех узлах, в том числе понижение, —
+    # только через AUTH_HASH_ROUNDS: с ней пересчитываются хеши любой другой стоимости
+    AUTH_HASH_SCHEME: Literal["argon2", "bcrypt"] = "bcrypt"
+    AUTH_HASH_ROUNDS: int | None = None
+    AUTH_HASH_TARGET_MS: float = 100
+    AUTH_ARGON2_MEMORY_KIB: int = 19456
+
+    # Пул потоков для хеширования и проверки паролей (None — по числу ядер) и сколько вызовов
+    # ждут в его очереди, остальные регистрации и входы получают 503
+    AUTH_HASH_WORKERS: int | None = None
+    AUTH_HASH_MAX_QUEUE: int = 32
+    # Насколько понизить приоритет потоков хеширования (nice, Linux): при нехватке ядер
+    # процессор сначала получает event loop с остальными запросами
+    AUTH_HASH_NICE: int = 10
+
+    # Пул соединений движка (основная база и каждая реплика)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Через сколько секунд пересоздавать соединение (-1 — не пересоздавать)
+    DB_POOL_RECYCLE: int = 1800
+    # Сколько секунд ждать соединение из пула
+    DB_POOL_TIMEOUT: float = 30
+
+    # Допуск запросов к базе в get_db: сколько одновременно (None — DB_POOL_SIZE + DB_MAX_OVERFLOW),
+    # сколько ждут в очереди и как долго, остальные получают 503
+    DB_ADMISSION_CONCURRENCY: int | None = None
+    DB_ADMISSION_MAX_WAITING: int = 100
+    DB_ADMISSION_TIMEOUT: float = 5
+
+    # Реплики для чтения (postgresql+asyncpg://...), пусто — все запросы на основную базу
+    DB_REPLICA_URLS: list[str] = []
+    # Сколько секунд после коммита читать с основной базы (read-your-writes при отставании реплик)
+    DB_REPLICA_STICKY_SECONDS: float = 5
+    # Через сколько секунд снова пробовать недоступную реплику
+    DB_REPLICA_RETRY_SECONDS: float = 10
+    # Таймаут подключения к реплике, после него чтение уходит на другую реплику или основную базу
+    DB_REPLICA_CONNECT_TIMEOUT: float = 2
+
+    # Сколько скомпилированных запросов держит алхимия (ключ — структура запроса)
+    DB_QUERY_CACHE_SIZE: int = 1000
+    # Сколько подготовленных запросов asyncpg держит на каждом соединении (0 — не кэшировать)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+
+    # Сколько строк за раз читать серверным курсором при выгрузках (BaseRepository.stream_filtered)
+    DB_STREAM_BATCH_SIZE: int = 1000
+
+    # Метрики Prometheus на GET /metrics (см. src/utils/metrics.py)
+    METRICS_ENABLED: bool = True
+
+    # Монитор задержки event loop (см. src/utils/loop_monitor.py): пульс раз в LOOP_MONITOR_INTERVAL_MS,
+    # блокировки дольше LOOP_MONITOR_THRESHOLD_MS пишутся в лог со стеком и в GET /metrics/loop
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 50
+    LOOP_MONITOR_THRESHOLD_MS: float = 100
+    LOOP_MONITOR_HISTORY: int = 50
+
+    # Учет запросов к БД на каждый HTTP-запрос (см. src/utils/sql_stats.py): заголовок Server-Timing
+    # и предупреждения в лог, если запросов больше SQL_STATS_MAX_QUERIES, время в БД больше
+    # SQL_STATS_MAX_DB_MS или один запрос повторился SQL_STATS_N_PLUS_ONE_THRESHOLD раз
+    SQL_STATS_ENABLED: bool = True
+    SQL_STATS_MAX_QUERIES: int = 20
+    SQL_STATS_MAX_DB_MS: float = 200
+    SQL_STATS_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Индекс свободных номеров в памяти процесса (см. src/utils/availability.py)
+    AVAILABILITY_INDEX_ENABLED: bool = False
+
+    # Как часто дочитывать новые города в индекс подсказок (см. src/utils/cities.py)
+    CITIES_INDEX_REFRESH_SECONDS: int = 60
+    # Как часто перечитывать все города: подбирает города, закоммиченные не в порядке id
+    CITIES_INDEX_FULL_RELOAD_SECONDS: int = 600
+
+    # На сколько месяцев вперед создавать секции bookings
+    BOOKINGS_PARTITIONS_AHEAD_MONTHS: int = 12
+    # Через сколько месяцев отключать старые секции в архив (None — не отключать)
+    BOOKINGS_ARCHIVE_AFTER_MONTHS: int | None = None
+
 
 settings = Settings()
 
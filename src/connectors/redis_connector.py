@@ -4,6 +4,7 @@ import logging
 from redis.exceptions import RedisError
 
 from src.config import settings
+from src.utils.metrics import redis_command_timer
 
 
 class RedisManager:
@@ -25,63 +26,79 @@ class RedisManager:
                 return  # Выход из метода после успешного подключения
             except RedisError as e:
                 retries += 1
-                print(
+                logging.warning(
                     f"Ошибка подключения к Redis: {e}. Повторная попытка ({retries}/{self.max_retries})..."
                 )
                 await asyncio.sleep(self.retry_delay)
             except Exception as e:
                 retries += 1
-                print(
+                logging.warning(
                     f"Неожиданная ошибка: {e}. Повторная попытка ({retries}/{self.max_retries})..."
                 )
                 await asyncio.sleep(self.retry_delay)
 
-        print("Не удалось подключиться к Redis после нескольких попыток.")
+        logging.error("Не удалось подключиться к Redis после нескольких попыток.")
 
     async def set(self, key: str, value: str, expire: int = None):
         if self.redis is None:
-            print("Redis клиент не подключён.")
+            logging.warning("Redis клиент не подключён.")
             return
         try:
-            if expire:
-                await self.redis.set(key, value, ex=expire)
-            else:
-                await self.redis.set(key, value)
-            print(f"Установлен ключ: {key} со значением: {value}")
+            with redis_command_timer("set"):
+                if expire:
+                    await self.redis.set(key, value, ex=expire)
+                else:
+                    await self.redis.set(key, value)
+            # Без форматирования значения, если DEBUG выключен
+            logging.debug("Установлен ключ: %s со значением: %s", key, value)
         except RedisError as e:
-            print(f"Ошибка при установке значения для ключа {key}: {e}")
+            logging.error(f"Ошибка при установке значения для ключа {key}: {e}")
         except Exception as e:
-            print(f"Неожиданная ошибка при установке значения для ключа {key}: {e}")
+            logging.error(f"Неожиданная ошибка при установке значения для ключа {key}: {e}")
 
     async def get(self, key: str):
         if self.redis is None:
-            print("Redis клиент не подключён.")
+            logging.warning("Redis клиент не подключён.")
             return None
         try:
-            value = await self.redis.get(key)
-            print(f"Получен ключ: {key}, значение: {value}")
+            with redis_command_timer("get"):
+                value = await self.redis.get(key)
+            logging.debug("Получен ключ: %s, значение: %s", key, value)
             return value
         except RedisError as e:
-            print(f"Ошибка при получении значения для ключа {key}: {e}")
+            logging.error(f"Ошибка при получении значения для ключа {key}: {e}")
         except Exception as e:
-            print(f"Неожиданная ошибка при получении значения для ключа {key}: {e}")
+            logging.error(f"Неожиданная ошибка при получении значения для ключа {key}: {e}")
 
     async def delete(self, key: str):
         if self.redis is None:
-            print("Redis клиент не подключён.")
+            logging.warning("Redis клиент не подключён.")
             return
         try:
-            await self.redis.delete(key)
-            print(f"Удалён ключ: {key}")
+            with redis_command_timer("delete"):
+                await self.redis.delete(key)
+            logging.debug("Удалён ключ: %s", key)
         except RedisError as e:
-            print(f"Ошибка при удалении ключа {key}: {e}")
+            logging.error(f"Ошибка при удалении ключа {key}: {e}")
         except Exception as e:
-            print(f"Неожиданная ошибка при удалении ключа {key}: {e}")
+            logging.error(f"Неожиданная ошибка при удалении ключа {key}: {e}")
+
+    async def publish(self, channel: str, message: str):
+        if self.redis is None:
+            logging.warning("Redis клиент не подключён.")
+            return
+        try:
+            with redis_command_timer("publish"):
+                await self.redis.publish(channel, message)
+        except RedisError as e:
+            logging.error(f"Ошибка при публикации в канал {channel}: {e}")
+        except Exception as e:
+            logging.error(f"Неожиданная ошибка при публикации в канал {channel}: {e}")
 
     async def close(self):
         if self.redis:
             try:
                 await self.redis.close()
-                print("Соединение с Redis закрыто.")
+                logging.debug("Соединение с Redis закрыто.")
             except Exception as e:
-                print(f"Ошибка при закрытии соединения с Redis: {e}")
+                logging.error(f"Ошибка при закрытии соединения с Redis: {e}")
@@ -1,16 +1,67 @@
 from sqlalchemy import NullPool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from src.config import settings
+from src.utils.admission import AdmissionGate
+from src.utils.pool import MeteredQueuePool
+from src.utils.replicas import ReplicaRouter
 from sqlalchemy.orm import DeclarativeBase
 
 
+# Кэш компиляции алхимии и кэш подготовленных запросов asyncpg на соединении:
+# повторный запрос той же формы не компилируется и не готовится сервером заново
+engine_options = {
+    "query_cache_size": settings.DB_QUERY_CACHE_SIZE,
+    "connect_args": {
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    },
+}
+
+# Пул соединений с учетом ожидания (см. src/utils/pool.py), для NullPool не задается
+pool_options = {
+    "poolclass": MeteredQueuePool,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+}
+
 # Создаем асинхронный движок
-engine = create_async_engine(settings.DB_URL)
+engine = create_async_engine(
+    settings.DB_URL, pool_logging_name="primary", **engine_options, **pool_options
+)
 
 # Создаем движок для работы с задачами celery pool_class=NullPool — указывает, что движок не будет использовать пул
 # подключений, а будет открывать новое соединение для каждого запроса.
-engine_null_pool = create_async_engine(settings.DB_URL, poolclass=NullPool)
+engine_null_pool = create_async_engine(settings.DB_URL, poolclass=NullPool, **engine_options)
+
+
+# Реплики для чтения: DBManager(read_only=True) берет сессию на одной из них.
+# Короткий таймаут подключения, чтобы недоступная реплика не задерживала запрос
+replica_engine_options = engine_options | {
+    "connect_args": engine_options["connect_args"]
+    | {"timeout": settings.DB_REPLICA_CONNECT_TIMEOUT}
+}
+replicas = ReplicaRouter(
+    [
+        create_async_engine(
+            url,
+            pool_logging_name=f"replica{number}",
+            **replica_engine_options,
+            **pool_options,
+        )
+        for number, url in enumerate(settings.DB_REPLICA_URLS, start=1)
+    ],
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
 
+# Допуск запросов к базе в get_db: очередь перед пулом с ограниченным ожиданием
+db_admission = AdmissionGate(
+    capacity=settings.DB_ADMISSION_CONCURRENCY
+    or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    max_waiting=settings.DB_ADMISSION_MAX_WAITING,
+    timeout=settings.DB_ADMISSION_TIMEOUT,
+)
 
 # Создаем асинхронный фабрикатор сессий
 async_session = async_sessionmaker(engine, expire_on_commit=False)
@@ -25,6 +25,26 @@ class ObjectAlreadyExistsException(NabronirovalException):
     detail: str = "Объект уже существует"
 
 
+class InvalidCursorException(NabronirovalException):
+    detail: str = "Некорректный курсор пагинации"
+
+
+class ImportFormatException(NabronirovalException):
+    detail: str = "Некорректный файл загрузки"
+
+
+class InvalidDataException(NabronirovalException):
+    detail: str = "Значение не подходит для столбца БД"
+
+
+class DatabaseOverloadedException(NabronirovalException):
+    detail: str = "База данных перегружена, повторите запрос позже"
+
+
+class ExecutorOverloadedException(NabronirovalException):
+    detail: str = "Очередь пула потоков заполнена"
+
+
 class DateErrorException(NabronirovalException):
     detail: str = "Ошибка при установке дат!!"
 
@@ -53,4 +73,37 @@ class RoomsNotFoundHTTPException(NameErrorHTTPException):
 
 
 class HotelNotFoundException(NabronirovalException):
-    detail: str = "Отель не найден"
\ No newline at end of file
+    detail: str = "Отель не найден"
+
+
+class InvalidCursorHTTPException(NameErrorHTTPException):
+    status_code = 400
+    detail = "Некорректный курсор пагинации"
+
+
+class ImportFormatHTTPException(NameErrorHTTPException):
+    status_code = 400
+    detail = "Некорректный файл загрузки"
+
+    def __init__(self, detail: str | None = None):
+        if detail:
+            self.detail = detail
+        super().__init__()
+
+
+class DatabaseOverloadedHTTPException(NameErrorHTTPException):
+    status_code = 503
+    detail = "База данных перегружена, повторите запрос позже"
+
+    def __init__(self):
+        super().__init__()
+        self.headers = {"Retry-After": "1"}
+
+
+class AuthOverloadedHTTPException(NameErrorHTTPException):
+    status_code = 503
+    detail = "Сервис аутентификации перегружен, повторите запрос позже"
+
+    def __init__(self):
+        super().__init__()
+        self.headers = {"Retry-After": "1"}
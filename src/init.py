@@ -1,4 +1,29 @@
+import os
+
 from src.connectors.redis_connector import RedisManager
 from src.config import settings
+from src.utils.availability import AvailabilityIndex
+from src.utils.cities import CitiesIndex
+from src.utils.executor import BoundedExecutor
+from src.utils.loop_monitor import LoopMonitor
 
 redis_manager = RedisManager(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+
+availability_index = AvailabilityIndex(
+    redis_manager, enabled=settings.AVAILABILITY_INDEX_ENABLED
+)
+
+cities_index = CitiesIndex()
+
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_MONITOR_THRESHOLD_MS / 1000,
+    history=settings.LOOP_MONITOR_HISTORY,
+)
+
+password_hasher = BoundedExecutor(
+    "password-hash",
+    workers=settings.AUTH_HASH_WORKERS or os.cpu_count() or 1,
+    max_queue=settings.AUTH_HASH_MAX_QUEUE,
+    nice=settings.AUTH_HASH_NICE,
+)
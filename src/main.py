@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -13,7 +14,18 @@ from pathlib import Path
 
 
 sys.path.append(str(Path(__file__).parent.parent))
-from src.init import redis_manager
+from src.config import settings
+from src.database import async_session
+from src.init import (
+    redis_manager,
+    availability_index,
+    cities_index,
+    loop_monitor,
+    password_hasher,
+)
+from src.services.auth import AuthService
+from src.utils.metrics import PrometheusMiddleware
+from src.utils.sql_stats import SQLStatsMiddleware
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,6 +41,7 @@ from src.api.rooms import router as router_rooms
 from src.api.bookings import router as router_bookings
 from src.api.facilities import router as router_facilities
 from src.api.images import router as router_images
+from src.api.metrics import router as router_metrics
 
 
 # async def send_emails_bookings_today_checkin():
@@ -48,22 +61,55 @@ async def lifespan(app: FastAPI):
     # бесконечный цикл, запускается без await
     # asyncio.create_task(run_send_emails_regularly())
     # Выполняется при старте приложения
+    # Монитор запускается первым, чтобы видеть и блокировки при старте
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    # Стоимость хеширования паролей под бюджет времени проверки на этом железе
+    await AuthService.configure_hashing()
     await redis_manager.connect()
     FastAPICache.init(RedisBackend(redis_manager.redis), prefix="fastapi-cache")
     logging.info(f'fastapi-cache initialized')
+    # Подписка на инвалидацию индекса свободных номеров от других воркеров
+    availability_listener = None
+    if availability_index.enabled:
+        availability_listener = asyncio.create_task(availability_index.listen())
+    # Индекс подсказок городов: загрузка при старте и дочитывание новых
+    cities_refresher = asyncio.create_task(
+        cities_index.run(
+            async_session,
+            settings.CITIES_INDEX_REFRESH_SECONDS,
+            settings.CITIES_INDEX_FULL_RELOAD_SECONDS,
+        )
+    )
     yield
+    cities_refresher.cancel()
     # Выполняется при завершении работы
+    if availability_listener is not None:
+        availability_listener.cancel()
     await redis_manager.close()
+    password_hasher.shutdown()
+    loop_monitor.stop()
 
 
 app = FastAPI(docs_url=None, lifespan=lifespan)
 
+if settings.SQL_STATS_ENABLED:
+    app.add_middleware(
+        SQLStatsMiddleware,
+        max_queries=settings.SQL_STATS_MAX_QUERIES,
+        max_db_ms=settings.SQL_STATS_MAX_DB_MS,
+        n_plus_one_threshold=settings.SQL_STATS_N_PLUS_ONE_THRESHOLD,
+    )
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
 app.include_router(router_auth)
 app.include_router(router_hotels)
 app.include_router(router_rooms)
 app.include_router(router_bookings)
 app.include_router(router_facilities)
 app.include_router(router_images)
+app.include_router(router_metrics)
 
 
 
@@ -0,0 +1,46 @@
+"""Календарь занятости rooms_inventory
+
+Revision ID: 5e1f0c7a9d21
+Revises: b79c592b1f8f
+Create Date: 2026-10-18 09:00:12.418305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e1f0c7a9d21"
+down_revision: Union[str, None] = "b79c592b1f8f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rooms_inventory",
+        sa.Column("room_id", sa.BIGINT(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("booked", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], ["rooms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("room_id", "day"),
+    )
+    # Заполняем календарь по уже существующим бронированиям
+    op.execute(
+        """
+        insert into rooms_inventory (room_id, day, booked)
+        select room_id, day, count(*)
+        from (
+            select room_id, date_from + generate_series(0, date_to - date_from - 1) as day
+            from bookings
+        ) as booked_days
+        group by room_id, day
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rooms_inventory")
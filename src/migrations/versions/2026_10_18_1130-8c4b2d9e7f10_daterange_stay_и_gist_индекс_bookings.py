@@ -0,0 +1,47 @@
+"""daterange stay и GiST индекс bookings
+
+Revision ID: 8c4b2d9e7f10
+Revises: 5e1f0c7a9d21
+Create Date: 2026-10-18 11:30:41.902114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4b2d9e7f10"
+down_revision: Union[str, None] = "5e1f0c7a9d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        "bookings",
+        sa.Column(
+            "stay",
+            postgresql.DATERANGE(),
+            sa.Computed("daterange(date_from, date_to, '[)')", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_bookings_room_id_stay",
+        "bookings",
+        ["room_id", "stay"],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_bookings_room_id_stay", table_name="bookings", postgresql_using="gist"
+    )
+    op.drop_column("bookings", "stay")
@@ -0,0 +1,77 @@
+"""Секционирование bookings по месяцам date_from
+
+Revision ID: a3d7e51c2b84
+Revises: 8c4b2d9e7f10
+Create Date: 2026-10-18 14:00:27.551390
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d7e51c2b84"
+down_revision: Union[str, None] = "8c4b2d9e7f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, user_id, room_id, date_from, date_to, price"
+
+
+def rename_constraints(table: str, suffix: str) -> None:
+    """Освобождает имена ограничений и индекса для новой таблицы bookings"""
+    for constraint in ("pkey", "user_id_fkey", "room_id_fkey"):
+        op.execute(
+            f"ALTER TABLE {table} RENAME CONSTRAINT bookings_{constraint} "
+            f"TO bookings_{suffix}_{constraint}"
+        )
+    op.execute(f"ALTER INDEX ix_bookings_room_id_stay RENAME TO ix_bookings_{suffix}_room_id_stay")
+
+
+def create_bookings(primary_key: str, partition_by: str = "") -> None:
+    op.execute(
+        f"""
+        CREATE TABLE bookings (
+            id BIGINT NOT NULL DEFAULT nextval('bookings_id_seq'),
+            user_id BIGINT NOT NULL,
+            room_id BIGINT NOT NULL,
+            date_from DATE NOT NULL,
+            date_to DATE NOT NULL,
+            price INTEGER NOT NULL,
+            stay DATERANGE GENERATED ALWAYS AS (daterange(date_from, date_to, '[)')) STORED,
+            CONSTRAINT bookings_pkey PRIMARY KEY ({primary_key}),
+            CONSTRAINT bookings_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id),
+            CONSTRAINT bookings_room_id_fkey FOREIGN KEY (room_id) REFERENCES rooms (id)
+        ) {partition_by}
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_bookings_room_id_stay ON bookings USING gist (room_id, stay)"
+    )
+
+
+def upgrade() -> None:
+    # Обычную таблицу нельзя сделать секционированной, поэтому создаем новую и копируем данные.
+    # Все строки попадают в секцию по умолчанию, месячные секции из нее выделит
+    # задача celery manage_bookings_partitions (src/tasks/tasks.py).
+    op.execute("ALTER TABLE bookings RENAME TO bookings_old")
+    rename_constraints("bookings_old", "old")
+    create_bookings("id, date_from", "PARTITION BY RANGE (date_from)")
+    op.execute("CREATE TABLE bookings_default PARTITION OF bookings DEFAULT")
+    op.execute(f"INSERT INTO bookings ({COLUMNS}) SELECT {COLUMNS} FROM bookings_old")
+    op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id")
+    op.execute("DROP TABLE bookings_old")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE bookings RENAME TO bookings_partitioned")
+    rename_constraints("bookings_partitioned", "partitioned")
+    create_bookings("id")
+    op.execute(
+        f"INSERT INTO bookings ({COLUMNS}) SELECT {COLUMNS} FROM bookings_partitioned"
+    )
+    op.execute("ALTER SEQUENCE bookings_id_seq OWNED BY bookings.id")
+    # Секции удаляются вместе с родительской таблицей
+    op.execute("DROP TABLE bookings_partitioned")
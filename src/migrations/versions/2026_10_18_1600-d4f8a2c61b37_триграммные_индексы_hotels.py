@@ -0,0 +1,45 @@
+"""триграммные индексы hotels
+
+Revision ID: d4f8a2c61b37
+Revises: a3d7e51c2b84
+Create Date: 2026-10-18 16:00:12.518230
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f8a2c61b37"
+down_revision: Union[str, None] = "a3d7e51c2b84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_hotels_title_trgm",
+        "hotels",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_hotels_location_trgm",
+        "hotels",
+        ["location"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"location": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_hotels_location_trgm", table_name="hotels", postgresql_using="gin"
+    )
+    op.drop_index("ix_hotels_title_trgm", table_name="hotels", postgresql_using="gin")
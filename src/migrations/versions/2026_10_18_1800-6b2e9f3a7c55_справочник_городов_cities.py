@@ -0,0 +1,64 @@
+"""справочник городов cities
+
+Revision ID: 6b2e9f3a7c55
+Revises: d4f8a2c61b37
+Create Date: 2026-10-18 18:00:37.204511
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils.cities import parse_city
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6b2e9f3a7c55"
+down_revision: Union[str, None] = "d4f8a2c61b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cities",
+        sa.Column("id", sa.BIGINT(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.add_column("hotels", sa.Column("city_id", sa.BIGINT(), nullable=True))
+    op.create_foreign_key(None, "hotels", "cities", ["city_id"], ["id"])
+    op.create_index(op.f("ix_hotels_city_id"), "hotels", ["city_id"], unique=False)
+
+    # Заполняем города из адресов существующих отелей
+    conn = op.get_bind()
+    hotels = conn.execute(sa.text("select id, location from hotels")).all()
+    cities = {hotel_id: parse_city(location) for hotel_id, location in hotels}
+    names = sorted({name for name in cities.values() if name})
+    if not names:
+        return
+    conn.execute(
+        sa.text("insert into cities (name) values (:name)"),
+        [{"name": name} for name in names],
+    )
+    conn.execute(
+        sa.text(
+            "update hotels set city_id = cities.id from cities "
+            "where hotels.id = :hotel_id and cities.name = :name"
+        ),
+        [
+            {"hotel_id": hotel_id, "name": name}
+            for hotel_id, name in cities.items()
+            if name
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_hotels_city_id"), table_name="hotels")
+    op.drop_constraint("hotels_city_id_fkey", "hotels", type_="foreignkey")
+    op.drop_column("hotels", "city_id")
+    op.drop_table("cities")
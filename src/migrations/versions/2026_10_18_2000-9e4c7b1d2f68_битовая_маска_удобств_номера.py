@@ -0,0 +1,39 @@
+"""битовая маска удобств номера
+
+Revision ID: 9e4c7b1d2f68
+Revises: 6b2e9f3a7c55
+Create Date: 2026-10-18 20:00:05.731942
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4c7b1d2f68"
+down_revision: Union[str, None] = "6b2e9f3a7c55"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "rooms",
+        sa.Column("facilities_mask", sa.BIGINT(), server_default="0", nullable=False),
+    )
+    # Колонка номера в rooms_facilities после миграции b79c592b1f8f называется room_id
+    op.execute(
+        """
+        update rooms set facilities_mask = coalesce((
+            select bit_or(1::bigint << (facilities_id - 1)) from rooms_facilities
+            where room_id = rooms.id and facilities_id between 1 and 63
+        ), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("rooms", "facilities_mask")
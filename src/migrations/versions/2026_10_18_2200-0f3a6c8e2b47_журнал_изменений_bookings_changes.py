@@ -0,0 +1,46 @@
+"""журнал изменений bookings_changes
+
+Revision ID: 0f3a6c8e2b47
+Revises: 9e4c7b1d2f68
+Create Date: 2026-10-18 22:00:11.418230
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0f3a6c8e2b47"
+down_revision: Union[str, None] = "9e4c7b1d2f68"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bookings_changes",
+        sa.Column("seq", sa.BIGINT(), autoincrement=True, nullable=False),
+        sa.Column(
+            "txid",
+            sa.BIGINT(),
+            server_default=sa.text("pg_current_xact_id()::text::bigint"),
+            nullable=False,
+        ),
+        sa.Column("booking_id", sa.BIGINT(), nullable=False),
+        sa.Column("op", sa.String(length=6), nullable=False),
+        sa.Column(
+            "changed_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("seq"),
+    )
+    op.create_index(
+        "ix_bookings_changes_txid_seq", "bookings_changes", ["txid", "seq"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_changes_txid_seq", table_name="bookings_changes")
+    op.drop_table("bookings_changes")
@@ -1,15 +1,20 @@
+from src.models.cities import CitiesOrm
 from src.models.hotels import HotelsOrm
 from src.models.rooms import RoomsOrm
 from src.models.users import UsersOrm
-from src.models.bookings import BookingsOrm
+from src.models.bookings import BookingsOrm, BookingsChangesOrm
 from src.models.facilities import FacilitiesOrm, RoomFacilitiesOrm
+from src.models.inventory import RoomsInventoryOrm
 
 
 __all__ = [
+    "CitiesOrm",
     "HotelsOrm",
     "RoomsOrm",
     "UsersOrm",
     "BookingsOrm",
+    "BookingsChangesOrm",
     "FacilitiesOrm",
     "RoomFacilitiesOrm",
+    "RoomsInventoryOrm",
 ]
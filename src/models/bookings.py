@@ -1,21 +1,71 @@
-from datetime import date
+from datetime import date, datetime
 
+from sqlalchemy.dialects.postgresql import DATERANGE, Range
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import BIGINT, ForeignKey
+from sqlalchemy import BIGINT, DDL, Computed, ForeignKey, Index, String, event, func, text
 from src.database import Base
 
 
 class BookingsOrm(Base):
     __tablename__ = "bookings"
 
-    id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"))
-    date_from: Mapped[date]
+    # Таблица секционирована по месяцам date_from, поэтому он входит в первичный ключ
+    date_from: Mapped[date] = mapped_column(primary_key=True)
     date_to: Mapped[date]
     price: Mapped[int]
+    # Период проживания [date_from, date_to), вычисляется самой БД
+    stay: Mapped[Range[date]] = mapped_column(
+        DATERANGE, Computed("daterange(date_from, date_to, '[)')", persisted=True)
+    )
+
+    __table_args__ = (
+        # Для пересечений stay && daterange(...) по номеру, нужно расширение btree_gist
+        Index("ix_bookings_room_id_stay", "room_id", "stay", postgresql_using="gist"),
+        {"postgresql_partition_by": "RANGE (date_from)"},
+    )
 
     @hybrid_property
     def total_cost(self):
         return self.price * (self.date_to - self.date_from).days
+
+
+class BookingsChangesOrm(Base):
+    """
+    Журнал изменений bookings для ленты GET /bookings/changes.
+    Пишется BookingRepository в той же транзакции, что и само изменение.
+    """
+
+    __tablename__ = "bookings_changes"
+
+    seq: Mapped[int] = mapped_column(BIGINT, primary_key=True, autoincrement=True)
+    # Транзакция, записавшая изменение. Лента идет по (txid, seq) и отдает только транзакции
+    # старше самой старой незавершенной: позже перед курсором ничего не появится,
+    # даже если seq выдан раньше, а закоммичен позже соседних
+    txid: Mapped[int] = mapped_column(
+        BIGINT, server_default=text("pg_current_xact_id()::text::bigint")
+    )
+    # Без внешнего ключа: запись об удалении переживает само бронирование
+    booking_id: Mapped[int] = mapped_column(BIGINT)
+    op: Mapped[str] = mapped_column(String(6))
+    changed_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    __table_args__ = (Index("ix_bookings_changes_txid_seq", "txid", "seq"),)
+
+
+# GiST-индекс по room_id (bigint) требует btree_gist, в том числе при create_all в тестах
+event.listen(
+    BookingsOrm.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"),
+)
+# Секция по умолчанию принимает даты, для которых еще нет месячной секции
+# (см. src/repos/partitions.py)
+event.listen(
+    BookingsOrm.__table__,
+    "after_create",
+    DDL("CREATE TABLE %(fullname)s_default PARTITION OF %(fullname)s DEFAULT"),
+)
@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, BIGINT
+from src.database import Base
+
+# Длина названия города: parse_city не возвращает названия длиннее
+CITY_NAME_MAX_LENGTH = 100
+
+
+class CitiesOrm(Base):
+    __tablename__ = "cities"
+
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    name: Mapped[str] = mapped_column(String(CITY_NAME_MAX_LENGTH), unique=True)
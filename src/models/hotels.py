@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, BIGINT
+from sqlalchemy import String, BIGINT, DDL, ForeignKey, Index, event
 from src.database import Base
 
 
@@ -9,3 +9,29 @@ class HotelsOrm(Base):
     id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
     title: Mapped[str] = mapped_column(String(100))
     location: Mapped[str]
+    # Город, выделенный из location при записи (см. src/utils/cities.py)
+    city_id: Mapped[int | None] = mapped_column(ForeignKey("cities.id"), index=True)
+
+    __table_args__ = (
+        # Триграммные индексы для ILIKE '%...%', ~* и word_similarity (см. src/repos/search.py)
+        Index(
+            "ix_hotels_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_hotels_location_trgm",
+            "location",
+            postgresql_using="gin",
+            postgresql_ops={"location": "gin_trgm_ops"},
+        ),
+    )
+
+
+# Класс операторов gin_trgm_ops дает расширение pg_trgm, в том числе при create_all в тестах
+event.listen(
+    HotelsOrm.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
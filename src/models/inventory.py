@@ -0,0 +1,21 @@
+from datetime import date
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BIGINT, ForeignKey
+from src.database import Base
+
+
+class RoomsInventoryOrm(Base):
+    """
+    Календарь занятости: сколько единиц номера room_id занято в день day.
+    Остаток считается как rooms.quantity - booked, поэтому изменение quantity
+    не требует пересчета календаря.
+    """
+
+    __tablename__ = "rooms_inventory"
+
+    room_id: Mapped[int] = mapped_column(
+        BIGINT, ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(primary_key=True)
+    booked: Mapped[int] = mapped_column(default=0, server_default="0")
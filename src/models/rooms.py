@@ -16,6 +16,9 @@ class RoomsOrm(Base):
     description: Mapped[str | None]
     price: Mapped[int]
     quantity: Mapped[int]
+    # Битовая маска удобств номера: бит id - 1 для удобств с id от 1 до 63,
+    # поддерживается RoomsFacilitiesRepository (см. src/repos/utils.py)
+    facilities_mask: Mapped[int] = mapped_column(BIGINT, server_default="0")
 
     facilities: Mapped[list["FacilitiesOrm"]] = relationship(
         back_populates="rooms", secondary="rooms_facilities"
@@ -1,13 +1,14 @@
 import logging
-from typing import Sequence
+from functools import lru_cache
+from typing import AsyncIterator, Sequence
 
-from asyncpg.exceptions import UniqueViolationError, ForeignKeyViolationError
-from sqlalchemy import select, insert, update, delete
-from sqlalchemy.exc import IntegrityError
+from asyncpg.exceptions import DataError, UniqueViolationError, ForeignKeyViolationError
+from sqlalchemy import select, insert, update, delete, bindparam
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.exc import NoResultFound
 from pydantic import BaseModel
-from src.database import engine
-from src.exception import ObjectAlreadyExistsException
+from src.config import settings
+from src.exception import InvalidDataException, ObjectAlreadyExistsException
 from src.exception import ObjectNotFoundException
 from src.repos.mapper.base import DataMapper
 
@@ -19,17 +20,76 @@ class BaseRepository:
     def __init__(self, session):
         self.session = session
 
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _filter_by_statement(cls, names: tuple[str, ...], as_schema_columns: bool):
+        """
+        select по равенству полей names параметрам :names, одна конструкция на форму фильтра.
+        Алхимия не собирает запрос и не считает ключ кэша компиляции на каждый вызов,
+        а одинаковый текст SQL позволяет asyncpg брать подготовленный запрос из кэша соединения.
+        """
+        columns = cls.mapper.schema_columns() if as_schema_columns else None
+        if columns is None:
+            query = select(cls.model)
+        else:
+            query = select(*columns).select_from(cls.model)
+        return query.filter(
+            *(getattr(cls.model, name) == bindparam(name) for name in names)
+        )
+
+    def _select_by(self, filter, filter_by: dict, as_schema_columns: bool = False):
+        """Запрос с фильтрами и параметры для него: из кэша, если фильтр только по равенству"""
+        # = NULL не то же самое, что filter_by(...=None) (IS NULL), такие запросы не кэшируются
+        if not filter and None not in filter_by.values():
+            return self._filter_by_statement(tuple(filter_by), as_schema_columns), filter_by
+        columns = self.mapper.schema_columns() if as_schema_columns else None
+        if columns is None:
+            query = select(self.model)
+        else:
+            query = select(*columns).select_from(self.model)
+        return query.filter(*filter).filter_by(**filter_by), None
+
     async def get_filtered(self, *filter, **filter_by):
-        query = select(self.model).filter(*filter).filter_by(**filter_by)
-        result = await self.session.execute(query)
-        return [self.mapper.map_to_schema(model) for model in result.scalars().all()]
+        # Быстрый путь: только нужные колонки и схемы без ORM-объектов
+        as_schema_columns = self.mapper.schema_columns() is not None
+        query, params = self._select_by(filter, filter_by, as_schema_columns)
+        result = await self.session.execute(query, params)
+        if not as_schema_columns:
+            return [self.mapper.map_to_schema(model) for model in result.scalars().all()]
+        return self.mapper.map_rows_to_schemas(result.all())
+
+    async def stream_filtered(
+        self, *filter, batch_size: int | None = None, **filter_by
+    ) -> AsyncIterator[list[BaseModel]]:
+        """
+        Как get_filtered, но читает результат серверным курсором и отдает схемы пачками
+        по batch_size строк: в памяти одновременно не больше одной пачки, сколько бы строк
+        ни вернул запрос. Сессия должна оставаться открытой, пока генератор не исчерпан.
+        """
+        batch_size = batch_size or settings.DB_STREAM_BATCH_SIZE
+        columns = self.mapper.schema_columns()
+        if columns is None:
+            query = select(self.model)
+        else:
+            query = select(*columns).select_from(self.model)
+        query = query.filter(*filter).filter_by(**filter_by)
+        # yield_per включает stream_results: asyncpg читает курсор по batch_size строк
+        result = await self.session.stream(
+            query, execution_options={"yield_per": batch_size}
+        )
+        if columns is None:
+            async for models in result.scalars().partitions():
+                yield [self.mapper.map_to_schema(model) for model in models]
+            return
+        async for rows in result.partitions():
+            yield self.mapper.map_rows_to_schemas(rows)
 
     async def get_all(self, *args, **kwargs):
         return await self.get_filtered()
 
     async def get_one(self, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
+        query, params = self._select_by((), filter_by)
+        result = await self.session.execute(query, params)
         try:
             model = result.scalar_one()
         except NoResultFound:
@@ -37,8 +97,8 @@ class BaseRepository:
         return self.mapper.map_to_schema(model)
 
     async def one_or_none(self, **kwargs):
-        query = select(self.model).filter_by(**kwargs)
-        result = await self.session.execute(query)
+        query, params = self._select_by((), kwargs)
+        result = await self.session.execute(query, params)
         model = result.scalars().one_or_none()
         if model is None:
             raise ObjectNotFoundException
@@ -50,7 +110,6 @@ class BaseRepository:
             .values(**data.model_dump(exclude_unset=True))
             .returning(self.model)
         )
-        # print(add_stmt.compile(engine, compile_kwargs={"literal_binds": True}))
         try:
             result = await self.session.execute(add_stmt)
             model = result.scalars().one()
@@ -70,14 +129,71 @@ class BaseRepository:
                 logging.error(f"Не известная ошибка: тип ошибки {ex.orig.__cause__}")
                 raise ex
 
-    async def add_bulk(self, data: Sequence[BaseModel]) -> None:
-        add_stmt = (
-            insert(self.model)
-            .values([item.model_dump(exclude_unset=True) for item in data])
-            .returning(self.model)
-        )  # insert(self.model).values(**item.model_dump(exclude_unset=True)).returning(self.model)
-        print(add_stmt.compile(engine, compile_kwargs={"literal_binds": True}))
-        await self.session.execute(add_stmt)
+    async def add_bulk(
+        self, data: Sequence[BaseModel], returning: bool = False
+    ) -> list[int] | None:
+        """
+        Массовая вставка. Без returning строки передаются бинарным COPY,
+        с returning — пачками INSERT ... RETURNING id, id возвращаются в порядке data.
+        """
+        return await self._add_values(
+            [item.model_dump(exclude_unset=True) for item in data], returning
+        )
+
+    async def _add_values(
+        self, values: list[dict], returning: bool = False
+    ) -> list[int] | None:
+        try:
+            if returning:
+                if not values:
+                    return []
+                # insertmanyvalues: по 1000 строк на INSERT ... VALUES ... RETURNING
+                add_stmt = insert(self.model).returning(
+                    self.model.id, sort_by_parameter_order=True
+                )
+                result = await self.session.execute(add_stmt, values)
+                return list(result.scalars())
+            await self._copy(values)
+        except IntegrityError as ex:
+            self._raise_integrity_error(ex.orig.__cause__, ex)
+        except (UniqueViolationError, ForeignKeyViolationError) as ex:
+            # COPY идет мимо алхимии, ошибки asyncpg приходят как есть
+            self._raise_integrity_error(ex, ex)
+        except DBAPIError as ex:
+            if isinstance(ex.orig.__cause__, DataError):
+                raise InvalidDataException(str(ex.orig.__cause__)) from ex
+            raise
+        except (DataError, OverflowError) as ex:
+            # Строка длиннее столбца, число вне диапазона: у COPY ошибка сервера или кодирования
+            raise InvalidDataException(str(ex)) from ex
+
+    async def _copy(self, values: list[dict]) -> None:
+        """Вставка через COPY ... FROM STDIN (BINARY) на соединении сессии, в ее транзакции"""
+        table = self.model.__table__
+        connection = await self.session.connection()
+        options = connection.sync_connection.get_execution_options()
+        schema_translate_map = options.get("schema_translate_map") or {}
+        raw_connection = await connection.get_raw_connection()
+        # Строки с разным набором заданных полей копируются отдельно,
+        # чтобы незаданные колонки получили значения по умолчанию
+        groups: dict[tuple[str, ...], list[tuple]] = {}
+        for row in values:
+            groups.setdefault(tuple(row), []).append(tuple(row.values()))
+        for columns, records in groups.items():
+            await raw_connection.driver_connection.copy_records_to_table(
+                table.name,
+                records=records,
+                columns=[table.columns[key].name for key in columns],
+                schema_name=schema_translate_map.get(table.schema, table.schema),
+            )
+
+    def _raise_integrity_error(self, cause, ex):
+        logging.error(f"Не удалось добавить объекты: {cause}")
+        if isinstance(cause, UniqueViolationError):
+            raise ObjectAlreadyExistsException from ex
+        elif isinstance(cause, ForeignKeyViolationError):
+            raise ObjectNotFoundException from ex
+        raise ex
 
     async def edit(self, data: BaseModel, **filter_by):
         update_stmt = (
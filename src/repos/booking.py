@@ -1,38 +1,193 @@
 from datetime import date
+from typing import Sequence
 
-from sqlalchemy import select
+from pydantic import BaseModel
+from sqlalchemy import select, insert, update, delete, func, cast, literal, true
+from sqlalchemy import Date, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from src.exception import AllRoomsByBookedException
+from src.exception import AllRoomsByBookedException, ObjectNotFoundException
+from src.init import availability_index
 from src.repos.base import BaseRepository
+from src.repos.booking_changes import BookingChangesRepository
 from src.models.bookings import BookingsOrm
+from src.models.rooms import RoomsOrm
+from src.repos.inventory import InventoryRepository
 from src.repos.mapper.base import DataMapper
 from src.repos.mapper.mappers import BookingDataMapper
-from src.repos.utils import rooms_ids_for_booking
-from src.schemas.bookings import BookingAdd
+from src.schemas.bookings import BookingAddRequest, Booking
 
 
 class BookingRepository(BaseRepository):
+    """
+    Репозиторий бронирований. Любое изменение бронирований сразу отражается
+    в календаре занятости rooms_inventory и в журнале изменений bookings_changes
+    в той же сессии (транзакции).
+    """
+
     model = BookingsOrm
     mapper: DataMapper = BookingDataMapper
 
+    def __init__(self, session):
+        super().__init__(session)
+        self.inventory = InventoryRepository(session)
+        self.changes = BookingChangesRepository(session)
+
+    @property
+    def _stay_columns(self):
+        return self.model.room_id, self.model.date_from, self.model.date_to
+
     async def get_bookings_with_today_checkin(self):
         """
-        Получаем список бронирований с датой сегодня
-        :return: список бронирований
+        Получаем список бронирований с датой сегодня
+        (фильтр по date_from читает только секцию текущего месяца)
+        :return: список бронирований
         """
         query = select(self.model).filter(BookingsOrm.date_from == date.today())
         result = await self.session.execute(query)
         return [self.mapper.map_to_schema(model) for model in result.scalars().all()]
 
-    async def add_bookings(self, data: BookingAdd, hotel_id: int):
-        rooms_ids_to_get = rooms_ids_for_booking(
-            date_from=data.date_from, date_to=data.date_to, hotel_id=hotel_id
+    async def book_room(self, user_id: int, data: BookingAddRequest) -> Booking:
+        """
+        Бронирование номера одним запросом к БД.
+
+        with room as (select id, price, quantity from rooms where id = :room_id),
+        reserved as (
+            insert into rooms_inventory (room_id, day, booked)
+            select room.id, :date_from + generate_series(0, :nights - 1), 1 from room
+            where room.quantity > 0 order by 2
+            on conflict (room_id, day) do update set booked = rooms_inventory.booked + 1
+            where rooms_inventory.booked < (select quantity from room)
+            returning day
+        ),
+        booking as (
+            insert into bookings (user_id, room_id, date_from, date_to, price)
+            select :user_id, room.id, :date_from, :date_to, room.price from room
+            where (select count(*) from reserved) = :nights
+            returning *
+        )
+        select room.id, booking.* from room left join booking on true;
+
+        Строки календаря блокируются upsert'ом, поэтому параллельные бронирования
+        последней единицы номера выполняются по очереди и перебронирования не бывает.
+        Если занят хотя бы один день, часть дней уже может быть занята этой транзакцией:
+        после AllRoomsByBookedException транзакцию нужно откатить (это делает DBManager).
+        """
+        nights = (data.date_to - data.date_from).days
+        date_from = cast(literal(data.date_from), Date)
+        date_to = cast(literal(data.date_to), Date)
+        inventory = self.inventory.model
+
+        room = (
+            select(RoomsOrm.id, RoomsOrm.price, RoomsOrm.quantity)
+            .filter(RoomsOrm.id == data.room_id)
+            .cte(name="room")
+        )
+        days = (
+            select(
+                room.c.id,
+                (date_from + func.generate_series(0, nights - 1, type_=Integer)).label("day"),
+                literal(1),
+            )
+            .filter(room.c.quantity > 0)
+            .order_by("day")
+        )
+        reserve_stmt = pg_insert(inventory).from_select(
+            ["room_id", "day", "booked"], days
+        )
+        reserved = (
+            reserve_stmt.on_conflict_do_update(
+                index_elements=[inventory.room_id, inventory.day],
+                set_={"booked": inventory.booked + 1},
+                where=inventory.booked < select(room.c.quantity).scalar_subquery(),
+            )
+            .returning(inventory.day)
+            .cte(name="reserved")
+        )
+        booking = (
+            insert(self.model)
+            .from_select(
+                ["user_id", "room_id", "date_from", "date_to", "price"],
+                select(literal(user_id), room.c.id, date_from, date_to, room.c.price)
+                .filter(
+                    select(func.count()).select_from(reserved).scalar_subquery()
+                    == nights
+                ),
+            )
+            .returning(*self.model.__table__.c)
+            .cte(name="booking")
+        )
+        query = (
+            select(room.c.id.label("room_found"), *booking.c)
+            .select_from(room)
+            .outerjoin(booking, true())
         )
-        rooms_ids_to_book_res = await self.session.execute(rooms_ids_to_get)
-        rooms_ids_to_book: list[int] = rooms_ids_to_book_res.scalars().all()
 
-        if data.room_id not in rooms_ids_to_book:
+        result = await self.session.execute(query)
+        row = result.one_or_none()
+        if row is None:
+            raise ObjectNotFoundException
+        availability_index.mark_changed(self.session, [data.room_id])
+        if row.id is None:
             raise AllRoomsByBookedException
+        await self.changes.log("insert", [row.id])
+        return self.mapper.schema.model_validate(row, from_attributes=True)
 
-        new_booking = await self.add(data)
+    async def add(self, data: BaseModel) -> object:
+        new_booking = await super().add(data)
+        await self.inventory.reserve(
+            [(new_booking.room_id, new_booking.date_from, new_booking.date_to)]
+        )
+        await self.changes.log("insert", [new_booking.id])
         return new_booking
+
+    async def add_bulk(
+        self, data: Sequence[BaseModel], returning: bool = False
+    ) -> list[int] | None:
+        # id нужны журналу изменений, поэтому бронирования всегда вставляются с RETURNING
+        ids = await super().add_bulk(data, returning=True)
+        await self.inventory.reserve(
+            [(item.room_id, item.date_from, item.date_to) for item in data]
+        )
+        await self.changes.log("insert", ids)
+        return ids if returning else None
+
+    async def edit(self, data: BaseModel, **filter_by):
+        update_stmt = (
+            update(self.model).filter_by(**filter_by).values(**data.model_dump())
+        )
+        await self._update_with_inventory(update_stmt, **filter_by)
+
+    async def partially_edit(
+        self, data: BaseModel, exclude_unset: bool = True, **filter_by
+    ):
+        update_stmt = (
+            update(self.model)
+            .filter_by(**filter_by)
+            .values(**data.model_dump(exclude_unset=exclude_unset))
+        )
+        await self._update_with_inventory(update_stmt, **filter_by)
+
+    async def delete(self, **filter_by):
+        delete_stmt = (
+            delete(self.model)
+            .filter_by(**filter_by)
+            .returning(*self._stay_columns, self.model.id)
+        )
+        rows = (await self.session.execute(delete_stmt)).all()
+        await self.inventory.release(row[:3] for row in rows)
+        await self.changes.log("delete", (row.id for row in rows))
+
+    async def _update_with_inventory(self, update_stmt, **filter_by):
+        """Освобождаем старые даты бронирований и занимаем новые"""
+        old_stays_query = (
+            select(*self._stay_columns).filter_by(**filter_by).with_for_update()
+        )
+        old_stays = await self.session.execute(old_stays_query)
+        await self.inventory.release(old_stays.all())
+        result = await self.session.execute(
+            update_stmt.returning(*self._stay_columns, self.model.id)
+        )
+        rows = result.all()
+        await self.inventory.reserve(row[:3] for row in rows)
+        await self.changes.log("update", (row.id for row in rows))
@@ -0,0 +1,83 @@
+from typing import Iterable
+
+from sqlalchemy import select, insert, func, cast, literal, tuple_, any_, BIGINT, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from src.exception import InvalidCursorException
+from src.models.bookings import BookingsChangesOrm, BookingsOrm
+from src.repos.base import BaseRepository
+from src.repos.mapper.mappers import BookingDataMapper
+from src.schemas.bookings import BookingChange, BookingChangeOp, BookingChangesPage
+from src.utils.pagination import decode_cursor, encode_cursor
+
+
+def committed_horizon():
+    """
+    Самая старая незавершенная транзакция: все изменения с меньшим txid уже закоммичены
+    (или откачены), а новые изменения получат txid не меньше этого значения
+    """
+    return cast(
+        cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BIGINT
+    )
+
+
+class BookingChangesRepository(BaseRepository):
+    """Журнал изменений бронирований и лента изменений по нему"""
+
+    model = BookingsChangesOrm
+
+    async def log(self, op: BookingChangeOp, bookings_ids: Iterable[int]):
+        """Записывает изменение бронирований в журнал в текущей транзакции"""
+        bookings_ids = list(bookings_ids)
+        if not bookings_ids:
+            return
+        log_stmt = insert(self.model).from_select(
+            ["booking_id", "op"],
+            select(
+                func.unnest(literal(bookings_ids, ARRAY(BIGINT))), literal(op)
+            ),
+        )
+        await self.session.execute(log_stmt)
+
+    async def get_changes(self, since: str | None, limit: int) -> BookingChangesPage:
+        """
+        Бронирования, измененные после курсора since, не больше limit записей журнала.
+        Несколько изменений одного бронирования схлопываются в одно: delete, если последнее
+        было удалением, insert, если первое было созданием, иначе update.
+        """
+        key = decode_cursor(since) if since else {"txid": 0, "seq": 0}
+        if not all(isinstance(key.get(name), int) for name in ("txid", "seq")):
+            raise InvalidCursorException
+        query = (
+            select(self.model.txid, self.model.seq, self.model.booking_id, self.model.op)
+            .filter(
+                tuple_(self.model.txid, self.model.seq) > tuple_(key["txid"], key["seq"]),
+                self.model.txid < committed_horizon(),
+            )
+            .order_by(self.model.txid, self.model.seq)
+            .limit(limit)
+        )
+        rows = (await self.session.execute(query)).all()
+        if not rows:
+            return BookingChangesPage(changes=[], next_cursor=since)
+
+        ops: dict[int, BookingChangeOp] = {}
+        for row in rows:
+            first = ops.get(row.booking_id, row.op)
+            ops[row.booking_id] = "delete" if row.op == "delete" else (
+                "insert" if first == "insert" else "update"
+            )
+        bookings_query = select(*BookingDataMapper.schema_columns()).filter(
+            BookingsOrm.id == any_(literal(list(ops), ARRAY(BIGINT)))
+        )
+        bookings = BookingDataMapper.map_rows_to_schemas(
+            (await self.session.execute(bookings_query)).all()
+        )
+        current = {booking.id: booking for booking in bookings}
+        return BookingChangesPage(
+            changes=[
+                BookingChange(booking_id=booking_id, op=op, booking=current.get(booking_id))
+                for booking_id, op in ops.items()
+            ],
+            next_cursor=encode_cursor(txid=rows[-1].txid, seq=rows[-1].seq),
+        )
@@ -0,0 +1,34 @@
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.init import cities_index
+from src.models.cities import CitiesOrm
+from src.repos.base import BaseRepository
+from src.repos.mapper.mappers import CityDataMapper
+
+
+class CitiesRepository(BaseRepository):
+    model = CitiesOrm
+    mapper = CityDataMapper
+
+    async def get_or_create_ids(self, names: Iterable[str]) -> dict[str, int]:
+        """id городов по названиям, недостающие города создаются"""
+        names = sorted(set(names))
+        if not names:
+            return {}
+        add_stmt = (
+            insert(self.model)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=[self.model.name])
+            .returning(self.model)
+        )
+        added = [self.mapper.map_to_schema(city) for city in (await self.session.scalars(add_stmt))]
+        cities_index.mark_added(self.session, added)
+        ids = {city.name: city.id for city in added}
+        missing = [name for name in names if name not in ids]
+        if missing:
+            query = select(self.model.name, self.model.id).filter(self.model.name.in_(missing))
+            ids.update((await self.session.execute(query)).tuples().all())
+        return ids
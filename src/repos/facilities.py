@@ -1,8 +1,13 @@
-from sqlalchemy import select, delete, insert
+from typing import Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import select, delete, insert, update
 
 from src.repos.base import BaseRepository
 from src.models.facilities import FacilitiesOrm, RoomFacilitiesOrm
+from src.models.rooms import RoomsOrm
 from src.repos.mapper.mappers import FacilityDataMapper
+from src.repos.utils import facilities_masks
 
 
 class FacilitiesRepository(BaseRepository):
@@ -34,3 +39,21 @@ class RoomsFacilitiesRepository(BaseRepository):
                 [{"rooms_id": room_id, "facilities_id": f_id} for f_id in ids_to_insert]
             )
             await self.session.execute(insert_m2m_facilities_stmt)
+        await self.refresh_facilities_mask([room_id])
+
+    async def add_bulk(
+        self, data: Sequence[BaseModel], returning: bool = False
+    ) -> list[int] | None:
+        ids = await super().add_bulk(data, returning)
+        await self.refresh_facilities_mask({item.rooms_id for item in data})
+        return ids
+
+    async def refresh_facilities_mask(self, rooms_ids: Sequence[int] | set[int]):
+        """Пересчитывает rooms.facilities_mask номеров по rooms_facilities"""
+        masks = facilities_masks(rooms_ids)
+        update_stmt = (
+            update(RoomsOrm)
+            .filter(RoomsOrm.id == masks.c.room_id)
+            .values(facilities_mask=masks.c.mask)
+        )
+        await self.session.execute(update_stmt)
@@ -1,49 +1,158 @@
 from datetime import date
 from typing import List
 
-from src.exception import check_date_correct
-from src.models.rooms import RoomsOrm
+from src.exception import check_date_correct, InvalidCursorException
 from src.repos.base import BaseRepository
-from src.database import engine
+from src.repos.cities import CitiesRepository
 from src.models.hotels import HotelsOrm
-from sqlalchemy import select, insert
+from pydantic import BaseModel
+from sqlalchemy import select, insert, update
 
 from src.repos.mapper.base import DataMapper
 from src.repos.mapper.mappers import HotelDataMapper
-from src.repos.utils import rooms_ids_for_booking
+from src.repos.search import hotel_search_filters, hotel_search_rank
+from src.repos.utils import free_hotels_filter, hotels_stats_subquery, after_sort_key
+from src.schemas.hotels import HotelsPage, HotelWithStats, HotelsSort
+from src.utils.cities import parse_city
+from src.utils.pagination import encode_cursor, decode_cursor
 
 
 class HotelRepository(BaseRepository):
     model = HotelsOrm
     mapper: DataMapper = HotelDataMapper
 
+    def __init__(self, session):
+        super().__init__(session)
+        self.cities = CitiesRepository(session)
+
+    async def _with_city_ids(self, data: list[dict]) -> list[dict]:
+        """Проставляет city_id по городу из location там, где location задан"""
+        cities = {
+            i: parse_city(values["location"])
+            for i, values in enumerate(data)
+            if values.get("location") is not None
+        }
+        ids = await self.cities.get_or_create_ids(city for city in cities.values() if city)
+        for i, city in cities.items():
+            data[i]["city_id"] = ids.get(city)
+        return data
+
     async def add(self, data: List[mapper.schema]) -> object:
-        models_orm = []
-        for model in data:
-            add_stmt = (
-                insert(self.model).values(**model.model_dump()).returning(self.model)
-            )
-            print(add_stmt.compile(engine, compile_kwargs={"literal_binds": True}))
-            result = await self.session.execute(add_stmt)
-            models_orm.append(result.scalar())
-        return [self.mapper.map_to_schema(model) for model in models_orm]
+        values = await self._with_city_ids([model.model_dump() for model in data])
+        if not values:
+            return []
+        # Один INSERT ... VALUES ... RETURNING на пачку отелей, в порядке data
+        add_stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        result = await self.session.scalars(add_stmt, values)
+        return [self.mapper.map_to_schema(model) for model in result.all()]
+
+    async def add_bulk(
+        self, data: List[BaseModel], returning: bool = False
+    ) -> list[int] | None:
+        values = await self._with_city_ids([item.model_dump(exclude_unset=True) for item in data])
+        return await self._add_values(values, returning)
+
+    async def edit(self, data: BaseModel, **filter_by):
+        [values] = await self._with_city_ids([data.model_dump()])
+        await self.session.execute(update(self.model).filter_by(**filter_by).values(**values))
+
+    async def partially_edit(self, data: BaseModel, exclude_unset: bool = True, **filter_by):
+        [values] = await self._with_city_ids([data.model_dump(exclude_unset=exclude_unset)])
+        await self.session.execute(update(self.model).filter_by(**filter_by).values(**values))
 
     async def get_filtered_by_time(
-        self, date_from: date, date_to: date, location, title, limit, offset
-    ) -> List[mapper.schema]:
+        self,
+        date_from: date,
+        date_to: date,
+        location,
+        title,
+        limit,
+        offset=0,
+        cursor: str | None = None,
+        city_id: int | None = None,
+        facilities_ids: list[int] | None = None,
+        with_stats: bool = False,
+        sort: HotelsSort | None = None,
+    ) -> HotelsPage:
+        """
+        Страница свободных отелей.
+
+        Без поиска отели упорядочены по id, при поиске по названию/адресу — по убыванию
+        релевантности (см. src/repos/search.py), с sort — по минимальной цене свободного
+        номера; при равном ключе сортировки по id.
+
+        with_stats добавляет к отелям сводку по свободным номерам (минимальная цена,
+        число свободных типов номеров, остаток единиц) из того же запроса — группировкой
+        по календарю rooms_inventory, без индекса свободных номеров в памяти.
+
+        С курсором страница выбирается по ключу последней строки предыдущей страницы,
+        поэтому стоимость запроса не растет с глубиной прокрутки; offset тогда игнорируется.
+        next_cursor возвращается в обоих режимах, если есть следующая страница.
+        """
         check_date_correct(date_from, date_to)
-        rooms_ids_to_get = rooms_ids_for_booking(date_from=date_from, date_to=date_to)
-        hotels_ids_to_get = (
-            select(RoomsOrm.hotel_id)
-            .select_from(RoomsOrm)
-            .filter(RoomsOrm.id.in_(rooms_ids_to_get))
-        )
+        query = select(HotelsOrm).filter(*hotel_search_filters(title, location))
+        if with_stats or sort:
+            stats = hotels_stats_subquery(date_from, date_to, facilities_ids)
+            query = query.join(stats, stats.c.hotel_id == HotelsOrm.id)
+            if with_stats:
+                query = query.add_columns(
+                    stats.c.min_price, stats.c.room_types_available, stats.c.rooms_left
+                )
+        else:
+            query = query.filter(
+                await free_hotels_filter(self.session, date_from, date_to, facilities_ids)
+            )
+        if city_id is not None:
+            query = query.filter(HotelsOrm.city_id == city_id)
+
+        # Ключ сортировки перед id: цена, релевантность поиска или ничего
+        if sort:
+            sort_key, descending = stats.c.min_price, sort.startswith("-")
+        else:
+            sort_key, descending = hotel_search_rank(title, location), True
+        if sort_key is not None:
+            query = query.add_columns(sort_key.label("sort_key"))
 
-        query = select(HotelsOrm).filter(HotelsOrm.id.in_(hotels_ids_to_get))
-        if title:
-            query = query.filter(HotelsOrm.title.ilike(f"%{title}%"))
-        if location:
-            query = query.filter(HotelsOrm.location.op("~")(rf"(?i)\y{location}\y"))
-        query = query.limit(limit).offset(offset)
+        if cursor is not None:
+            key = decode_cursor(cursor)
+            if not isinstance(key.get("id"), int):
+                raise InvalidCursorException
+            if sort_key is None:
+                query = query.filter(HotelsOrm.id > key["id"])
+            elif isinstance(key.get("key"), (int, float)):
+                query = query.filter(
+                    after_sort_key(sort_key, key["key"], HotelsOrm.id, key["id"], descending)
+                )
+            else:
+                raise InvalidCursorException
+        else:
+            query = query.offset(offset)
+        order_by = [HotelsOrm.id]
+        if sort_key is not None:
+            order_by.insert(0, sort_key.desc() if descending else sort_key)
+        # Лишняя строка показывает, есть ли следующая страница
+        query = query.order_by(*order_by).limit(limit + 1)
         result = await self.session.execute(query)
-        return [self.mapper.map_to_schema(hotel) for hotel in result.scalars().all()]
+        rows = result.all()
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            if sort_key is None:
+                next_cursor = encode_cursor(id=last.HotelsOrm.id)
+            else:
+                next_cursor = encode_cursor(key=last.sort_key, id=last.HotelsOrm.id)
+        return HotelsPage(
+            hotels=[self._map_row(row, with_stats) for row in rows[:limit]],
+            next_cursor=next_cursor,
+        )
+
+    def _map_row(self, row, with_stats: bool):
+        hotel = self.mapper.map_to_schema(row.HotelsOrm)
+        if not with_stats:
+            return hotel
+        return HotelWithStats(
+            **hotel.model_dump(),
+            min_price=row.min_price,
+            room_types_available=row.room_types_available,
+            rooms_left=row.rooms_left,
+        )
@@ -0,0 +1,150 @@
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import select, delete, func, values, column, Integer, BIGINT, Date
+from sqlalchemy.dialects.postgresql import insert
+
+from src.init import availability_index
+from src.models.bookings import BookingsOrm
+from src.models.inventory import RoomsInventoryOrm
+from src.repos.base import BaseRepository
+from src.repos.utils import stay_overlaps
+from src.schemas.inventory import InventoryDiscrepancy
+
+
+def booked_days(bookings):
+    """
+    Разворачивает бронирования в ночи: по строке (room_id, day) на каждый день [date_from, date_to).
+    :param bookings: любой selectable с колонками room_id, date_from, date_to
+    """
+    day = bookings.c.date_from + func.generate_series(
+        0, bookings.c.date_to - bookings.c.date_from - 1, type_=Integer
+    )
+    return select(bookings.c.room_id, day.label("day")).subquery(name="booked_days")
+
+
+def booked_per_day(
+    bookings, sign: int = 1, date_from: date | None = None, date_to: date | None = None
+):
+    """Количество занятых единиц номера по дням (с учетом знака изменения), опционально за период"""
+    days = booked_days(bookings)
+    query = select(days.c.room_id, days.c.day, (func.count() * sign).label("booked"))
+    if date_from is not None:
+        query = query.filter(days.c.day >= date_from, days.c.day < date_to)
+    return query.group_by(days.c.room_id, days.c.day)
+
+
+def bookings_in_period(date_from: date | None = None, date_to: date | None = None):
+    """Бронирования, пересекающие период (все, если период не задан)"""
+    query = select(BookingsOrm.room_id, BookingsOrm.date_from, BookingsOrm.date_to)
+    if date_from is not None:
+        query = query.filter(stay_overlaps(date_from, date_to))
+    return query.subquery(name="bookings")
+
+
+class InventoryRepository(BaseRepository):
+    """
+    Календарь занятости номеров по дням. Обновляется BookingRepository в той же транзакции,
+    что и таблица бронирований, поэтому запросы доступности не сканируют bookings.
+    """
+
+    model = RoomsInventoryOrm
+
+    async def reserve(self, bookings: Iterable[tuple[int, date, date]]):
+        """Занимает по одной единице номера на каждый день переданных бронирований"""
+        await self._shift(bookings, sign=1)
+
+    async def release(self, bookings: Iterable[tuple[int, date, date]]):
+        """Освобождает дни переданных бронирований"""
+        await self._shift(bookings, sign=-1)
+
+    async def release_from(self, bookings):
+        """
+        Освобождает дни всех бронирований из selectable bookings
+        (колонки room_id, date_from, date_to), например отключаемой секции
+        """
+        availability_index.mark_changed(self.session)
+        await self._shift_from(bookings, sign=-1)
+
+    async def _shift(self, bookings: Iterable[tuple[int, date, date]], sign: int):
+        rows = [tuple(booking) for booking in bookings]
+        if not rows:
+            return
+        availability_index.mark_changed(self.session, {row[0] for row in rows})
+        changed = values(
+            column("room_id", BIGINT),
+            column("date_from", Date),
+            column("date_to", Date),
+            name="changed",
+        ).data(rows)
+        await self._shift_from(changed, sign)
+
+    async def _shift_from(self, bookings, sign: int):
+        upsert_stmt = insert(self.model).from_select(
+            ["room_id", "day", "booked"], booked_per_day(bookings, sign)
+        )
+        upsert_stmt = upsert_stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.day],
+            set_={"booked": self.model.booked + upsert_stmt.excluded.booked},
+        )
+        await self.session.execute(upsert_stmt)
+
+    async def rebuild(
+        self, date_from: date | None = None, date_to: date | None = None
+    ) -> None:
+        """Пересчитывает календарь по таблице бронирований, целиком или за период"""
+        availability_index.mark_changed(self.session)
+        delete_stmt = delete(self.model)
+        if date_from is not None:
+            delete_stmt = delete_stmt.filter(
+                self.model.day >= date_from, self.model.day < date_to
+            )
+        await self.session.execute(delete_stmt)
+        await self.session.execute(
+            insert(self.model).from_select(
+                ["room_id", "day", "booked"],
+                booked_per_day(
+                    bookings_in_period(date_from, date_to),
+                    date_from=date_from,
+                    date_to=date_to,
+                ),
+            )
+        )
+
+    async def verify(
+        self, date_from: date | None = None, date_to: date | None = None
+    ) -> list[InventoryDiscrepancy]:
+        """
+        Сверяет календарь с таблицей бронирований, целиком или за период.
+        :return: список расхождений, пустой если календарь корректен
+        """
+        expected = booked_per_day(
+            bookings_in_period(date_from, date_to), date_from=date_from, date_to=date_to
+        ).subquery(name="expected")
+        actual = select(self.model.room_id, self.model.day, self.model.booked).filter(
+            self.model.booked != 0
+        )
+        if date_from is not None:
+            actual = actual.filter(self.model.day >= date_from, self.model.day < date_to)
+        actual = actual.subquery(name="actual")
+        query = (
+            select(
+                func.coalesce(expected.c.room_id, actual.c.room_id).label("room_id"),
+                func.coalesce(expected.c.day, actual.c.day).label("day"),
+                func.coalesce(expected.c.booked, 0).label("expected"),
+                func.coalesce(actual.c.booked, 0).label("actual"),
+            )
+            .select_from(expected)
+            .join(
+                actual,
+                (expected.c.room_id == actual.c.room_id)
+                & (expected.c.day == actual.c.day),
+                full=True,
+            )
+            .filter(
+                func.coalesce(expected.c.booked, 0) != func.coalesce(actual.c.booked, 0)
+            )
+            .order_by("room_id", "day")
+        )
+        result = await self.session.execute(query)
+        return [InventoryDiscrepancy.model_validate(row._mapping) for row in result.all()]
@@ -1,6 +1,8 @@
-from typing import TypeVar
+from functools import cache
+from typing import Sequence, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect
 
 from src.database import Base
 
@@ -21,3 +23,30 @@ class DataMapper:
     @classmethod
     def map_to_model(cls, schema):
         return cls.db_model(**schema.model_dump())
+
+    @classmethod
+    @cache
+    def schema_columns(cls) -> list | None:
+        """
+        Колонки db_model для каждого поля схемы, подписанные именами полей.
+        None, если какое-то поле схемы не колонка (связь, вычисляемое значение):
+        такую схему можно собрать только из ORM-объекта.
+        """
+        columns = inspect(cls.db_model).columns
+        names = list(cls.schema.model_fields)
+        if not all(name in columns for name in names):
+            return None
+        return [columns[name].label(name) for name in names]
+
+    @classmethod
+    @cache
+    def list_adapter(cls) -> TypeAdapter:
+        return TypeAdapter(list[cls.schema])
+
+    # Собираем схемы из строк колонок schema_columns() одним вызовом pydantic-core
+    # для всего списка: без ORM-объектов, identity map и model_validate на каждую строку.
+    # Словари из zip быстрее, чем чтение атрибутов строк алхимии (from_attributes).
+    @classmethod
+    def map_rows_to_schemas(cls, rows: Sequence) -> list[SchemaType]:
+        names = list(cls.schema.model_fields)
+        return cls.list_adapter().validate_python([dict(zip(names, row)) for row in rows])
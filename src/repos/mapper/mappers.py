@@ -1,9 +1,11 @@
 from src.models import UsersOrm
 from src.models.bookings import BookingsOrm
+from src.models.cities import CitiesOrm
 from src.models.hotels import HotelsOrm
 from src.models.rooms import RoomsOrm
 from src.repos.mapper.base import DataMapper
 from src.schemas.bookings import Booking
+from src.schemas.cities import City
 from src.schemas.hotels import Hotel
 from src.schemas.rooms import Room, RoomWithRelationship
 from src.schemas.users import UserWithPassword
@@ -16,6 +18,11 @@ class HotelDataMapper(DataMapper):
     schema = Hotel
 
 
+class CityDataMapper(DataMapper):
+    db_model = CitiesOrm
+    schema = City
+
+
 class RoomsDataMapper(DataMapper):
     db_model = RoomsOrm
     schema = Room
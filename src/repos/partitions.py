@@ -0,0 +1,151 @@
+import re
+from datetime import date
+
+from sqlalchemy import text, table, column, Date, BIGINT
+
+from src.models.bookings import BookingsOrm
+from src.repos.base import BaseRepository
+from src.repos.inventory import InventoryRepository
+from src.schemas.partitions import BookingPartition
+
+ARCHIVE_SCHEMA = "bookings_archive"
+PARTITION_NAME_RE = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    """Первое число месяца, отстоящего от day на months месяцев"""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+class BookingPartitionsRepository(BaseRepository):
+    """
+    Управление месячными секциями таблицы bookings (PARTITION BY RANGE (date_from)).
+
+    Секция bookings_yYYYYmMM хранит бронирования с date_from в этом месяце,
+    все остальное попадает в секцию bookings_default.
+    """
+
+    model = BookingsOrm
+
+    def __init__(self, session):
+        super().__init__(session)
+        self.inventory = InventoryRepository(session)
+
+    @property
+    def table_name(self) -> str:
+        return self.model.__tablename__
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.table_name}_default"
+
+    def partition(self, month: date) -> BookingPartition:
+        return BookingPartition(
+            name=f"{self.table_name}_y{month.year}m{month.month:02d}",
+            date_from=month,
+            date_to=add_months(month, 1),
+        )
+
+    async def get_partitions(self) -> list[BookingPartition]:
+        """Месячные секции, подключенные к bookings, по возрастанию дат"""
+        query = text(
+            "select c.relname from pg_inherits i "
+            "join pg_class c on c.oid = i.inhrelid "
+            "where i.inhparent = cast(:table as regclass)"
+        )
+        result = await self.session.execute(query, {"table": self.table_name})
+        months = []
+        for name in result.scalars().all():
+            match = PARTITION_NAME_RE.search(name)
+            if match:
+                months.append(date(int(match[1]), int(match[2]), 1))
+        return [self.partition(month) for month in sorted(months)]
+
+    async def create_ahead(self, months_ahead: int, today: date | None = None) -> list[BookingPartition]:
+        """
+        Создает секции с текущего месяца на months_ahead месяцев вперед, а также
+        для месяцев, бронирования которых лежат в секции по умолчанию.
+        :return: созданные секции
+        """
+        first_month = month_start(today or date.today())
+        months = {add_months(first_month, i) for i in range(months_ahead + 1)}
+        result = await self.session.execute(
+            text(
+                f"select distinct cast(date_trunc('month', date_from) as date) "
+                f"from {self.default_partition}"
+            )
+        )
+        months.update(result.scalars().all())
+
+        existing = {partition.date_from for partition in await self.get_partitions()}
+        created = []
+        for month in sorted(months - existing):
+            partition = self.partition(month)
+            await self._create(partition)
+            created.append(partition)
+        return created
+
+    async def archive(self, before: date) -> list[BookingPartition]:
+        """
+        Отключает от bookings секции, целиком лежащие раньше before, и переносит их
+        в схему bookings_archive. Занятость по этим бронированиям снимается с календаря.
+        :return: архивированные секции
+        """
+        archived = []
+        for partition in await self.get_partitions():
+            if partition.date_to > before:
+                continue
+            await self.inventory.release_from(
+                table(
+                    partition.name,
+                    column("room_id", BIGINT),
+                    column("date_from", Date),
+                    column("date_to", Date),
+                )
+            )
+            await self.session.execute(
+                text(f"ALTER TABLE {self.table_name} DETACH PARTITION {partition.name}")
+            )
+            await self.session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            await self.session.execute(
+                text(f"ALTER TABLE {partition.name} SET SCHEMA {ARCHIVE_SCHEMA}")
+            )
+            archived.append(partition)
+        return archived
+
+    async def _create(self, partition: BookingPartition) -> None:
+        """
+        Создает секцию отдельной таблицей, переносит в нее строки месяца из секции
+        по умолчанию и только потом подключает: иначе ATTACH упадет на этих строках.
+        """
+        columns = ", ".join(
+            c.name for c in self.model.__table__.columns if c.computed is None
+        )
+        await self.session.execute(
+            text(
+                f"CREATE TABLE {partition.name} "
+                f"(LIKE {self.table_name} INCLUDING DEFAULTS INCLUDING GENERATED)"
+            )
+        )
+        await self.session.execute(
+            text(
+                f"WITH moved AS ("
+                f"    DELETE FROM {self.default_partition} "
+                f"    WHERE date_from >= :date_from AND date_from < :date_to "
+                f"    RETURNING {columns}"
+                f") "
+                f"INSERT INTO {partition.name} ({columns}) SELECT {columns} FROM moved"
+            ),
+            {"date_from": partition.date_from, "date_to": partition.date_to},
+        )
+        await self.session.execute(
+            text(
+                f"ALTER TABLE {self.table_name} ATTACH PARTITION {partition.name} "
+                f"FOR VALUES FROM ('{partition.date_from}') TO ('{partition.date_to}')"
+            )
+        )
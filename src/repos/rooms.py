@@ -1,42 +1,140 @@
 from datetime import date
+from functools import lru_cache
+from typing import Sequence
 
-from sqlalchemy import select
+from pydantic import BaseModel
+from sqlalchemy import select, bindparam, any_, BIGINT, Date
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import selectinload, joinedload  # noqa
 
 from src.exception import ObjectNotFoundException
+from src.init import availability_index
 from src.exception import check_date_correct
 from src.repos.base import BaseRepository
 from src.models.rooms import RoomsOrm
 from src.repos.mapper.mappers import RoomsDataMapper, RoomDataWithRelationshipMapper
-from src.repos.utils import rooms_ids_for_booking
+from src.repos.utils import facilities_condition, rooms_ids_for_booking, \
+    rooms_left_for_requests, split_facilities
+from src.schemas.rooms import AvailabilityRequest, RoomAvailability
 
 
 class RoomsRepository(BaseRepository):
     model = RoomsOrm
     mapper = RoomsDataMapper
 
-    async def get_filtered_by_time(self, hotel_id, date_from: date, date_to: date):
-        rooms_ids_to_get = rooms_ids_for_booking(date_from, date_to, hotel_id)
+    @classmethod
+    @lru_cache(maxsize=16)
+    def _filtered_by_time_statement(cls, by_index: bool, by_mask: bool, by_rest: bool):
+        """
+        Запрос свободных номеров отеля с параметрами вместо значений, один на форму фильтра:
+        по индексу свободных номеров или по календарю, с маской удобств и/или удобствами вне маски
+        """
+        if by_index:
+            free_filter = cls.model.id == any_(bindparam("free_rooms_ids", type_=ARRAY(BIGINT)))
+        else:
+            free_filter = cls.model.id.in_(
+                rooms_ids_for_booking(
+                    bindparam("date_from", type_=Date),
+                    bindparam("date_to", type_=Date),
+                    bindparam("hotel_id", type_=BIGINT),
+                )
+            )
+        return (
+            select(cls.model)
+            .options(selectinload(cls.model.facilities))
+            .filter(
+                free_filter,
+                facilities_condition(
+                    bindparam("facilities_mask", type_=BIGINT) if by_mask else None,
+                    bindparam("facilities_rest", type_=ARRAY(BIGINT)) if by_rest else None,
+                    bindparam("facilities_rest_count") if by_rest else None,
+                ),
+            )
+        )
+
+    async def get_filtered_by_time(
+        self, hotel_id, date_from: date, date_to: date, facilities_ids: list[int] | None = None
+    ):
         check_date_correct(date_from, date_to)
-        query = (
-            select(self.model)
-            .options(selectinload(self.model.facilities))
-            .filter(RoomsOrm.id.in_(rooms_ids_to_get))
+        free_rooms_ids = await availability_index.free_rooms_ids(
+            self.session, date_from, date_to, hotel_id
         )
+        mask, rest = split_facilities(facilities_ids or [])
+        query = self._filtered_by_time_statement(free_rooms_ids is not None, bool(mask), bool(rest))
+        params = {
+            "free_rooms_ids": free_rooms_ids,
+            "date_from": date_from,
+            "date_to": date_to,
+            "hotel_id": hotel_id,
+            "facilities_mask": mask,
+            "facilities_rest": rest,
+            "facilities_rest_count": len(rest),
+        }
 
-        result = await self.session.execute(query)
+        result = await self.session.execute(query, params)
         return [
             RoomDataWithRelationshipMapper.map_to_schema(model)
             for model in result.unique().scalars().all()
         ]
 
+    async def get_available_batch(
+        self, requests: list[AvailabilityRequest]
+    ) -> list[list[RoomAvailability]]:
+        """Свободные номера для каждого запроса (hotel_id, date_from, date_to) одним запросом к БД"""
+        query = rooms_left_for_requests(
+            [(r.hotel_id, r.date_from, r.date_to) for r in requests]
+        )
+        result = await self.session.execute(query)
+        available = [[] for _ in requests]
+        for idx, room, rooms_left in result.all():
+            available[idx].append(
+                RoomAvailability(
+                    **self.mapper.map_to_schema(room).model_dump(), rooms_left=rooms_left
+                )
+            )
+        return available
+
+    async def add(self, data: BaseModel) -> object:
+        room = await super().add(data)
+        availability_index.mark_changed(self.session, [room.id])
+        return room
+
+    async def add_bulk(
+        self, data: Sequence[BaseModel], returning: bool = False
+    ) -> list[int] | None:
+        ids = await super().add_bulk(data, returning)
+        availability_index.mark_changed(self.session, ids)
+        return ids
+
+    async def edit(self, data: BaseModel, **filter_by):
+        await super().edit(data, **filter_by)
+        self._mark_changed(**filter_by)
+
+    async def partially_edit(
+        self, data: BaseModel, exclude_unset: bool = True, **filter_by
+    ):
+        await super().partially_edit(data, exclude_unset=exclude_unset, **filter_by)
+        self._mark_changed(**filter_by)
+
+    async def delete(self, **filter_by):
+        await super().delete(**filter_by)
+        self._mark_changed(**filter_by)
+
+    def _mark_changed(self, **filter_by):
+        """Номер изменен: его количество или отель могли поменяться"""
+        availability_index.mark_changed(
+            self.session, [filter_by["id"]] if "id" in filter_by else None
+        )
+
     async def one_or_none1(self, **kwargs):
-        query = select(self.model).filter_by(**kwargs)
+        """Номер с удобствами: запрос номера и запрос его удобств (selectinload)"""
+        query = (
+            select(self.model)
+            .options(selectinload(self.model.facilities))
+            .filter_by(**kwargs)
+        )
         result = await self.session.execute(query)
         model = result.scalars().one_or_none()
         if model is None:
             raise ObjectNotFoundException
-
-        query = select(self.model).options(selectinload(self.model.facilities))
-        result = await self.session.execute(query)
         return RoomDataWithRelationshipMapper.map_to_schema(model)
@@ -0,0 +1,48 @@
+import re
+
+from sqlalchemy import func
+
+from src.models.hotels import HotelsOrm
+
+
+def escape_like(value: str) -> str:
+    """Экранирует % и _ в подстроке для LIKE/ILIKE (в Postgres по умолчанию ESCAPE '\\')"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def hotel_search_filters(title: str | None = None, location: str | None = None) -> list:
+    """
+    Условия поиска отелей, которые обслуживаются триграммными GIN-индексами:
+
+    title ilike '%<title>%'           -- ix_hotels_title_trgm
+    location ~* '\\y<location>\\y'     -- ix_hotels_location_trgm
+
+    Пользовательский ввод экранируется и ищется как текст, а не как шаблон или регулярное выражение.
+    Индекс используется для строк от трех символов, короче — полный просмотр, как и раньше.
+    """
+    filters = []
+    if title:
+        filters.append(HotelsOrm.title.ilike(f"%{escape_like(title)}%"))
+    if location:
+        filters.append(HotelsOrm.location.op("~*")(rf"\y{re.escape(location)}\y"))
+    return filters
+
+
+def hotel_search_rank(title: str | None = None, location: str | None = None):
+    """
+    Релевантность отеля поисковому запросу: сумма word_similarity по заданным полям,
+    чем ближе строка запроса к слову в названии/адресе, тем выше.
+    None, если искать нечего.
+    """
+    ranks = []
+    if title:
+        ranks.append(func.word_similarity(title, HotelsOrm.title))
+    if location:
+        ranks.append(func.word_similarity(location, HotelsOrm.location))
+    if not ranks:
+        return None
+    rank = ranks[0]
+    for other in ranks[1:]:
+        rank = rank + other
+    return rank
+
@@ -1,5 +1,5 @@
 from pydantic import EmailStr
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from src.repos.base import BaseRepository
 from src.models.users import UsersOrm
@@ -18,5 +18,10 @@ class UserRepository(BaseRepository):
         return user_with_password
         # return UserWithPassword.model_validate(model)
 
+    async def set_hashed_password(self, user_id: int, hashed_password: str):
+        """Замена хеша пароля: пересчет со схемой и стоимостью из текущих настроек"""
+        query = update(self.model).filter_by(id=user_id).values(hashed_password=hashed_password)
+        await self.session.execute(query)
+
 
 #
@@ -1,68 +1,304 @@
 from datetime import date
-from sqlalchemy import select, func
+from typing import Iterable
 
+from sqlalchemy import select, func, any_, and_, or_, literal, values, column, true
+from sqlalchemy import BIGINT, Date, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, DATERANGE
+
+from src.init import availability_index
 from src.models.bookings import BookingsOrm
+from src.models.facilities import RoomFacilitiesOrm
+from src.models.hotels import HotelsOrm
+from src.models.inventory import RoomsInventoryOrm
 from src.models.rooms import RoomsOrm
 
 
+# Удобства с id от 1 до FACILITIES_MASK_MAX_ID хранятся в rooms.facilities_mask
+FACILITIES_MASK_MAX_ID = 63
+
+
+def facilities_mask(facilities_ids: Iterable[int]) -> int:
+    """Битовая маска удобств, удобства вне маски пропускаются"""
+    mask = 0
+    for facility_id in facilities_ids:
+        if 1 <= facility_id <= FACILITIES_MASK_MAX_ID:
+            mask |= 1 << (facility_id - 1)
+    return mask
+
+
+def facilities_masks(rooms_ids: Iterable[int]):
+    """
+    Маски удобств номеров по rooms_facilities одним группирующим запросом:
+
+    select rooms_ids.id as room_id, coalesce(bit_or(1::bigint << (facilities_id - 1)), 0) as mask
+    from unnest(array[...]) as rooms_ids(id)
+    left join rooms_facilities on rooms_id = rooms_ids.id and facilities_id between 1 and 63
+    group by rooms_ids.id
+
+    Номера без удобств получают маску 0.
+    """
+    rooms = (
+        func.unnest(literal(list(rooms_ids), ARRAY(BIGINT)))
+        .table_valued("id")
+        .render_derived(name="rooms_ids")
+    )
+    return (
+        select(
+            rooms.c.id.label("room_id"),
+            func.coalesce(
+                func.bit_or(
+                    literal(1, BIGINT).op("<<")(RoomFacilitiesOrm.facilities_id - 1)
+                ),
+                0,
+            ).label("mask"),
+        )
+        .select_from(rooms)
+        .outerjoin(
+            RoomFacilitiesOrm,
+            and_(
+                RoomFacilitiesOrm.rooms_id == rooms.c.id,
+                RoomFacilitiesOrm.facilities_id.between(1, FACILITIES_MASK_MAX_ID),
+            ),
+        )
+        .group_by(rooms.c.id)
+        .subquery("masks")
+    )
+
+
+def split_facilities(facilities_ids: Iterable[int]) -> tuple[int, list[int]]:
+    """Маска удобств с id 1..63 и отсортированный список остальных id"""
+    facilities_ids = set(facilities_ids)
+    rest = sorted(f_id for f_id in facilities_ids if not 1 <= f_id <= FACILITIES_MASK_MAX_ID)
+    return facilities_mask(facilities_ids), rest
+
+
+def rooms_with_facilities_filter(facilities_ids: Iterable[int]):
+    """
+    Условие "у номера есть все удобства": одно побитовое И по rooms.facilities_mask
+
+    facilities_mask & 5 = 5
+
+    Удобства вне маски (id > 63) проверяются подзапросом по rooms_facilities.
+    """
+    mask, rest = split_facilities(facilities_ids)
+    return facilities_condition(
+        mask or None, literal(rest, ARRAY(BIGINT)) if rest else None, len(rest)
+    )
+
+
+def facilities_condition(mask=None, rest=None, rest_count=None):
+    """
+    Условие rooms_with_facilities_filter из готовых частей: маски и массива id вне маски
+    (значения или bindparam для кэшированных запросов, None — части нет).
+    Массив передается одним параметром, текст SQL не зависит от числа удобств.
+    """
+    filters = []
+    if mask is not None:
+        filters.append(RoomsOrm.facilities_mask.op("&")(mask) == mask)
+    if rest is not None:
+        rooms_ids = (
+            select(RoomFacilitiesOrm.rooms_id)
+            .filter(RoomFacilitiesOrm.facilities_id == any_(rest))
+            .group_by(RoomFacilitiesOrm.rooms_id)
+            .having(func.count(RoomFacilitiesOrm.facilities_id.distinct()) == rest_count)
+        )
+        filters.append(RoomsOrm.id.in_(rooms_ids))
+    return and_(true(), *filters)
+
+
+def stay_overlaps(date_from: date, date_to: date):
+    """
+    Бронирование пересекается с периодом [date_from, date_to):
+    stay && daterange(date_from, date_to), использует GiST-индекс ix_bookings_room_id_stay.
+    Условие date_from < date_to отсекает месячные секции bookings после периода.
+    """
+    return and_(
+        BookingsOrm.stay.overlaps(func.daterange(date_from, date_to, type_=DATERANGE)),
+        BookingsOrm.date_from < date_to,
+    )
+
+
 def rooms_ids_for_booking(
     date_from: date,
     date_to: date,
     hotel_id: int | None = None,
 ):
     """
-    with rooms_count as (
-        select room_id, count(*) as rooms_booked from bookings
-        where date_from <= '2024-11-30' and date_to >= '2024-10-02'
+    with rooms_booked as (
+        select room_id, max(booked) as rooms_booked from rooms_inventory
+        where day >= '2024-10-02' and day < '2024-11-30'
         group by room_id
-    ),
-    rooms_left_table as (
-        select rooms.id as room_id, quantity, quantity - coalesce(rooms_booked, 0) as room_left
-        from rooms
-        left join rooms_count on rooms.id = rooms_count.room_id
     )
-    select * from rooms_left_table
-    where room_left > 0
+    select rooms.id from rooms
+    left join rooms_booked on rooms.id = rooms_booked.room_id
+    where rooms.quantity - coalesce(rooms_booked, 0) > 0
     ;
-    """
 
-    # Используем CTE для подсчета забронированных комнат
-    rooms_count = (
-        select(BookingsOrm.room_id, func.count("*").label("rooms_booked"))
-        .select_from(BookingsOrm)
-        .filter(BookingsOrm.date_from <= date_from, BookingsOrm.date_to >= date_to)
-        .group_by(BookingsOrm.room_id)
-        .cte(name="rooms_count")
-    )
+    Свободна та комната, у которой минимальный остаток за период больше нуля,
+    поэтому достаточно максимума занятости по календарю rooms_inventory.
+    """
 
-    # Используем CTE для вычисления оставшихся комнат
-    rooms_left_table = (
+    # Используем CTE для максимальной занятости номера за период
+    rooms_booked = (
         select(
-            RoomsOrm.id.label("room_id"),
-            (RoomsOrm.quantity - func.coalesce(rooms_count.c.rooms_booked, 0)).label(
-                "room_left"
-            ),
+            RoomsInventoryOrm.room_id,
+            func.max(RoomsInventoryOrm.booked).label("rooms_booked"),
         )
+        .select_from(RoomsInventoryOrm)
+        .filter(RoomsInventoryOrm.day >= date_from, RoomsInventoryOrm.day < date_to)
+        .group_by(RoomsInventoryOrm.room_id)
+        .cte(name="rooms_booked")
+    )
+
+    # Основной запрос на выборку свободных комнат
+    rooms_ids_to_get = (
+        select(RoomsOrm.id)
         .select_from(RoomsOrm)
-        .outerjoin(rooms_count, RoomsOrm.id == rooms_count.c.room_id)
-        .cte(name="rooms_left_table")
+        .outerjoin(rooms_booked, RoomsOrm.id == rooms_booked.c.room_id)
+        .filter(RoomsOrm.quantity - func.coalesce(rooms_booked.c.rooms_booked, 0) > 0)
     )
 
     # Выбираем комнаты для отеля, если hotel_id передан
-    rooms_ids_for_hotel = select(RoomsOrm.id).select_from(RoomsOrm)
-
     if hotel_id is not None:
-        rooms_ids_for_hotel = rooms_ids_for_hotel.filter_by(hotel_id=hotel_id)
+        rooms_ids_to_get = rooms_ids_to_get.filter(RoomsOrm.hotel_id == hotel_id)
 
-    rooms_ids_for_hotel = rooms_ids_for_hotel.subquery(name="rooms_ids_for_hotel")
+    return rooms_ids_to_get
 
-    # Основной запрос на выборку свободных комнат
-    rooms_ids_to_get = (
-        select(rooms_left_table.c.room_id)
-        .select_from(rooms_left_table)
-        .filter(
-            rooms_left_table.c.room_left > 0,
-            rooms_left_table.c.room_id.in_(select(rooms_ids_for_hotel)),
+
+async def free_rooms_filter(
+    session, date_from: date, date_to: date, hotel_id: int | None = None
+):
+    """
+    Условие "номер свободен на период": по индексу в памяти, если он включен,
+    иначе подзапросом rooms_ids_for_booking
+    """
+    rooms_ids = await availability_index.free_rooms_ids(
+        session, date_from, date_to, hotel_id
+    )
+    if rooms_ids is None:
+        return RoomsOrm.id.in_(rooms_ids_for_booking(date_from, date_to, hotel_id))
+    return RoomsOrm.id == any_(literal(rooms_ids, ARRAY(BIGINT)))
+
+
+async def free_hotels_filter(
+    session, date_from: date, date_to: date, facilities_ids: list[int] | None = None
+):
+    """Условие "в отеле есть свободный номер на период" (со всеми удобствами facilities_ids)"""
+    if facilities_ids:
+        hotels_ids_to_get = select(RoomsOrm.hotel_id).filter(
+            await free_rooms_filter(session, date_from, date_to),
+            rooms_with_facilities_filter(facilities_ids),
+        )
+        return HotelsOrm.id.in_(hotels_ids_to_get)
+    hotels_ids = await availability_index.free_hotels_ids(session, date_from, date_to)
+    if hotels_ids is None:
+        hotels_ids_to_get = (
+            select(RoomsOrm.hotel_id)
+            .select_from(RoomsOrm)
+            .filter(RoomsOrm.id.in_(rooms_ids_for_booking(date_from, date_to)))
+        )
+        return HotelsOrm.id.in_(hotels_ids_to_get)
+    return HotelsOrm.id == any_(literal(hotels_ids, ARRAY(BIGINT)))
+
+
+def rooms_left_for_requests(requests: list[tuple[int, date, date]]):
+    """
+    Свободные номера сразу для нескольких запросов (hotel_id, date_from, date_to):
+
+    with requests (idx, hotel_id, date_from, date_to) as (values (0, 1, '2024-11-01', '2024-11-07'), ...)
+    select requests.idx, rooms.*, rooms.quantity - coalesce(max(booked), 0) as rooms_left
+    from requests
+    join rooms on rooms.hotel_id = requests.hotel_id
+    left join rooms_inventory on rooms_inventory.room_id = rooms.id
+        and day >= requests.date_from and day < requests.date_to
+    group by requests.idx, rooms.id
+    having rooms.quantity - coalesce(max(booked), 0) > 0
+    order by requests.idx, rooms.id
+    ;
+
+    idx — номер запроса в переданном списке.
+    """
+    requests_values = values(
+        column("idx", Integer),
+        column("hotel_id", BIGINT),
+        column("date_from", Date),
+        column("date_to", Date),
+        name="requests",
+    ).data([(idx, *request) for idx, request in enumerate(requests)])
+    rooms_left = RoomsOrm.quantity - func.coalesce(func.max(RoomsInventoryOrm.booked), 0)
+    return (
+        select(requests_values.c.idx, RoomsOrm, rooms_left.label("rooms_left"))
+        .select_from(requests_values)
+        .join(RoomsOrm, RoomsOrm.hotel_id == requests_values.c.hotel_id)
+        .outerjoin(
+            RoomsInventoryOrm,
+            and_(
+                RoomsInventoryOrm.room_id == RoomsOrm.id,
+                RoomsInventoryOrm.day >= requests_values.c.date_from,
+                RoomsInventoryOrm.day < requests_values.c.date_to,
+            ),
         )
+        .group_by(requests_values.c.idx, RoomsOrm.id)
+        .having(rooms_left > 0)
+        .order_by(requests_values.c.idx, RoomsOrm.id)
     )
-    return rooms_ids_to_get
+
+
+def rooms_left_subquery(
+    date_from: date, date_to: date, facilities_ids: list[int] | None = None
+):
+    """
+    Свободные номера за период с остатком единиц (по календарю rooms_inventory):
+
+    select rooms.id, rooms.hotel_id, rooms.price, rooms.quantity - coalesce(max(booked), 0) as rooms_left
+    from rooms left join rooms_inventory on room_id = rooms.id and day >= '2024-11-01' and day < '2024-11-07'
+    group by rooms.id
+    having rooms.quantity - coalesce(max(booked), 0) > 0
+    """
+    rooms_left = RoomsOrm.quantity - func.coalesce(func.max(RoomsInventoryOrm.booked), 0)
+    query = (
+        select(RoomsOrm.id, RoomsOrm.hotel_id, RoomsOrm.price, rooms_left.label("rooms_left"))
+        .outerjoin(
+            RoomsInventoryOrm,
+            and_(
+                RoomsInventoryOrm.room_id == RoomsOrm.id,
+                RoomsInventoryOrm.day >= date_from,
+                RoomsInventoryOrm.day < date_to,
+            ),
+        )
+        .group_by(RoomsOrm.id)
+        .having(rooms_left > 0)
+    )
+    if facilities_ids:
+        query = query.filter(rooms_with_facilities_filter(facilities_ids))
+    return query.subquery("free_rooms")
+
+
+def hotels_stats_subquery(
+    date_from: date, date_to: date, facilities_ids: list[int] | None = None
+):
+    """
+    Сводка по свободным номерам отеля за период одним группирующим запросом:
+    минимальная цена, число свободных типов номеров и сколько всего единиц осталось.
+    В сводку попадают только отели, где есть свободный номер.
+    """
+    free_rooms = rooms_left_subquery(date_from, date_to, facilities_ids)
+    return (
+        select(
+            free_rooms.c.hotel_id,
+            func.min(free_rooms.c.price).label("min_price"),
+            func.count().label("room_types_available"),
+            func.sum(free_rooms.c.rooms_left).label("rooms_left"),
+        )
+        .group_by(free_rooms.c.hotel_id)
+        .subquery("hotels_stats")
+    )
+
+
+def after_sort_key(key, last_key, id_column, last_id: int, descending: bool = False):
+    """
+    Строки после (last_key, last_id) в порядке key [desc], id — для курсорной пагинации
+    по неуникальному ключу сортировки
+    """
+    beyond = key < last_key if descending else key > last_key
+    return or_(beyond, and_(key == last_key, id_column > last_id))
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 from datetime import date
@@ -19,3 +21,19 @@ class BookingAdd(BaseModel):
 
 class Booking(BookingAdd):
     id: int
+
+
+BookingChangeOp = Literal["insert", "update", "delete"]
+
+
+class BookingChange(BaseModel):
+    booking_id: int
+    op: BookingChangeOp
+    # Текущее состояние бронирования, None — если оно уже удалено
+    booking: Booking | None = None
+
+
+class BookingChangesPage(BaseModel):
+    changes: list[BookingChange]
+    # Курсор для следующего запроса ленты (since), None — изменений еще не было
+    next_cursor: str | None = None
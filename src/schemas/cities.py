@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class CityAdd(BaseModel):
+    name: str = Field(description="Название города")
+
+
+class City(CityAdd):
+    id: int
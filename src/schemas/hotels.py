@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -8,8 +10,24 @@ class HotelAdd(BaseModel):
 
 class Hotel(HotelAdd):
     id: int
+    city_id: int | None = None
 
 
 class HotelPATCH(BaseModel):
     title: str | None = Field(None, description="Описание отеля")
     location: str | None = Field(None, description="Адрес отеля")
+
+
+class HotelWithStats(Hotel):
+    min_price: int = Field(description="Минимальная цена свободного номера")
+    room_types_available: int = Field(description="Свободных типов номеров")
+    rooms_left: int = Field(description="Свободных единиц номеров всего")
+
+
+class HotelsPage(BaseModel):
+    hotels: list[HotelWithStats | Hotel]
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы")
+
+
+# Сортировка списка отелей: по минимальной цене свободного номера, "-" — по убыванию
+HotelsSort = Literal["price", "-price"]
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class ImportLineError(BaseModel):
+    line: int = Field(description="Номер строки файла")
+    error: str
+
+
+class ImportResult(BaseModel):
+    imported: int = Field(description="Загружено записей")
+    errors_total: int = Field(description="Всего строк с ошибками")
+    errors: list[ImportLineError] = Field(description="Первые ошибки по строкам")
@@ -0,0 +1,10 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class InventoryDiscrepancy(BaseModel):
+    room_id: int = Field(description="ID номера")
+    day: date = Field(description="День")
+    expected: int = Field(description="Занято по таблице бронирований")
+    actual: int = Field(description="Занято по календарю")
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    # Сессии, которые прямо сейчас ждут соединение
+    waiting: int
+    checkouts: int
+    checkout_avg_ms: float
+    checkout_max_ms: float
+
+
+class AdmissionStats(BaseModel):
+    # Сколько запросов одновременно работают с базой
+    capacity: int
+    active: int
+    waiting: int
+    max_waiting: int
+    # Отказано сразу (очередь полна) и по таймауту ожидания
+    rejected: int
+    timed_out: int
+
+
+class DBStats(BaseModel):
+    pool: PoolStats
+    replicas: dict[str, PoolStats]
+    admission: AdmissionStats
+
+
+class ExecutorStats(BaseModel):
+    workers: int
+    max_queue: int
+    # Выполняются и ждут в очереди
+    pending: int
+    completed: int
+    # Отказано сразу: очередь полна
+    rejected: int
+
+
+class LoopBlock(BaseModel):
+    at: datetime
+    lag_ms: float
+    # Задача asyncio и стек кода, который держал event loop (пусто, если сторож не успел снять)
+    task: str | None
+    stack: list[str]
+
+
+class LoopMonitorStats(BaseModel):
+    running: bool
+    interval_ms: float
+    threshold_ms: float
+    max_lag_ms: float
+    blocks_total: int
+    # Последние блокировки, от старых к новым
+    blocks: list[LoopBlock]
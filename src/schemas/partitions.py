@@ -0,0 +1,9 @@
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class BookingPartition(BaseModel):
+    name: str = Field(description="Имя секции")
+    date_from: date = Field(description="Первый день месяца (включительно)")
+    date_to: date = Field(description="Первый день следующего месяца (не включительно)")
@@ -1,3 +1,5 @@
+from datetime import date
+
 from pydantic import BaseModel, Field
 
 from src.schemas.facilities import Facilities
@@ -27,6 +29,20 @@ class RoomWithRelationship(Room):
     facilities: list[Facilities]
 
 
+class RoomAvailability(Room):
+    rooms_left: int = Field(description="Свободно единиц номера на весь период")
+
+
+class AvailabilityRequest(BaseModel):
+    hotel_id: int = Field(description="ID отеля")
+    date_from: date = Field(description="Дата заезда")
+    date_to: date = Field(description="Дата выезда")
+
+
+class AvailabilityResult(AvailabilityRequest):
+    rooms: list[RoomAvailability] = Field(description="Свободные номера")
+
+
 class RoomsPatchRequest(BaseModel):
     title: str | None = Field(None, description="Название комнаты")
     description: str | None = Field(None, description="Описание комнаты")
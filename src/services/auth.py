@@ -1,16 +1,41 @@
-from passlib.context import CryptContext
 import jwt
 from datetime import datetime, timezone, timedelta
 from fastapi import HTTPException
 from src.config import settings
+from src.init import password_hasher
+from src.utils.password_hashing import calibrate_rounds, crypt_context
 from src.services.base import BaseService
 
 
 
 class AuthService(BaseService):
-    # Создаем экземпляр класса CryptContext с алгоритмом bcrypt и автоматической проверкой на устаревание хеширования
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Экземпляр CryptContext со схемой из настроек и автоматической проверкой на устаревание хеширования.
+    # При старте приложения пересоздается со стоимостью, подобранной configure_hashing
+    pwd_context = crypt_context(
+        settings.AUTH_HASH_SCHEME,
+        settings.AUTH_HASH_ROUNDS,
+        settings.AUTH_ARGON2_MEMORY_KIB,
+        pinned=settings.AUTH_HASH_ROUNDS is not None,
+    )
 
+    @classmethod
+    async def configure_hashing(cls):
+        """
+        Стоимость хеша: AUTH_HASH_ROUNDS или подбор под AUTH_HASH_TARGET_MS в пуле потоков.
+        Подобранная стоимость только повышает стоимость старых хешей, но не понижает
+        """
+        rounds = settings.AUTH_HASH_ROUNDS
+        pinned = rounds is not None
+        if not pinned:
+            rounds = await password_hasher.run(
+                calibrate_rounds,
+                settings.AUTH_HASH_SCHEME,
+                settings.AUTH_HASH_TARGET_MS,
+                settings.AUTH_ARGON2_MEMORY_KIB,
+            )
+        cls.pwd_context = crypt_context(
+            settings.AUTH_HASH_SCHEME, rounds, settings.AUTH_ARGON2_MEMORY_KIB, pinned=pinned
+        )
 
     def create_access_token(self, data: dict) -> str:
         """Создание JWT-токена доступа"""
@@ -28,15 +53,30 @@ class AuthService(BaseService):
         )
         return encoded_jwt
 
-    def hash_password(self, password: str) -> str:
-        """Хеширование пароля"""
+    async def hash_password(self, password: str) -> str:
+        """
+        Хеширование пароля. bcrypt занимает процессор на десятки миллисекунд, поэтому
+        выполняется в пуле потоков password_hasher, при заполненной очереди —
+        ExecutorOverloadedException
+        """
         # Хешируем пароль при помощи CryptContext обратившись к методу hash
-        return self.pwd_context.hash(password)
+        return await password_hasher.run(self.pwd_context.hash, password)
 
-    def verify_password(self, plain_password, hashed_password):
-        """Проверка пароля"""
+    async def verify_password(self, plain_password, hashed_password) -> bool:
+        """Проверка пароля в пуле потоков password_hasher, как и хеширование"""
         # Проверяем пароль при помощи CryptContext обратившись к методу verify
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await password_hasher.run(
+            self.pwd_context.verify, plain_password, hashed_password
+        )
+
+    async def verify_and_update(self, plain_password, hashed_password) -> tuple[bool, str | None]:
+        """
+        Проверка пароля и новый хеш, если у старого устарели схема или стоимость (иначе None).
+        Пересчитать хеш можно только сейчас, пока известен пароль
+        """
+        return await password_hasher.run(
+            self.pwd_context.verify_and_update, plain_password, hashed_password
+        )
 
     def decode_access_token(self, token: str) -> dict:
         """Декодирование JWT-токена доступа"""
@@ -1,8 +1,10 @@
 from datetime import date
 
 from src.exception import check_date_correct, ObjectNotFoundException, HotelNotFoundException
-from src.schemas.hotels import HotelAdd, HotelPATCH, Hotel
+from src.schemas.hotels import HotelAdd, HotelPATCH, Hotel, HotelsPage, HotelsSort
+from src.schemas.imports import ImportResult, ImportLineError
 from src.services.base import BaseService
+from src.utils.imports import ImportFormat, import_records, read_records, write_chunk
 
 
 class HotelsService(BaseService):
@@ -14,7 +16,11 @@ class HotelsService(BaseService):
             date_to: date,
             location: str | None = None,
             title: str | None = None,
-    ):
+            city_id: int | None = None,
+            facilities_ids: list[int] | None = None,
+            with_stats: bool = False,
+            sort: HotelsSort | None = None,
+    ) -> HotelsPage:
         check_date_correct(date_from, date_to)
         page_size = pagination.page_size or 3
         return await self.db.hotels.get_filtered_by_time(
@@ -24,17 +30,39 @@ class HotelsService(BaseService):
             title=title,
             limit=page_size,
             offset=page_size * (pagination.page_number - 1),
+            cursor=pagination.cursor,
+            city_id=city_id,
+            facilities_ids=facilities_ids,
+            with_stats=with_stats,
+            sort=sort,
         )
 
 
     async def get_hotel(self, hotel_id: int):
         return await self.db.hotels.one_or_none(id=hotel_id)
 
+    def stream_hotels(self, **filter_by):
+        """Все отели пачками через серверный курсор (для выгрузок)"""
+        return self.db.hotels.stream_filtered(**filter_by)
+
     async def add_hotels(self, hotel_data: list[HotelAdd]):
         result = await self.db.hotels.add(hotel_data)
         await self.db.commit()
         return result
 
+    async def import_hotels(self, chunks, format: ImportFormat) -> ImportResult:
+        """Потоковая загрузка отелей из NDJSON/CSV пачками в одной транзакции"""
+
+        async def write(chunk: list[tuple[int, HotelAdd]]):
+            await self.db.hotels.add_bulk([hotel for _, hotel in chunk])
+
+        async def save(chunk: list[tuple[int, HotelAdd]]) -> list[ImportLineError]:
+            return await write_chunk(self.db.session, chunk, write)
+
+        result = await import_records(read_records(chunks, format), HotelAdd, save)
+        await self.db.commit()
+        return result
+
     async def edit_hotel(self, hotel_id: int, hotel_data: HotelAdd):
         await self.db.hotels.edit(hotel_data, id=hotel_id)
         await self.db.commit()
@@ -7,7 +7,9 @@ from src.tasks.tasks import test_task, resize_image
 
 
 class ImagesService(BaseService):
-    def upload_image(self, image_path: str, file: UploadFile):
+    def upload_image(self, file: UploadFile):
+        # Синхронное чтение и копирование файла: вызывается из def-обработчика в пуле потоков,
+        # из async-обработчика — только через run_in_threadpool, иначе блокирует event loop
         image_path = f"src/static/images/{file.filename}"
         with NamedTemporaryFile() as tmp_file:
             tmp_file.write(file.file.read())
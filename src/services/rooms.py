@@ -3,8 +3,11 @@ from datetime import date
 from src.exception import check_date_correct, ObjectNotFoundException, HotelNotFoundException, \
     ObjectAlreadyExistsException, RoomsNotFoundException
 from src.schemas.facilities import RoomFacilityAdd
-from src.schemas.rooms import RoomsAdd, RoomsAddRequest, RoomsPatchRequest, RoomsPatch, Room
+from src.schemas.rooms import RoomsAdd, RoomsAddRequest, RoomsPatchRequest, RoomsPatch, Room, \
+    AvailabilityRequest, AvailabilityResult
+from src.schemas.imports import ImportResult, ImportLineError
 from src.services.base import BaseService
+from src.utils.imports import ImportFormat, import_records, read_records, write_chunk
 from src.services.hotels import HotelsService
 
 
@@ -13,13 +16,29 @@ class RoomService(BaseService):
             self,
             hotel_id: id,
             date_from: date,
-            date_to: date
+            date_to: date,
+            facilities_ids: list[int] | None = None,
     ):
         check_date_correct(date_from, date_to)
         return await self.db.rooms.get_filtered_by_time(
-                hotel_id=hotel_id, date_from=date_from, date_to=date_to
+                hotel_id=hotel_id, date_from=date_from, date_to=date_to,
+                facilities_ids=facilities_ids,
         )
 
+    async def get_available_batch(
+            self,
+            requests: list[AvailabilityRequest]
+    ) -> list[AvailabilityResult]:
+        for request in requests:
+            check_date_correct(request.date_from, request.date_to)
+        if not requests:
+            return []
+        available = await self.db.rooms.get_available_batch(requests)
+        return [
+            AvailabilityResult(**request.model_dump(), rooms=rooms)
+            for request, rooms in zip(requests, available)
+        ]
+
     async def get_room(self, room_id: int, hotel_id: int):
         return await self.db.rooms.one_or_none1(id=room_id, hotel_id=hotel_id)
 
@@ -49,6 +68,50 @@ class RoomService(BaseService):
         await self.db.commit()
 
 
+    async def import_rooms(self, hotel_id: int, chunks, format: ImportFormat) -> ImportResult:
+        """Потоковая загрузка номеров отеля из NDJSON/CSV пачками в одной транзакции"""
+        try:
+            await self.db.hotels.one_or_none(id=hotel_id)
+        except ObjectNotFoundException as ex:
+            raise HotelNotFoundException from ex
+        facilities_ids = {facility.id for facility in await self.db.facilities.get_all()}
+
+        async def write(chunk: list[tuple[int, RoomsAddRequest]]):
+            rooms = [room for _, room in chunk]
+            rooms_ids = await self.db.rooms.add_bulk(
+                [
+                    RoomsAdd(hotel_id=hotel_id, **room.model_dump(exclude={"facilities_ids"}))
+                    for room in rooms
+                ],
+                returning=True,
+            )
+            links = [
+                RoomFacilityAdd(rooms_id=room_id, facilities_id=facility_id)
+                for room_id, room in zip(rooms_ids, rooms)
+                for facility_id in set(room.facilities_ids or [])
+            ]
+            if links:
+                await self.db.rooms_facilities.add_bulk(links)
+
+        async def save(chunk: list[tuple[int, RoomsAddRequest]]) -> list[ImportLineError]:
+            errors, rooms = [], []
+            for line_no, room in chunk:
+                unknown = set(room.facilities_ids or []) - facilities_ids
+                if unknown:
+                    errors.append(
+                        ImportLineError(line=line_no, error=f"нет удобств с id {sorted(unknown)}")
+                    )
+                else:
+                    rooms.append((line_no, room))
+            if not rooms:
+                return errors
+            return errors + await write_chunk(self.db.session, rooms, write)
+
+        records = read_records(chunks, format, list_fields={"facilities_ids"})
+        result = await import_records(records, RoomsAddRequest, save)
+        await self.db.commit()
+        return result
+
     async def edit_room(self, hotel_id: int, room_id: int, room_data: RoomsAddRequest):
         await HotelsService(self.db).get_hotel(hotel_id)
         await self.get_room_with_check(room_id)
@@ -2,6 +2,7 @@ from celery import Celery
 
 
 from src.config import settings
+from src.utils.metrics import install_celery_metrics
 
 
 celery_app_instance = Celery(
@@ -13,12 +14,19 @@ celery_app_instance = Celery(
     backend=settings.REDIS_URL,
 )
 
+# Время задач в метриках Prometheus (см. src/utils/metrics.py)
+install_celery_metrics()
+
 # С помощью beat_schedule вы задаёте, какие задачи и с какой периодичностью должны выполняться.
 celery_app_instance.conf.beat_schedule = {
     "luboe-nazvanie": {
         "task": "booking_to_day_checkin",
         "schedule": 30,
     },
+    "bookings-partitions": {
+        "task": "manage_bookings_partitions",
+        "schedule": 60 * 60 * 24,
+    },
 }
 
 # Запуск celery --app=src.tasks.celery_app:celery_app_instance worker
@@ -1,10 +1,13 @@
 import asyncio
 import logging
+from datetime import date
 from time import sleep
 from PIL import Image
 import os
 
+from src.config import settings
 from src.database import async_session_null_pool
+from src.repos.partitions import add_months, month_start
 from src.tasks.celery_app import celery_app_instance
 from src.utils.db_manager import DBManager
 
@@ -69,3 +72,35 @@ def send_email_to_users_with_to_day_checkin():
     :return:
     """
     asyncio.run(get_bookings_with_to_day_checkin_helper())
+
+
+async def manage_bookings_partitions_helper():
+    """
+    Создает секции bookings на BOOKINGS_PARTITIONS_AHEAD_MONTHS месяцев вперед
+    и отправляет в архив секции старше BOOKINGS_ARCHIVE_AFTER_MONTHS месяцев
+    """
+    async with DBManager(session_factory=async_session_null_pool) as db:
+        created = await db.bookings_partitions.create_ahead(
+            settings.BOOKINGS_PARTITIONS_AHEAD_MONTHS
+        )
+        archived = []
+        if settings.BOOKINGS_ARCHIVE_AFTER_MONTHS is not None:
+            archived = await db.bookings_partitions.archive(
+                before=add_months(
+                    month_start(date.today()), -settings.BOOKINGS_ARCHIVE_AFTER_MONTHS
+                )
+            )
+        await db.commit()
+    logging.info(
+        f"Секции bookings: создано {[p.name for p in created]}, "
+        f"в архиве {[p.name for p in archived]}"
+    )
+
+
+@celery_app_instance.task(name="manage_bookings_partitions")
+def manage_bookings_partitions():
+    """
+    задача на ежедневное обслуживание секций таблицы бронирований. (Настройка в celery_app.py)
+    :return:
+    """
+    asyncio.run(manage_bookings_partitions_helper())
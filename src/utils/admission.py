@@ -0,0 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from src.exception import DatabaseOverloadedException
+from src.schemas.metrics import AdmissionStats
+
+
+class AdmissionGate:
+    """
+    Допуск запросов к базе: не больше capacity одновременно, остальные ждут в очереди
+    не дольше timeout. Если в очереди уже max_waiting запросов, новый получает отказ сразу,
+    а не копится на пуле соединений до pool_timeout.
+    """
+
+    def __init__(self, capacity: int, max_waiting: int, timeout: float):
+        self.capacity = capacity
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._semaphore = asyncio.Semaphore(capacity)
+
+    async def acquire(self):
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise DatabaseOverloadedException
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except TimeoutError:
+            self.timed_out += 1
+            raise DatabaseOverloadedException
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            capacity=self.capacity,
+            active=self.active,
+            waiting=self.waiting,
+            max_waiting=self.max_waiting,
+            rejected=self.rejected,
+            timed_out=self.timed_out,
+        )
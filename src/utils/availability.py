@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import uuid
+from array import array
+from collections import defaultdict
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import select
+
+from src.models.inventory import RoomsInventoryOrm
+from src.models.rooms import RoomsOrm
+
+AVAILABILITY_CHANNEL = "availability:invalidate"
+
+# Ключи в session.info, куда репозитории складывают изменения до коммита
+CHANGED_ROOMS_KEY = "availability_changed_rooms"
+CHANGED_ALL_KEY = "availability_changed_all"
+
+
+class RoomCalendar:
+    """
+    Занятость одного номера в памяти.
+    booked[i] — сколько единиц номера занято в день с ординалом start + i.
+    """
+
+    __slots__ = ("hotel_id", "quantity", "start", "booked")
+
+    def __init__(self, hotel_id: int, quantity: int, days: Iterable[tuple[date, int]] = ()):
+        self.hotel_id = hotel_id
+        self.quantity = quantity
+        days = [(day.toordinal(), booked) for day, booked in days]
+        if not days:
+            self.start = 0
+            self.booked = array("i")
+            return
+        self.start = min(day for day, _ in days)
+        self.booked = array("i", [0]) * (max(day for day, _ in days) - self.start + 1)
+        for day, booked in days:
+            self.booked[day - self.start] = booked
+
+    def is_free(self, start: int, stop: int) -> bool:
+        """Есть ли свободная единица номера в каждый день [start, stop) (ординалы дат)"""
+        lo = max(start - self.start, 0)
+        hi = min(stop - self.start, len(self.booked))
+        return self.quantity - max(self.booked[lo:hi], default=0) > 0
+
+
+class AvailabilityIndex:
+    """
+    Индекс свободных номеров в памяти процесса.
+
+    Загружается из rooms и rooms_inventory при первом запросе. После коммита DBManager
+    публикует в Redis идентификаторы измененных номеров, и каждый воркер перечитывает
+    из Postgres только их при следующем запросе.
+    """
+
+    def __init__(self, redis_manager, enabled: bool = False):
+        self.redis_manager = redis_manager
+        self.enabled = enabled
+        self.origin = uuid.uuid4().hex
+        self._rooms: dict[int, RoomCalendar] | None = None
+        self._hotels: dict[int, set[int]] = defaultdict(set)
+        self._dirty: set[int] = set()
+        self._generation = 0
+        self._loaded_generation = 0
+        self._lock = asyncio.Lock()
+
+    async def free_rooms_ids(
+        self, session, date_from: date, date_to: date, hotel_id: int | None = None
+    ) -> list[int] | None:
+        """Свободные номера за период, None если индекс выключен"""
+        if not self.enabled:
+            return None
+        rooms = await self._fresh_rooms(session)
+        rooms_ids = rooms.keys() if hotel_id is None else self._hotels.get(hotel_id, ())
+        start, stop = date_from.toordinal(), date_to.toordinal()
+        return [room_id for room_id in rooms_ids if rooms[room_id].is_free(start, stop)]
+
+    async def free_hotels_ids(
+        self, session, date_from: date, date_to: date
+    ) -> list[int] | None:
+        """Отели, в которых есть свободный номер за период, None если индекс выключен"""
+        if not self.enabled:
+            return None
+        rooms = await self._fresh_rooms(session)
+        start, stop = date_from.toordinal(), date_to.toordinal()
+        return [
+            hotel_id
+            for hotel_id, rooms_ids in self._hotels.items()
+            if any(rooms[room_id].is_free(start, stop) for room_id in rooms_ids)
+        ]
+
+    def mark_changed(self, session, rooms_ids: Iterable[int] | None = None) -> None:
+        """Запоминает измененные номера до коммита сессии, None — изменилось все"""
+        if not self.enabled:
+            return
+        if rooms_ids is None:
+            session.info[CHANGED_ALL_KEY] = True
+        else:
+            session.info.setdefault(CHANGED_ROOMS_KEY, set()).update(rooms_ids)
+
+    async def publish_changes(self, session) -> None:
+        """Вызывается после коммита: инвалидирует свой индекс и оповещает остальные воркеры"""
+        rooms_ids = session.info.pop(CHANGED_ROOMS_KEY, set())
+        changed_all = session.info.pop(CHANGED_ALL_KEY, False)
+        if not self.enabled or not (rooms_ids or changed_all):
+            return
+        rooms_ids = None if changed_all else sorted(rooms_ids)
+        self.invalidate(rooms_ids)
+        await self.redis_manager.publish(
+            AVAILABILITY_CHANNEL, json.dumps({"origin": self.origin, "rooms": rooms_ids})
+        )
+
+    def invalidate(self, rooms_ids: Iterable[int] | None = None) -> None:
+        """Помечает номера устаревшими, None — сбросить индекс целиком"""
+        if rooms_ids is None:
+            self._generation += 1
+        else:
+            self._dirty.update(rooms_ids)
+
+    async def listen(self) -> None:
+        """Слушает канал инвалидации от других воркеров, пока приложение работает"""
+        while True:
+            try:
+                pubsub = self.redis_manager.redis.pubsub()
+                await pubsub.subscribe(AVAILABILITY_CHANNEL)
+                # Пока не были подписаны, могли пропустить изменения
+                self.invalidate()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if data["origin"] != self.origin:
+                        self.invalidate(data["rooms"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Ошибка подписки на канал {AVAILABILITY_CHANNEL}: {e}")
+                await asyncio.sleep(self.redis_manager.retry_delay)
+
+    async def _fresh_rooms(self, session) -> dict[int, RoomCalendar]:
+        async with self._lock:
+            if self._rooms is None or self._loaded_generation != self._generation:
+                # Сброс, пришедший во время загрузки, вызовет повторную загрузку
+                self._loaded_generation = self._generation
+                self._dirty = set()
+                rooms = await self._load(session)
+                self._rooms = {}
+                self._hotels = defaultdict(set)
+                self._apply(rooms, rooms.keys())
+            elif self._dirty:
+                rooms_ids, self._dirty = self._dirty, set()
+                self._apply(await self._load(session, rooms_ids), rooms_ids)
+            return self._rooms
+
+    async def _load(self, session, rooms_ids: set[int] | None = None) -> dict[int, RoomCalendar]:
+        rooms_query = select(RoomsOrm.id, RoomsOrm.hotel_id, RoomsOrm.quantity)
+        days_query = select(
+            RoomsInventoryOrm.room_id, RoomsInventoryOrm.day, RoomsInventoryOrm.booked
+        ).filter(RoomsInventoryOrm.booked != 0)
+        if rooms_ids is not None:
+            rooms_query = rooms_query.filter(RoomsOrm.id.in_(rooms_ids))
+            days_query = days_query.filter(RoomsInventoryOrm.room_id.in_(rooms_ids))
+
+        days = defaultdict(list)
+        for room_id, day, booked in (await session.execute(days_query)).all():
+            days[room_id].append((day, booked))
+        return {
+            room_id: RoomCalendar(hotel_id, quantity, days[room_id])
+            for room_id, hotel_id, quantity in (await session.execute(rooms_query)).all()
+        }
+
+    def _apply(self, rooms: dict[int, RoomCalendar], rooms_ids: Iterable[int]) -> None:
+        """Заменяет в индексе номера rooms_ids на загруженные (отсутствующие удаляются)"""
+        for room_id in rooms_ids:
+            old = self._rooms.pop(room_id, None)
+            if old is not None:
+                self._hotels[old.hotel_id].discard(room_id)
+            new = rooms.get(room_id)
+            if new is not None:
+                self._rooms[room_id] = new
+                self._hotels[new.hotel_id].add(room_id)
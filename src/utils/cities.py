@@ -0,0 +1,147 @@
+import asyncio
+import bisect
+import logging
+import re
+from typing import Iterable
+
+from sqlalchemy import select
+
+from src.models.cities import CITY_NAME_MAX_LENGTH, CitiesOrm
+from src.schemas.cities import City
+
+# Ключ в session.info, куда репозиторий складывает новые города до коммита
+ADDED_CITIES_KEY = "cities_added"
+
+# Части адреса, обозначающие населенный пункт, и их префиксы
+SETTLEMENT_PREFIXES = (
+    "посёлок городского типа",
+    "поселок городского типа",
+    "город",
+    "посёлок",
+    "поселок",
+    "село",
+    "деревня",
+    "станица",
+    "пгт",
+    "пос.",
+    "г.",
+    "с.",
+)
+# Части адреса выше уровня населенного пункта
+REGION_WORDS = ("республика", "область", "край", "район", "округ")
+STREET_RE = re.compile(r"^(ул\.|улица\b|пр\.|проспект\b|пер\.|переулок\b|шоссе\b|наб\.)|\d")
+
+
+def parse_city(location: str) -> str | None:
+    """
+    Название населенного пункта из адреса отеля.
+
+    Адрес разбирается по запятым: берется часть с префиксом населенного пункта
+    ("город", "село", "пгт"...), иначе первая часть, не похожая на регион или улицу.
+    "Республика Алтай, Майминский район, село Урлу-Аспак, ..." -> "Урлу-Аспак"
+    "Сочи,ул.Красная, 5" -> "Сочи"
+
+    Название длиннее столбца cities.name не возвращается: адрес отеля не ограничен по длине,
+    и такой отель сохраняется без города, как адрес, из которого город не разобрать.
+    """
+    name = _find_city(location)
+    if name is None or len(name) > CITY_NAME_MAX_LENGTH:
+        return None
+    return name
+
+
+def _find_city(location: str) -> str | None:
+    parts = [" ".join(part.split()) for part in location.split(",")]
+    parts = [part for part in parts if part]
+    for part in parts:
+        lowered = part.lower()
+        for prefix in SETTLEMENT_PREFIXES:
+            if lowered.startswith(prefix) and len(part) > len(prefix):
+                name = part[len(prefix):].strip()
+                if name and (prefix.endswith(".") or part[len(prefix)] == " "):
+                    return name
+    for part in parts:
+        lowered = part.lower()
+        if any(word in lowered.split() for word in REGION_WORDS):
+            continue
+        if STREET_RE.search(lowered):
+            continue
+        return part
+    return None
+
+
+class CitiesIndex:
+    """
+    Автодополнение городов в памяти процесса: отсортированный массив имен без учета регистра.
+
+    Загружается из cities при старте приложения, затем раз в refresh_seconds дочитывает
+    города с id больше последнего загруженного (города не удаляются и не переименовываются).
+    Города, добавленные в этом процессе, попадают в индекс сразу после коммита.
+
+    id из последовательности выдается до коммита: город с меньшим id, закоммиченный позже
+    города с большим, дочитывание по id пропустит. Такие города подбирает полная перезагрузка
+    раз в full_reload_seconds.
+    """
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._cities: list[City] = []
+        self._ids: set[int] = set()
+        self._last_id = 0
+
+    def suggest(self, q: str, limit: int = 10) -> list[City]:
+        """Города, название которых начинается с q"""
+        prefix = q.strip().casefold()
+        if not prefix:
+            return []
+        result = []
+        i = bisect.bisect_left(self._keys, prefix)
+        while i < len(self._keys) and len(result) < limit and self._keys[i].startswith(prefix):
+            result.append(self._cities[i])
+            i += 1
+        return result
+
+    def add(self, cities: Iterable[City]) -> None:
+        for city in cities:
+            if city.id in self._ids:
+                continue
+            key = city.name.casefold()
+            i = bisect.bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._cities.insert(i, city)
+            self._ids.add(city.id)
+            self._last_id = max(self._last_id, city.id)
+
+    def mark_added(self, session, cities: Iterable[City]) -> None:
+        """Запоминает новые города до коммита сессии"""
+        session.info.setdefault(ADDED_CITIES_KEY, []).extend(cities)
+
+    def publish_added(self, session) -> None:
+        """Вызывается после коммита: добавляет в индекс города этой транзакции"""
+        self.add(session.info.pop(ADDED_CITIES_KEY, []))
+
+    async def refresh(self, session, full: bool = False) -> None:
+        """Дочитывает из БД города, появившиеся после последней загрузки, с full — все города"""
+        query = select(CitiesOrm.id, CitiesOrm.name)
+        if not full:
+            query = query.filter(CitiesOrm.id > self._last_id)
+        result = await session.execute(query)
+        self.add(City(id=city_id, name=name) for city_id, name in result.all())
+
+    async def run(self, session_factory, refresh_seconds: int, full_reload_seconds: int) -> None:
+        """Загружает индекс и обновляет его, пока приложение работает"""
+        loop = asyncio.get_running_loop()
+        # Первая загрузка — полная
+        next_full_reload = loop.time()
+        while True:
+            full = loop.time() >= next_full_reload
+            try:
+                async with session_factory() as session:
+                    await self.refresh(session, full=full)
+                if full:
+                    next_full_reload = loop.time() + full_reload_seconds
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Не удалось обновить индекс городов: {e}")
+            await asyncio.sleep(refresh_seconds)
@@ -1,8 +1,15 @@
+from functools import cached_property
+
+from src.init import availability_index, cities_index
 from src.repos.facilities import FacilitiesRepository, RoomsFacilitiesRepository
 from src.repos.usres import UserRepository
 from src.repos.hotels import HotelRepository
 from src.repos.rooms import RoomsRepository
 from src.repos.booking import BookingRepository
+from src.repos.booking_changes import BookingChangesRepository
+from src.repos.inventory import InventoryRepository
+from src.repos.partitions import BookingPartitionsRepository
+from src.utils.replicas import ReplicaRouter, ReplicaSession, read_only_engine
 
 
 class DBManager:
@@ -13,53 +20,114 @@ class DBManager:
     методов. Класс создаёт репозитории для работы с пользователями, отелями, номерами, бронированиями и удобствами,
     используя сессию базы данных.
 
+    Сессия и репозитории создаются при первом обращении, соединение берется из пула при первом запросе:
+    обработчик, который не дошел до базы (ошибка валидации, ответ из кэша), соединение не занимает.
+
+    С read_only=True транзакция начинается с BEGIN READ ONLY, а при заданных replicas сессия открывается
+    на реплике (см. ReplicaRouter), если для sticky_key недавно не было коммита и есть доступная реплика,
+    иначе на основной базе.
+
     Атрибуты:
         session_factory (callable): Фабрика для создания сессий с базой данных.
+        replicas (ReplicaRouter | None): Реплики для чтения.
+        sticky_key (str | None): Ключ read-your-writes (токен пользователя).
+        read_only (bool): Только чтение, можно читать с реплики.
         session (AsyncSession): Асинхронная сессия для взаимодействия с базой данных.
         users (UserRepository): Репозиторий для работы с пользователями.
         hotels (HotelRepository): Репозиторий для работы с отелями.
         rooms (RoomsRepository): Репозиторий для работы с номерами.
         bookings (BookingRepository): Репозиторий для работы с бронированиями.
+        bookings_changes (BookingChangesRepository): Журнал и лента изменений бронирований.
         facilities (FacilitiesRepository): Репозиторий для работы с удобствами.
         rooms_facilities (RoomsFacilitiesRepository): Репозиторий для работы с удобствами номеров.
+        inventory (InventoryRepository): Репозиторий календаря занятости номеров.
+        bookings_partitions (BookingPartitionsRepository): Управление секциями таблицы бронирований.
     """
 
-    def __init__(self, session_factory):
+    def __init__(
+        self,
+        session_factory,
+        replicas: ReplicaRouter | None = None,
+        sticky_key: str | None = None,
+        read_only: bool = False,
+    ):
         """
         Инициализация DBManager с фабрикой сессий.
         Args: session_factory (callable): Фабрика для создания сессий с базой данных.
         """
         self.session_factory = session_factory
+        self.replicas = replicas
+        self.sticky_key = sticky_key
+        self.read_only = read_only
 
     async def __aenter__(self):
         """
         Метод для асинхронного входа в контекстный менеджер.
-        Создаёт сессию базы данных и инициализирует репозитории для работы с различными сущностями.
         Returns: DBManager: Возвращает сам объект DBManager с доступом к репозиториям.
         """
-        # Создаём асинхронную сессию базы данных
-        self.session = self.session_factory()
-
-        # Инициализируем репозитории
-        self.users = UserRepository(self.session)
-        self.hotels = HotelRepository(self.session)
-        self.rooms = RoomsRepository(self.session)
-        self.bookings = BookingRepository(self.session)
-        self.facilities = FacilitiesRepository(self.session)
-        self.rooms_facilities = RoomsFacilitiesRepository(self.session)
-
-        # Возвращаем объект DBManager для использования в контекстном менеджере
         return self
 
     async def __aexit__(self, *args):
         """
         Метод для асинхронного выхода из контекстного менеджера.
-        Осуществляет откат изменений в сессии и закрытие сессии после выполнения операций.
+        Закрывает сессию, если она создавалась: незакоммиченная транзакция откатывается
+        при возврате соединения в пул, а без запросов соединение и не бралось.
         """
-        # Откат всех изменений в сессии
-        await self.session.rollback()
-        # Закрытие сессии
-        await self.session.close()
+        if "session" in self.__dict__:
+            await self.session.close()
+
+    @cached_property
+    def session(self):
+        """Асинхронная сессия, создается при первом обращении"""
+        if not self.read_only:
+            return self.session_factory()
+        bind = read_only_engine(self.session_factory.kw["bind"])
+        if self.replicas is None or not self.replicas.enabled:
+            return self.session_factory(bind=bind)
+        return ReplicaSession(
+            self.replicas, self.sticky_key, **(self.session_factory.kw | {"bind": bind})
+        )
+
+    @property
+    def on_replica(self) -> bool:
+        """Запросы сессии идут на реплику"""
+        return getattr(self.__dict__.get("session"), "replica", None) is not None
+
+    @cached_property
+    def users(self):
+        return UserRepository(self.session)
+
+    @cached_property
+    def hotels(self):
+        return HotelRepository(self.session)
+
+    @cached_property
+    def rooms(self):
+        return RoomsRepository(self.session)
+
+    @cached_property
+    def bookings(self):
+        return BookingRepository(self.session)
+
+    @cached_property
+    def bookings_changes(self):
+        return BookingChangesRepository(self.session)
+
+    @cached_property
+    def facilities(self):
+        return FacilitiesRepository(self.session)
+
+    @cached_property
+    def rooms_facilities(self):
+        return RoomsFacilitiesRepository(self.session)
+
+    @cached_property
+    def inventory(self):
+        return InventoryRepository(self.session)
+
+    @cached_property
+    def bookings_partitions(self):
+        return BookingPartitionsRepository(self.session)
 
     async def commit(self):
         """
@@ -67,3 +135,10 @@ class DBManager:
         Сохраняет изменения в базе данных, сделанные в рамках текущей сессии.
         """
         await self.session.commit()
+        # Оповещаем индекс свободных номеров об изменениях этой транзакции
+        await availability_index.publish_changes(self.session)
+        # Новые города сразу доступны в подсказках этого процесса
+        cities_index.publish_added(self.session)
+        # Чтения этого пользователя ненадолго идут на основную базу, пока реплики догоняют
+        if self.replicas is not None:
+            self.replicas.mark_written(self.sticky_key)
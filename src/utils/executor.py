@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from src.exception import ExecutorOverloadedException
+from src.schemas.metrics import ExecutorStats
+from src.utils.metrics import EXECUTOR_PENDING, EXECUTOR_REJECTED
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    Пул потоков для тяжелых синхронных вызовов из async-обработчиков (хеширование паролей):
+    event loop не ждет вызов, а ждет future. Одновременно выполняется не больше workers вызовов,
+    еще max_queue ждут в очереди; если очередь полна, новый вызов сразу получает
+    ExecutorOverloadedException вместо ожидания, растущего с нагрузкой.
+
+    Потоков достаточно, если вызов отпускает GIL (bcrypt, argon2, hashlib на больших данных).
+    nice > 0 понижает приоритет потоков пула в планировщике ОС (только Linux): когда ядер не хватает,
+    процессор сначала получает поток event loop, а вызовы пула — оставшееся время.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, nice: int = 0):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        # Принятые вызовы: выполняются и ждут в очереди пула
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self.nice = nice
+        self._executor = ThreadPoolExecutor(
+            workers, thread_name_prefix=name, initializer=self._lower_priority
+        )
+
+    def _lower_priority(self):
+        if self.nice <= 0 or sys.platform != "linux":
+            return
+        try:
+            # В Linux приоритет задается каждому потоку отдельно по его id. nice — сдвиг
+            # от текущего значения: процесс, уже запущенный под nice, потоки пула не повышают
+            tid = threading.get_native_id()
+            nice = min(os.getpriority(os.PRIO_PROCESS, tid) + self.nice, 19)
+            os.setpriority(os.PRIO_PROCESS, tid, nice)
+        except OSError as ex:
+            logging.warning(f"Не удалось понизить приоритет потоков {self.name}: {ex}")
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                EXECUTOR_REJECTED.labels(self.name).inc()
+                raise ExecutorOverloadedException
+            self.pending += 1
+        EXECUTOR_PENDING.labels(self.name).inc()
+        future = self._executor.submit(fn, *args)
+        # Счетчик уменьшается, когда вызов действительно завершился или снят с очереди,
+        # а не когда клиент перестал ждать: брошенный вызов продолжает занимать поток
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        EXECUTOR_PENDING.labels(self.name).dec()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> ExecutorStats:
+        return ExecutorStats(
+            workers=self.workers,
+            max_queue=self.max_queue,
+            pending=self.pending,
+            completed=self.completed,
+            rejected=self.rejected,
+        )
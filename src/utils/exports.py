@@ -0,0 +1,72 @@
+import csv
+import io
+from typing import AsyncIterator, Callable, Literal
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.utils.db_manager import DBManager
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def encode_batches(
+    batches: AsyncIterator[list[BaseModel]],
+    schema: type[BaseModel],
+    format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """
+    Пачки схем в байты выгрузки, одна пачка — один кусок ответа.
+    Формат совместим с загрузкой (src/utils/imports.py): списки в CSV разделяются ";".
+    """
+    if format == "ndjson":
+        async for batch in batches:
+            yield b"".join(item.model_dump_json().encode() + b"\n" for item in batch)
+        return
+
+    names = list(schema.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(names)
+    async for batch in batches:
+        for item in batch:
+            values = item.model_dump(mode="json")
+            writer.writerow(
+                ";".join(map(str, value)) if isinstance(value, list) else value
+                for value in (values[name] for name in names)
+            )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    db_factory: Callable[[], DBManager],
+    stream: Callable[[DBManager], AsyncIterator[list[BaseModel]]],
+    schema: type[BaseModel],
+    format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Потоковый ответ с выгрузкой. Тело читается уже после выхода из обработчика,
+    когда сессия из DBDep закрыта, поэтому выгрузка открывает свой DBManager
+    и держит его, пока клиент не дочитает ответ (или не оборвет соединение).
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        async with db_factory() as db:
+            async for chunk in encode_batches(stream(db), schema, format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
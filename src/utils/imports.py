@@ -0,0 +1,203 @@
+import copy
+import csv
+import json
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Literal, TypeVar
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.exception import ImportFormatException, InvalidDataException
+from src.schemas.imports import ImportLineError, ImportResult
+
+ImportFormat = Literal["ndjson", "csv"]
+
+T = TypeVar("T")
+
+CONTENT_TYPES: dict[str, ImportFormat] = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+# Сколько записей проверяется и пишется в БД за раз
+CHUNK_SIZE = 1000
+# Сколько ошибок по строкам возвращается клиенту, остальные только считаются
+MAX_REPORTED_ERRORS = 100
+# Строка длиннее — ошибка формата всего файла, чтобы буфер строки не рос без предела
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def import_format(content_type: str | None) -> ImportFormat:
+    """Формат загрузки по заголовку Content-Type"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in CONTENT_TYPES:
+        raise ImportFormatException(f"ожидается Content-Type: {', '.join(CONTENT_TYPES)}")
+    return CONTENT_TYPES[media_type]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """Строки тела запроса с номерами по мере поступления, в памяти только текущая строка"""
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip(b"\r")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ImportFormatException(f"строка {line_no + 1} длиннее {MAX_LINE_BYTES} байт")
+    if buffer:
+        yield line_no + 1, buffer.rstrip(b"\r")
+
+
+async def read_records(
+    chunks: AsyncIterator[bytes],
+    format: ImportFormat,
+    list_fields: Iterable[str] = (),
+) -> AsyncIterator[tuple[int, dict | str]]:
+    """
+    Записи файла: (номер строки, словарь полей) или (номер строки, текст ошибки разбора).
+
+    NDJSON — один JSON-объект в строке. CSV — первая строка с именами колонок,
+    пустые значения пропускаются, значения list_fields разделяются ";".
+    Запись CSV в кавычках может занимать несколько строк файла.
+    """
+    header: list[str] | None = None
+    pending: list[str] = []
+    pending_line = 0
+    async for line_no, raw in iter_lines(chunks):
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            yield line_no, "строка не в кодировке UTF-8"
+            continue
+        if format == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, f"некорректный JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, "ожидался JSON-объект"
+                continue
+            yield line_no, record
+            continue
+
+        if not pending:
+            if not line.strip():
+                continue
+            pending_line = line_no
+        pending.append(line + "\n")
+        try:
+            rows = list(csv.reader(pending, strict=True))
+        except csv.Error:
+            # Незакрытые кавычки: запись продолжается на следующей строке
+            if len(pending) < 100:
+                continue
+            rows = None
+        pending = []
+        if not rows or len(rows) != 1:
+            yield pending_line, "некорректная строка CSV"
+            continue
+        if header is None:
+            header = [name.strip() for name in rows[0]]
+            continue
+        if len(rows[0]) != len(header):
+            yield pending_line, f"ожидалось колонок: {len(header)}, получено: {len(rows[0])}"
+            continue
+        record = {}
+        for name, value in zip(header, rows[0]):
+            if value == "":
+                continue
+            record[name] = value.split(";") if name in list_fields else value
+        yield pending_line, record
+    if pending:
+        yield pending_line, "незакрытые кавычки в конце файла"
+
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc']) or '-'}: {error['msg']}"
+        for error in e.errors()
+    )
+
+
+async def import_records(
+    records: AsyncIterator[tuple[int, dict | str]],
+    schema: type[BaseModel],
+    save: Callable[[list[tuple[int, BaseModel]]], Awaitable[list[ImportLineError]]],
+) -> ImportResult:
+    """
+    Проверяет записи пачками по CHUNK_SIZE и передает корректные в save.
+    save пишет пачку в БД и возвращает ошибки по строкам, найденные при записи.
+    """
+    adapter = TypeAdapter(schema)
+    result = ImportResult(imported=0, errors_total=0, errors=[])
+
+    def add_errors(errors: Iterable[ImportLineError]):
+        for error in errors:
+            result.errors_total += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(error)
+
+    async def flush(chunk: list[tuple[int, BaseModel]]):
+        errors = await save(chunk)
+        add_errors(errors)
+        result.imported += len(chunk) - len(errors)
+
+    chunk: list[tuple[int, BaseModel]] = []
+    async for line_no, record in records:
+        if isinstance(record, str):
+            add_errors([ImportLineError(line=line_no, error=record)])
+            continue
+        try:
+            chunk.append((line_no, adapter.validate_python(record)))
+        except ValidationError as e:
+            add_errors([ImportLineError(line=line_no, error=format_validation_error(e))])
+            continue
+        if len(chunk) >= CHUNK_SIZE:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+    return result
+
+
+async def write_chunk(
+    session,
+    chunk: list[tuple[int, T]],
+    write: Callable[[list[tuple[int, T]]], Awaitable[None]],
+) -> list[ImportLineError]:
+    """
+    Пишет пачку через write в SAVEPOINT. Схема пропускает значения, которые не принимает БД
+    (строка длиннее столбца, число вне int4): тогда пачка откатывается и пишется по строке,
+    неподходящие строки возвращаются ошибками, остальные загружаются.
+    """
+    try:
+        await _write_nested(session, chunk, write)
+        return []
+    except InvalidDataException:
+        pass
+    errors = []
+    for line_no, item in chunk:
+        try:
+            await _write_nested(session, [(line_no, item)], write)
+        except InvalidDataException as e:
+            errors.append(ImportLineError(line=line_no, error=": ".join(e.args)))
+    return errors
+
+
+async def _write_nested(session, chunk, write):
+    # Вместе с SAVEPOINT откатываются и изменения, отложенные репозиториями в session.info
+    # до коммита (новые города), иначе они попадут в индексы без строк в БД
+    info = {key: copy.copy(value) for key, value in session.info.items()}
+    try:
+        async with session.begin_nested():
+            await write(chunk)
+    except InvalidDataException:
+        session.info.clear()
+        session.info.update(info)
+        raise
@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.database import async_session_null_pool
+from src.utils.db_manager import DBManager
+
+
+# Запуск сверки: python -m src.utils.inventory verify
+# Пересчет календаря: python -m src.utils.inventory rebuild
+# Только за период: python -m src.utils.inventory verify --date-from 2024-11-01 --date-to 2024-12-01
+
+
+async def verify_inventory(date_from: date | None = None, date_to: date | None = None) -> int:
+    """Сверяет календарь занятости с бронированиями, возвращает число расхождений"""
+    async with DBManager(session_factory=async_session_null_pool) as db:
+        discrepancies = await db.inventory.verify(date_from, date_to)
+    for item in discrepancies:
+        logging.warning(
+            f"Расхождение календаря: номер {item.room_id}, день {item.day}, "
+            f"по бронированиям {item.expected}, в календаре {item.actual}"
+        )
+    logging.info(f"Сверка календаря завершена, расхождений: {len(discrepancies)}")
+    return len(discrepancies)
+
+
+async def rebuild_inventory(date_from: date | None = None, date_to: date | None = None) -> None:
+    """Пересчитывает календарь занятости по таблице бронирований"""
+    async with DBManager(session_factory=async_session_null_pool) as db:
+        await db.inventory.rebuild(date_from, date_to)
+        await db.commit()
+    logging.info("Календарь занятости пересчитан")
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-8s %(message)s")
+    parser = argparse.ArgumentParser(description="Календарь занятости номеров")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--date-from", type=date.fromisoformat)
+    parser.add_argument("--date-to", type=date.fromisoformat)
+    args = parser.parse_args()
+    if (args.date_from is None) != (args.date_to is None):
+        parser.error("--date-from и --date-to задаются вместе")
+
+    if args.command == "rebuild":
+        asyncio.run(rebuild_inventory(args.date_from, args.date_to))
+        return 0
+    return 1 if asyncio.run(verify_inventory(args.date_from, args.date_to)) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
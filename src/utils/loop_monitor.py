@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+
+from src.schemas.metrics import LoopBlock, LoopMonitorStats
+from src.utils.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+
+class LoopMonitor:
+    """
+    Задержка event loop: корутина-пульс засыпает на interval и меряет, насколько позже проснулась.
+    Пока пульса нет дольше threshold, поток-сторож снимает стек потока event loop — это стек
+    кода, который держит цикл (bcrypt, синхронный ввод-вывод, тяжелые вычисления в обработчике).
+    Когда цикл освободился, блокировка пишется в лог со стеком и попадает в историю для
+    GET /metrics/loop и в метрики event_loop_lag_seconds / event_loop_blocks_total.
+    """
+
+    def __init__(self, interval: float, threshold: float, history: int = 50, stack_limit: int = 30):
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_limit = stack_limit
+        self.blocks: deque[LoopBlock] = deque(maxlen=history)
+        self.blocks_total = 0
+        self.max_lag = 0.0
+        # Когда пульс последний раз засыпал (time.monotonic) и стек, снятый сторожем для этого пульса
+        self._beat = time.monotonic()
+        self._captured: tuple[float, str | None, list[str]] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None and not self._heartbeat.done()
+
+    def start(self):
+        """Запуск из работающего event loop (lifespan приложения)"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._pulse(), name="loop-monitor")
+        threading.Thread(target=self._watch, name="loop-monitor", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    async def _pulse(self):
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - self._beat - self.interval, 0.0)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self._report(lag)
+
+    def _watch(self):
+        """Поток-сторож: снимает стек цикла один раз за каждую блокировку"""
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            if time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            if self._captured is not None and self._captured[0] == beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            task = asyncio.current_task(self._loop)
+            stack = traceback.format_list(traceback.extract_stack(frame, limit=self.stack_limit))
+            del frame
+            # Пульс успел проснуться, пока снимали стек: это уже стек другого кода
+            if beat == self._beat:
+                self._captured = (beat, task.get_name() if task else None, stack)
+
+    def _report(self, lag: float):
+        task, stack = None, []
+        if self._captured is not None and self._captured[0] == self._beat:
+            _, task, stack = self._captured
+        block = LoopBlock(
+            at=datetime.now(timezone.utc),
+            lag_ms=round(lag * 1000, 1),
+            task=task,
+            stack=[line.rstrip() for line in stack],
+        )
+        self.blocks.append(block)
+        self.blocks_total += 1
+        EVENT_LOOP_BLOCKS.inc()
+        logging.warning(
+            f"Event loop заблокирован на {block.lag_ms} мс (задача {task}):\n"
+            + ("".join(stack) or "стек не снят: блокировка короче периода сторожа\n")
+        )
+
+    def stats(self) -> LoopMonitorStats:
+        return LoopMonitorStats(
+            running=self.running,
+            interval_ms=self.interval * 1000,
+            threshold_ms=self.threshold * 1000,
+            max_lag_ms=round(self.max_lag * 1000, 1),
+            blocks_total=self.blocks_total,
+            blocks=list(self.blocks),
+        )
@@ -0,0 +1,225 @@
+"""
+Метрики Prometheus: HTTP-маршруты, пул и запросы SQLAlchemy, команды Redis,
+попадания fastapi-cache и задачи Celery. Отдаются на GET /metrics.
+
+Несколько процессов (uvicorn --workers, воркеры Celery на той же машине): переменная окружения
+PROMETHEUS_MULTIPROC_DIR должна указывать на общий пустой каталог у всех процессов до их запуска,
+тогда /metrics любого воркера отдает сумму по всем процессам. Каталог очищается перед запуском.
+"""
+
+import logging
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+
+from src.utils.sql_stats import install_sql_stats
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в обработке",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "fastapi_cache_requests_total",
+    "Ответы маршрутов с @cache: из кэша (hit) и без него (miss)",
+    ["route", "result"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения запроса к БД",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Время получения соединения из пула",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Соединения пула, занятые сессиями",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_waiting",
+    "Сессии, ожидающие соединение из пула",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_duration_seconds",
+    "Время выполнения команды RedisManager",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1),
+)
+CELERY_TASK_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Время выполнения задачи Celery",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+CELERY_QUEUE_LENGTH = Gauge(
+    "celery_queue_length",
+    "Задачи в очереди брокера Celery",
+    ["queue"],
+    multiprocess_mode="mostrecent",
+)
+EXECUTOR_PENDING = Gauge(
+    "executor_pending",
+    "Вызовы в пуле потоков BoundedExecutor: выполняются и ждут в очереди",
+    ["executor"],
+    multiprocess_mode="livesum",
+)
+EXECUTOR_REJECTED = Counter(
+    "executor_rejected_total",
+    "Вызовы, отклоненные BoundedExecutor из-за полной очереди",
+    ["executor"],
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Насколько позже срока event loop выполнил запланированный вызов",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Блокировки event loop дольше LOOP_MONITOR_THRESHOLD_MS",
+)
+
+SQL_OPERATIONS = {"select", "insert", "update", "delete", "with", "copy"}
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Реестр для /metrics: сумма по всем процессам в режиме нескольких процессов"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Убирает из суммы livesum-метрики завершенного процесса"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+def sql_operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    operation = words[0].lower() if words else ""
+    return operation if operation in SQL_OPERATIONS else "other"
+
+
+def observe_db_query(statement: str, seconds: float):
+    DB_QUERY_SECONDS.labels(sql_operation(statement)).observe(seconds)
+
+
+def install_db_metrics():
+    """Время запросов всех движков (основная база, реплики, NullPool у Celery)"""
+    install_sql_stats(observe_db_query)
+
+
+def redis_command_timer(command: str):
+    """with redis_command_timer("get"): ... — время команды Redis"""
+    return REDIS_COMMAND_SECONDS.labels(command).time()
+
+
+async def update_celery_queue_length(redis, queues: tuple[str, ...] = ("celery",)):
+    """Длина очередей Celery в брокере Redis (список с именем очереди)"""
+    if redis is None:
+        return
+    try:
+        for queue in queues:
+            CELERY_QUEUE_LENGTH.labels(queue).set(await redis.llen(queue))
+    except RedisError as ex:
+        logging.warning(f"Не удалось получить длину очередей Celery: {ex}")
+
+
+def install_celery_metrics():
+    """Время задач Celery по сигналам воркера и время их запросов к БД"""
+    from celery import signals
+
+    install_db_metrics()
+
+    started: dict[str, float] = {}
+
+    @signals.task_prerun.connect(weak=False)
+    def task_prerun(task_id=None, **kwargs):
+        started[task_id] = time.perf_counter()
+
+    @signals.task_postrun.connect(weak=False)
+    def task_postrun(task_id=None, task=None, state=None, **kwargs):
+        began = started.pop(task_id, None)
+        if began is not None:
+            CELERY_TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(
+                time.perf_counter() - began
+            )
+
+    @signals.worker_process_shutdown.connect(weak=False)
+    def worker_process_shutdown(pid=None, **kwargs):
+        mark_process_dead(pid or os.getpid())
+
+
+class PrometheusMiddleware:
+    """
+    ASGI-middleware: время и число запросов по шаблону маршрута (/hotels/{hotel_id}),
+    запросы в обработке и попадания fastapi-cache по заголовку X-FastAPI-Cache
+    """
+
+    def __init__(self, app):
+        self.app = app
+        install_db_metrics()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        cache_result = None
+
+        async def send_with_status(message):
+            nonlocal status, cache_result
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                cache_result = Headers(raw=message["headers"]).get("x-fastapi-cache")
+            await send(message)
+
+        started = time.perf_counter()
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Шаблон маршрута, а не путь: число рядов не растет с числом отелей и номеров
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(
+                time.perf_counter() - started
+            )
+            if cache_result:
+                CACHE_REQUESTS.labels(route, cache_result.lower()).inc()
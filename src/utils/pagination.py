@@ -0,0 +1,22 @@
+import base64
+import json
+
+from src.exception import InvalidCursorException
+
+
+def encode_cursor(**key) -> str:
+    """Непрозрачный курсор: ключ последней строки страницы в base64"""
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Ключ последней строки предыдущей страницы из курсора"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except ValueError:
+        raise InvalidCursorException
+    if not isinstance(key, dict):
+        raise InvalidCursorException
+    return key
@@ -0,0 +1,92 @@
+"""
+Параметры хеширования паролей: схема новых хешей (argon2id или bcrypt) и стоимость,
+подобранная при старте под бюджет времени проверки одного пароля.
+
+Стоимость — rounds: у bcrypt это log2 числа итераций (раунд удваивает время),
+у argon2 — time_cost (время растет линейно), память argon2 задается отдельно.
+Хеши другой схемы, с другой памятью argon2 или с меньшей стоимостью считаются устаревшими
+(CryptContext.needs_update) и пересчитываются при следующем успешном входе.
+
+Подобранная стоимость хеш только усиливает и никогда не ослабляет: узлы на разном железе
+подбирают разную стоимость, и понижение на одном узле перечеркивало бы повышение на другом
+при каждом входе. Понизить стоимость (и выровнять ее на всех узлах) можно только явной
+стоимостью AUTH_HASH_ROUNDS: тогда дороже заданной считаются устаревшими и хеши дороже.
+"""
+
+import logging
+import math
+import statistics
+import time
+from typing import Literal
+
+from passlib.context import CryptContext
+
+HashScheme = Literal["argon2", "bcrypt"]
+
+# Стоимость не ниже рекомендованной OWASP, даже если железо не укладывается в бюджет
+MIN_ROUNDS: dict[str, int] = {"bcrypt": 10, "argon2": 2}
+MAX_ROUNDS: dict[str, int] = {"bcrypt": 16, "argon2": 64}
+
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+def crypt_context(
+    scheme: HashScheme,
+    rounds: int | None = None,
+    argon2_memory_kib: int = 19456,
+    pinned: bool = False,
+) -> CryptContext:
+    """
+    Новые хеши — scheme, хеши второй схемы только проверяются и устарели.
+    С rounds устаревшими считаются и хеши дешевле rounds, с pinned (стоимость задана явно,
+    одна на всех узлах) — и дороже: так стоимость можно и понизить
+    """
+    schemes = [scheme] + [other for other in ("argon2", "bcrypt") if other != scheme]
+    options = {"argon2__memory_cost": argon2_memory_kib, "argon2__parallelism": 1}
+    if rounds is not None:
+        # Не __rounds: passlib выводит из него и max_rounds, то есть понижение дорогих хешей
+        options |= {f"{scheme}__default_rounds": rounds, f"{scheme}__min_rounds": rounds}
+        if pinned:
+            options[f"{scheme}__max_rounds"] = rounds
+    return CryptContext(schemes=schemes, default=scheme, deprecated="auto", **options)
+
+
+def measure_verify_ms(context: CryptContext, samples: int = 3) -> float:
+    """Медиана времени проверки пароля, мс"""
+    hashed = context.hash(CALIBRATION_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify(CALIBRATION_PASSWORD, hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def calibrate_rounds(scheme: HashScheme, target_ms: float, argon2_memory_kib: int = 19456) -> int:
+    """
+    Наибольшая стоимость, при которой проверка пароля укладывается в target_ms на этом железе.
+    Замер на минимальной стоимости и пересчет по закону роста времени схемы.
+    Синхронный и занимает процессор на несколько проверок: вызывать не из event loop
+    """
+    min_rounds = MIN_ROUNDS[scheme]
+    verify_ms = measure_verify_ms(crypt_context(scheme, min_rounds, argon2_memory_kib))
+    if scheme == "bcrypt":
+        rounds = min_rounds + math.floor(math.log2(target_ms / verify_ms))
+    else:
+        rounds = math.floor(min_rounds * target_ms / verify_ms)
+    rounds = min(max(rounds, min_rounds), MAX_ROUNDS[scheme])
+    if scheme == "bcrypt":
+        estimate_ms = verify_ms * 2 ** (rounds - min_rounds)
+    else:
+        estimate_ms = verify_ms * rounds / min_rounds
+    if verify_ms > target_ms:
+        logging.warning(
+            f"Хеширование паролей: {scheme} с минимальной стоимостью {min_rounds} "
+            f"проверяется {verify_ms:.0f} мс, больше бюджета {target_ms:.0f} мс"
+        )
+    else:
+        logging.info(
+            f"Хеширование паролей: {scheme}, стоимость {rounds}, "
+            f"проверка ~{estimate_ms:.0f} мс (бюджет {target_ms:.0f} мс)"
+        )
+    return rounds
@@ -0,0 +1,56 @@
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.schemas.metrics import PoolStats
+from src.utils.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_SECONDS, DB_POOL_WAITING
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений движка с учетом ожидающих соединения и времени выдачи соединения.
+    Метрики Prometheus подписаны именем пула (pool_logging_name движка).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Сколько сессий сейчас ждут соединение из пула
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.name = self._orig_logging_name or "db"
+
+    def connect(self):
+        started = time.perf_counter()
+        self.waiting += 1
+        DB_POOL_WAITING.labels(self.name).inc()
+        try:
+            return super().connect()
+        finally:
+            self.waiting -= 1
+            DB_POOL_WAITING.labels(self.name).dec()
+            elapsed = time.perf_counter() - started
+            self.checkouts += 1
+            self.checkout_seconds_total += elapsed
+            self.checkout_seconds_max = max(self.checkout_seconds_max, elapsed)
+            DB_POOL_CHECKOUT_SECONDS.labels(self.name).observe(elapsed)
+            DB_POOL_CHECKED_OUT.labels(self.name).set(self.checkedout())
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        DB_POOL_CHECKED_OUT.labels(self.name).set(self.checkedout())
+
+    def stats(self) -> PoolStats:
+        return PoolStats(
+            size=self.size(),
+            checked_out=self.checkedout(),
+            checked_in=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+            waiting=self.waiting,
+            checkouts=self.checkouts,
+            checkout_avg_ms=self.checkout_seconds_total / self.checkouts * 1000
+            if self.checkouts
+            else 0,
+            checkout_max_ms=self.checkout_seconds_max * 1000,
+        )
@@ -0,0 +1,156 @@
+import itertools
+import logging
+import time
+from functools import cache
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+# Ошибки подключения к реплике: сеть, отказ сервера, таймаут установки соединения
+REPLICA_ERRORS = (OSError, DBAPIError, TimeoutError)
+
+
+@cache
+def read_only_engine(engine: AsyncEngine) -> AsyncEngine:
+    """
+    Тот же движок и пул, но транзакции начинаются с BEGIN READ ONLY:
+    asyncpg передает режим в самой команде начала транзакции, без отдельного запроса
+    """
+    return engine.execution_options(postgresql_readonly=True)
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        # До какого момента (time.monotonic) реплика считается недоступной
+        self.unhealthy_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    @property
+    def connections(self) -> int:
+        """Соединения реплики, занятые сессиями прямо сейчас"""
+        checkedout = getattr(self.engine.pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+
+
+class ReplicaRouter:
+    """
+    Выбор реплики для чтения в DBManager.
+
+    Реплика — наименее загруженная по занятым соединениям пула, при равенстве по кругу.
+    Недоступная реплика пропускается retry_seconds, после чего пробуется снова;
+    если доступных реплик нет, чтение идет на основную базу.
+
+    Read-your-writes: после коммита на основной базе чтения с тем же ключом
+    (токен пользователя) sticky_seconds идут на основную базу,
+    чтобы не прочитать с реплики состояние до своей записи. Ключи хранятся в памяти
+    процесса: другой воркер о записи не знает и может отдать данные с отставанием реплики.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        sticky_seconds: float = 5,
+        retry_seconds: float = 10,
+    ):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._round_robin = itertools.count()
+        # Ключ -> до какого момента (time.monotonic) читать с основной базы
+        self._sticky: dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def mark_written(self, key: str | None):
+        """Коммит с ключом key: следующие sticky_seconds его чтения идут на основную базу"""
+        if not self.enabled or key is None or self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        if len(self._sticky) > 10_000:
+            self._sticky = {k: until for k, until in self._sticky.items() if until > now}
+        self._sticky[key] = now + self.sticky_seconds
+
+    def is_sticky(self, key: str | None) -> bool:
+        return key is not None and self._sticky.get(key, 0) > time.monotonic()
+
+    def candidates(self, key: str | None = None) -> list[Replica]:
+        """Доступные реплики в порядке выбора, пусто — читать с основной базы"""
+        if not self.enabled or self.is_sticky(key):
+            return []
+        now = time.monotonic()
+        healthy = [replica for replica in self.replicas if replica.unhealthy_until <= now]
+        if not healthy:
+            return []
+        shift = next(self._round_robin) % len(healthy)
+        healthy = healthy[shift:] + healthy[:shift]
+        return sorted(healthy, key=lambda replica: replica.connections)
+
+    def mark_unhealthy(self, replica: Replica, ex: Exception):
+        logging.warning(
+            f"Реплика {replica.name} недоступна ({ex!r}), "
+            f"чтение идет на другие реплики или основную базу {self.retry_seconds} с"
+        )
+        replica.unhealthy_until = time.monotonic() + self.retry_seconds
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Сессия только для чтения с маршрутизацией на реплику. Реплика выбирается и соединение
+    берется при первом запросе, а не при создании сессии. Если подключиться не удалось,
+    реплика откладывается и пробуется следующая, в конце — основная база (bind сессии).
+    """
+
+    def __init__(self, router: ReplicaRouter, sticky_key: str | None = None, **kw):
+        super().__init__(**kw)
+        self.router = router
+        self.sticky_key = sticky_key
+        # Реплика, на которой открыта сессия, None — основная база или запросов еще не было
+        self.replica: Replica | None = None
+        self._routed = False
+
+    async def _route(self):
+        if self._routed:
+            return
+        self._routed = True
+        primary = self.bind
+        for replica in self.router.candidates(self.sticky_key):
+            self._set_bind(read_only_engine(replica.engine))
+            try:
+                await super().connection()
+            except REPLICA_ERRORS as ex:
+                await super().rollback()
+                self.router.mark_unhealthy(replica, ex)
+                continue
+            self.replica = replica
+            return
+        self._set_bind(primary)
+
+    def _set_bind(self, bind: AsyncEngine):
+        self.bind = bind
+        self.sync_session.bind = bind.sync_engine
+
+    async def execute(self, *args, **kwargs):
+        await self._route()
+        return await super().execute(*args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        await self._route()
+        return await super().stream(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        await self._route()
+        return await super().get(*args, **kwargs)
+
+    async def connection(self, *args, **kwargs):
+        await self._route()
+        return await super().connection(*args, **kwargs)
@@ -0,0 +1,130 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+
+class RequestSQLStats:
+    """Запросы к БД одного HTTP-запроса: сколько, сколько времени и какие повторялись"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        # Текст запроса (параметры отдельно) -> сколько раз выполнялся
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Запросы, выполненные не меньше threshold раз: признак N+1"""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.seconds * 1000:.1f};desc="{self.queries} queries", '
+            f"total;dur={total_seconds * 1000:.1f}"
+        )
+
+
+current_sql_stats: ContextVar[RequestSQLStats | None] = ContextVar(
+    "current_sql_stats", default=None
+)
+
+
+@contextmanager
+def collect_sql_stats():
+    """Считает запросы к БД внутри блока (и в задачах, созданных из него)"""
+    stats = RequestSQLStats()
+    token = current_sql_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_sql_stats.reset(token)
+
+
+# Кроме учета по HTTP-запросам, время каждого запроса к БД получают наблюдатели
+# (гистограмма Prometheus, см. src/utils/metrics.py): одна пара обработчиков событий на всех
+_query_observers: list[Callable[[str, float], None]] = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._sql_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._sql_stats_started
+    stats = current_sql_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    for observer in _query_observers:
+        observer(statement, seconds)
+
+
+def install_sql_stats(observer: Callable[[str, float], None] | None = None):
+    """
+    Подключает учет запросов ко всем движкам (основная база, реплики, NullPool),
+    observer(statement, seconds) вызывается после каждого запроса
+    """
+    if observer is not None and observer not in _query_observers:
+        _query_observers.append(observer)
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLStatsMiddleware:
+    """
+    ASGI-middleware: учет запросов к БД на время HTTP-запроса, заголовок Server-Timing
+    и предупреждения в лог о медленных запросах, запросах с большим числом обращений к БД
+    и о повторах одного запроса (N+1).
+
+    Заголовок уходит вместе с началом ответа: для StreamingResponse в нем только запросы
+    до начала выдачи тела, в лог попадает итог по всему ответу.
+    """
+
+    def __init__(self, app, max_queries: int, max_db_ms: float, n_plus_one_threshold: int):
+        self.app = app
+        self.max_queries = max_queries
+        self.max_db_ms = max_db_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        install_sql_stats()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        with collect_sql_stats() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self.report(scope, stats)
+
+    def report(self, scope, stats: RequestSQLStats):
+        request = f"{scope['method']} {scope['path']}"
+        for statement, count in stats.repeated(self.n_plus_one_threshold):
+            logging.warning(
+                f"Возможен N+1: {request} выполнил запрос {count} раз: {statement[:300]}"
+            )
+        if stats.queries > self.max_queries or stats.seconds * 1000 > self.max_db_ms:
+            logging.warning(
+                f"Тяжелый запрос к БД: {request}: {stats.queries} запросов, "
+                f"{stats.seconds * 1000:.1f} мс в БД"
+            )
@@ -7,7 +7,9 @@ mock.patch("fastapi_cache.decorator.cache", lambda *args, **kwargs: lambda f: f)
 
 import pytest
 
-from src.api.dependencies import get_db
+from contextlib import asynccontextmanager
+
+from src.api.dependencies import get_db, get_db_factory, get_db_read, get_db_scope
 from src.config import settings
 from src.database import Base, engine_null_pool, async_session_null_pool
 from src.main import app
@@ -37,6 +39,13 @@ async def db() -> AsyncGenerator[DBManager, None]:
 
 
 app.dependency_overrides[get_db] = get_db_null_pool
+app.dependency_overrides[get_db_read] = get_db_null_pool
+app.dependency_overrides[get_db_factory] = lambda: lambda: DBManager(
+    session_factory=async_session_null_pool
+)
+app.dependency_overrides[get_db_scope] = lambda: asynccontextmanager(
+    lambda **kwargs: get_db_null_pool()
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -1,6 +1,9 @@
 import pytest
 from httpx import AsyncClient
 
+from src.services.auth import AuthService
+from src.utils.password_hashing import crypt_context
+
 @pytest.mark.parametrize(
     "email, password, status_code",
     [
@@ -50,3 +53,23 @@ async def test_auth_flow(email: str, password: str, status_code: int, ac: AsyncC
     assert resp_logout.status_code == 200
     assert "access_token" not in ac.cookies
 
+
+
+async def test_login_rehashes_outdated_hash(ac: AsyncClient, db, monkeypatch):
+    email, password = "rehash@pes.com", "1234"
+    assert (await ac.post("/auth/register", json={"email": email, "password": password})).status_code == 200
+    old_hash = (await db.users.get_user_with_hashed_password(email=email)).hashed_password
+    assert old_hash.startswith("$2b$")
+
+    # Новая схема в настройках: bcrypt-хеш пересчитывается в argon2id при первом входе
+    monkeypatch.setattr(AuthService, "pwd_context", crypt_context("argon2", 2, 1024))
+    assert (await ac.post("/auth/login", json={"email": email, "password": password})).status_code == 200
+    await db.session.rollback()
+    new_hash = (await db.users.get_user_with_hashed_password(email=email)).hashed_password
+    assert new_hash.startswith("$argon2id$")
+
+    # Повторный вход с актуальным хешем его не трогает
+    assert (await ac.post("/auth/login", json={"email": email, "password": password})).status_code == 200
+    await db.session.rollback()
+    assert (await db.users.get_user_with_hashed_password(email=email)).hashed_password == new_hash
+    await ac.post("/auth/logout")
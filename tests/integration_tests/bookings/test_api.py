@@ -85,3 +85,45 @@ async def test_add_and_get_bookings(
 
     amountMe = len(responseMe.json())
     assert amountMe == amount
+
+
+async def test_export_bookings(ac, db):
+    bookings = await db.bookings.get_all()
+    response = await ac.get("/bookings/export", params={"format": "csv"})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0] == "user_id,room_id,date_from,date_to,price,id"
+    assert len(lines) == len(bookings) + 1
+
+
+async def test_booking_changes(db, authenticated_ac):
+    async def read_feed(since):
+        changes = []
+        while True:
+            response = await authenticated_ac.get(
+                "/bookings/changes", params={"limit": 2} | ({"since": since} if since else {})
+            )
+            assert response.status_code == 200
+            page = response.json()
+            if not page["data"]:
+                return changes, page["next_cursor"]
+            changes += page["data"]
+            since = page["next_cursor"]
+
+    _, cursor = await read_feed(None)
+    response = await authenticated_ac.post(
+        "/bookings", json={"room_id": 2, "date_from": "2031-01-01", "date_to": "2031-01-03"}
+    )
+    booking_id = response.json()["data"]["id"]
+
+    changes, cursor = await read_feed(cursor)
+    assert [(change["booking_id"], change["op"]) for change in changes] == [(booking_id, "insert")]
+    assert changes[0]["booking"]["date_from"] == "2031-01-01"
+
+    await db.bookings.delete(id=booking_id)
+    await db.commit()
+    changes, _ = await read_feed(cursor)
+    assert changes == [{"booking_id": booking_id, "op": "delete", "booking": None}]
+
+    response = await authenticated_ac.get("/bookings/changes", params={"since": "мусор"})
+    assert response.status_code == 400
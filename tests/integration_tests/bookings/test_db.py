@@ -47,8 +47,13 @@ from src.schemas.bookings import BookingAdd
 
 import asyncio
 from datetime import date
-from src.schemas.bookings import BookingAdd
-from src.exception import ObjectNotFoundException
+from sqlalchemy import text
+
+from src.database import async_session_null_pool
+from src.schemas.bookings import BookingAdd, BookingAddRequest
+from src.schemas.rooms import RoomsAdd
+from src.exception import ObjectNotFoundException, AllRoomsByBookedException
+from src.utils.db_manager import DBManager
 
 
 async def test_booking_crud(db):
@@ -105,3 +110,93 @@ async def test_booking_crud(db):
         assert booking_after_delete is None
     except ObjectNotFoundException:
         pass  # Если запись не найдена, это ожидаемое поведение
+
+
+async def test_inventory_calendar_matches_bookings(db):
+    """Календарь занятости совпадает с бронированиями после добавления, правки и удаления"""
+    user_id = (await db.users.get_all())[0].id
+    room_id = (await db.rooms.get_all())[0].id
+    booking_data = BookingAdd(
+        user_id=user_id,
+        room_id=room_id,
+        date_from=date(year=2024, month=9, day=1),
+        date_to=date(year=2024, month=9, day=5),
+        price=100,
+    )
+    new_booking = await db.bookings.add(booking_data)
+    assert await db.inventory.verify() == []
+
+    await db.bookings.partially_edit(
+        BookingAdd(**(booking_data.model_dump() | {"date_to": date(2024, 9, 8)})),
+        id=new_booking.id,
+    )
+    assert await db.inventory.verify() == []
+
+    await db.bookings.delete(id=new_booking.id)
+    assert await db.inventory.verify() == []
+
+
+async def test_book_last_room_concurrently(db):
+    """Сотни одновременных бронирований последнего номера: успешно ровно одно"""
+    user_id = (await db.users.get_all())[0].id
+    hotel_id = (await db.hotels.get_all())[0].id
+    room = await db.rooms.add(
+        RoomsAdd(hotel_id=hotel_id, title="Последний номер", price=1000, quantity=1)
+    )
+    await db.commit()
+    booking_data = BookingAddRequest(
+        room_id=room.id, date_from=date(2024, 12, 30), date_to=date(2025, 1, 2)
+    )
+    # Ограничиваем число одновременных соединений, чтобы не упереться в max_connections
+    connections = asyncio.Semaphore(50)
+
+    async def book() -> bool:
+        async with connections:
+            async with DBManager(session_factory=async_session_null_pool) as db_:
+                try:
+                    await db_.bookings.book_room(user_id, booking_data)
+                except AllRoomsByBookedException:
+                    return False
+                await db_.commit()
+                return True
+
+    results = await asyncio.gather(*[book() for _ in range(300)])
+
+    assert sum(results) == 1
+    assert len(await db.bookings.get_filtered(room_id=room.id)) == 1
+    assert await db.inventory.verify() == []
+
+
+async def test_bookings_partitions(db):
+    """Секции создаются с переносом строк из секции по умолчанию и уходят в архив"""
+    user_id = (await db.users.get_all())[0].id
+    room_id = (await db.rooms.get_all())[0].id
+    new_booking = await db.bookings.add(
+        BookingAdd(
+            user_id=user_id,
+            room_id=room_id,
+            date_from=date(2001, 3, 30),
+            date_to=date(2001, 4, 2),
+            price=100,
+        )
+    )
+
+    created = await db.bookings_partitions.create_ahead(1, today=date(2001, 1, 15))
+    # Кроме двух месяцев вперед создается секция под бронь из секции по умолчанию
+    assert {"bookings_y2001m01", "bookings_y2001m02", "bookings_y2001m03"} <= {
+        p.name for p in created
+    }
+    result = await db.session.execute(
+        text("select tableoid::regclass::text from bookings where id = :id"),
+        {"id": new_booking.id},
+    )
+    assert result.scalar_one() == "bookings_y2001m03"
+
+    archived = await db.bookings_partitions.archive(before=date(2001, 4, 1))
+    assert [p.name for p in archived] == [
+        "bookings_y2001m01",
+        "bookings_y2001m02",
+        "bookings_y2001m03",
+    ]
+    assert not await db.bookings.get_filtered(id=new_booking.id)
+    assert await db.inventory.verify() == []
@@ -1,3 +1,8 @@
+from sqlalchemy import insert
+
+from src.models import FacilitiesOrm
+
+
 async def test_get_facilities(ac):
     response = await ac.get("/facilities")
     assert response.status_code == 200
@@ -12,3 +17,37 @@ async def test_post_facilities(ac):
     assert isinstance(res, dict)
     assert res["data"]["title"] == facility_title
     assert "data" in res
+
+
+async def test_filter_rooms_by_facilities(ac, db):
+    facilities_ids = []
+    for title in ("Wi-Fi", "Кондиционер", "Балкон"):
+        response = await ac.post("/facilities", json={"title": title})
+        facilities_ids.append(response.json()["data"]["id"])
+    # Удобство вне битовой маски проверяется через rooms_facilities
+    await db.session.execute(insert(FacilitiesOrm).values(id=100, title="Джакузи"))
+    await db.commit()
+    wifi, ac_, balcony = facilities_ids
+
+    rooms = {
+        "Все удобства": [wifi, ac_, balcony, 100],
+        "Без балкона": [wifi, ac_],
+    }
+    for title, room_facilities in rooms.items():
+        response = await ac.post(
+            "/hotels/2/rooms",
+            json={"title": title, "price": 1000, "quantity": 1, "facilities_ids": room_facilities},
+        )
+        assert response.status_code == 200
+
+    params = {"date_from": "2030-01-01", "date_to": "2030-01-05"}
+    for wanted, titles in (
+        ([wifi, ac_], {"Все удобства", "Без балкона"}),
+        ([wifi, balcony], {"Все удобства"}),
+        ([ac_, 100], {"Все удобства"}),
+    ):
+        response = await ac.get("/hotels/2/rooms", params={**params, "facilities_ids": wanted})
+        assert {room["title"] for room in response.json()} == titles
+
+    response = await ac.get("/hotels", params={**params, "facilities_ids": [balcony, 100]})
+    assert [hotel["id"] for hotel in response.json()["data"]] == [2]
@@ -1,7 +1,60 @@
+from datetime import date
+
+import pytest
+
+from src.exception import ObjectNotFoundException
+from src.models import HotelsOrm
 from src.schemas.hotels import HotelAdd
+from src.schemas.rooms import RoomsAdd
+from src.utils.availability import AvailabilityIndex
 
 
 async def test_add_hotel(db):
     hotel_data: list[HotelAdd] = [HotelAdd(title="Hotel 5 stars", location="Сочи")]
     await db.hotels.add(hotel_data)
     await db.commit()
+
+
+async def test_availability_index_invalidation(db):
+    index = AvailabilityIndex(redis_manager=None, enabled=True)
+    room = (await db.rooms.get_all())[0]
+    date_from, date_to = date(2030, 1, 1), date(2030, 1, 5)
+
+    assert room.id in await index.free_rooms_ids(db.session, date_from, date_to)
+    assert room.hotel_id in await index.free_hotels_ids(db.session, date_from, date_to)
+
+    await db.inventory.reserve([(room.id, date_from, date_to)] * room.quantity)
+    # Без инвалидации индекс отвечает из памяти
+    assert room.id in await index.free_rooms_ids(db.session, date_from, date_to, room.hotel_id)
+
+    index.invalidate([room.id])
+    assert room.id not in await index.free_rooms_ids(
+        db.session, date_from, date_to, room.hotel_id
+    )
+
+
+async def test_add_bulk(db):
+    hotels = [HotelAdd(title=f"Hotel {i}", location=f"Сочи, ул. Морская, {i}") for i in range(3)]
+    ids = await db.hotels.add_bulk(hotels, returning=True)
+    added = await db.hotels.get_filtered(HotelsOrm.id.in_(ids))
+    assert [hotel.title for hotel in sorted(added, key=lambda h: ids.index(h.id))] == [
+        hotel.title for hotel in hotels
+    ]
+
+    # Без returning строки идут через COPY
+    rooms = [RoomsAdd(hotel_id=ids[0], title=f"Room {i}", price=100, quantity=1) for i in range(5)]
+    assert await db.rooms.add_bulk(rooms) is None
+    assert len(await db.rooms.get_filtered(hotel_id=ids[0])) == 5
+
+    with pytest.raises(ObjectNotFoundException):
+        await db.rooms.add_bulk([RoomsAdd(hotel_id=10**9, title="Room", price=100, quantity=1)])
+    await db.session.rollback()
+
+
+async def test_stream_filtered(db):
+    hotels = await db.hotels.get_all()
+    batches = [batch async for batch in db.hotels.stream_filtered(batch_size=2)]
+    assert all(len(batch) <= 2 for batch in batches)
+    assert sorted(hotel.id for batch in batches for hotel in batch) == sorted(
+        hotel.id for hotel in hotels
+    )
@@ -0,0 +1,47 @@
+from sqlalchemy import text
+
+from src.database import engine
+
+
+async def test_db_stats(ac):
+    async with engine.connect() as conn:
+        await conn.execute(text("select 1"))
+        response = await ac.get("/metrics/db")
+    await engine.dispose()
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["pool"]["checked_out"] == 1
+    assert stats["pool"]["checkouts"] >= 1
+    assert stats["admission"]["active"] == 0
+    assert stats["replicas"] == {}
+
+
+async def test_prometheus_metrics(ac, db):
+    room = (await db.rooms.get_all())[0]
+    await ac.get(f"/hotels/{room.hotel_id}/rooms/{room.id}")
+
+    response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    metrics = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/hotels/{hotel_id}/rooms/{room_id}",status="200"}'
+    ) in metrics
+    assert 'db_query_duration_seconds_count{operation="select"}' in metrics
+    assert 'http_requests_in_progress{method="GET"} 1.0' in metrics
+
+
+async def test_loop_stats(ac):
+    response = await ac.get("/metrics/loop")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["threshold_ms"] == 100
+    assert isinstance(stats["blocks"], list)
+
+
+async def test_executors_stats(ac):
+    response = await ac.get("/metrics/executors")
+    assert response.status_code == 200
+    assert response.json()["password-hash"]["pending"] == 0
@@ -0,0 +1,85 @@
+from sqlalchemy import NullPool, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config import settings
+from src.database import async_session_null_pool
+from src.utils.db_manager import DBManager
+from src.utils.replicas import ReplicaRouter
+
+
+def replica_engine(port: int | None = None, **kwargs):
+    url = settings.DB_URL
+    if port is not None:
+        url = url.replace(f":{settings.DB_PORT}/", f":{port}/")
+    return create_async_engine(url, connect_args={"timeout": 1}, **kwargs)
+
+
+async def test_replica_fallback_and_stickiness():
+    router = ReplicaRouter([replica_engine(port=1, poolclass=NullPool), replica_engine()])
+    try:
+        for _ in range(2):
+            async with DBManager(
+                async_session_null_pool, replicas=router, sticky_key="user", read_only=True
+            ) as db:
+                assert (await db.session.execute(text("select 1"))).scalar() == 1
+                assert db.on_replica
+        # Недоступная реплика отложена, чтения идут на живую
+        assert router.candidates() == [router.replicas[1]]
+
+        # После коммита чтения пользователя идут на основную базу, других — на реплику
+        async with DBManager(async_session_null_pool, replicas=router, sticky_key="user") as db:
+            assert not db.on_replica
+            await db.commit()
+        async with DBManager(
+            async_session_null_pool, replicas=router, sticky_key="user", read_only=True
+        ) as db:
+            await db.session.execute(text("select 1"))
+            assert not db.on_replica
+        async with DBManager(
+            async_session_null_pool, replicas=router, sticky_key="other", read_only=True
+        ) as db:
+            await db.session.execute(text("select 1"))
+            assert db.on_replica
+    finally:
+        await router.dispose()
+
+
+async def test_replica_least_connections():
+    router = ReplicaRouter([replica_engine(), replica_engine()])
+    try:
+        async with DBManager(async_session_null_pool, replicas=router, read_only=True) as busy:
+            await busy.session.execute(text("select 1"))
+            assert busy.on_replica
+            busy_replica = next(r for r in router.replicas if r.connections == 1)
+            for _ in range(3):
+                assert router.candidates()[0] is not busy_replica
+    finally:
+        await router.dispose()
+
+
+async def test_all_replicas_down():
+    router = ReplicaRouter([replica_engine(port=1, poolclass=NullPool)])
+    try:
+        async with DBManager(async_session_null_pool, replicas=router, read_only=True) as db:
+            assert (await db.session.execute(text("select 1"))).scalar() == 1
+            assert not db.on_replica
+    finally:
+        await router.dispose()
+
+
+async def test_read_only_and_lazy_session():
+    async with DBManager(async_session_null_pool, read_only=True) as db:
+        hotels = db.hotels
+        # Репозитории и сессия создаются при первом обращении, соединение — при первом запросе
+        assert db.hotels is hotels
+        assert not db.session.in_transaction()
+        await db.hotels.get_all()
+        assert (await db.session.execute(text("show transaction_read_only"))).scalar() == "on"
+
+    async with DBManager(async_session_null_pool) as db:
+        assert (await db.session.execute(text("show transaction_read_only"))).scalar() == "off"
+
+    db = DBManager(async_session_null_pool)
+    async with db:
+        pass
+    assert "session" not in db.__dict__
@@ -0,0 +1,27 @@
+from src.utils.sql_stats import collect_sql_stats, install_sql_stats
+
+
+async def test_sql_stats_and_n_plus_one(db):
+    install_sql_stats()
+    room = (await db.rooms.get_all())[0]
+
+    with collect_sql_stats() as stats:
+        await db.rooms.one_or_none1(id=room.id, hotel_id=room.hotel_id)
+    # Номер и его удобства, без выборки всех номеров
+    assert stats.queries == 2
+    assert stats.repeated(2) == []
+
+    with collect_sql_stats() as stats:
+        for _ in range(5):
+            await db.hotels.get_one(id=room.hotel_id)
+    assert stats.queries == 5
+    [(statement, count)] = stats.repeated(5)
+    assert count == 5 and statement.lstrip().lower().startswith("select")
+
+
+async def test_server_timing_header(ac, db):
+    room = (await db.rooms.get_all())[0]
+    response = await ac.get(f"/hotels/{room.hotel_id}/rooms/{room.id}")
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith('db;dur=')
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from src.exception import DatabaseOverloadedException
+from src.utils.admission import AdmissionGate
+
+
+async def test_admission_gate():
+    gate = AdmissionGate(capacity=1, max_waiting=1, timeout=0.05)
+    await gate.acquire()
+
+    # Второй ждет в очереди, третий получает отказ сразу
+    waiter = asyncio.create_task(gate.acquire())
+    await asyncio.sleep(0)
+    assert gate.waiting == 1
+    with pytest.raises(DatabaseOverloadedException):
+        await gate.acquire()
+    assert gate.rejected == 1
+
+    # Место освободилось — ожидающий проходит
+    gate.release()
+    await waiter
+    assert (gate.active, gate.waiting) == (1, 0)
+
+    # Не дождался за timeout
+    with pytest.raises(DatabaseOverloadedException):
+        await gate.acquire()
+    assert gate.timed_out == 1
+
+    gate.release()
+    async with gate.slot():
+        assert gate.active == 1
+    assert gate.stats().active == 0
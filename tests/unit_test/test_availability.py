@@ -0,0 +1,20 @@
+from datetime import date
+
+from src.utils.availability import RoomCalendar
+
+
+def test_room_calendar_is_free():
+    room = RoomCalendar(
+        hotel_id=1,
+        quantity=2,
+        days=[(date(2024, 8, 2), 1), (date(2024, 8, 3), 2), (date(2024, 8, 4), 1)],
+    )
+
+    def is_free(date_from: date, date_to: date) -> bool:
+        return room.is_free(date_from.toordinal(), date_to.toordinal())
+
+    assert is_free(date(2024, 7, 1), date(2024, 8, 3))
+    assert not is_free(date(2024, 8, 1), date(2024, 8, 10))
+    assert not is_free(date(2024, 8, 3), date(2024, 8, 4))
+    assert is_free(date(2024, 8, 4), date(2024, 8, 10))
+    assert is_free(date(2025, 1, 1), date(2025, 1, 2))
@@ -0,0 +1,32 @@
+import pytest
+
+from src.schemas.cities import City
+from src.utils.cities import CitiesIndex, parse_city
+
+
+@pytest.mark.parametrize(
+    "location, city",
+    [
+        ("Сочи,ул.Красная, 5", "Сочи"),
+        ("Республика Алтай, Майминский район, село Урлу-Аспак, Лесхозная улица, 20", "Урлу-Аспак"),
+        ("посёлок городского типа Сириус, Фигурная улица, 45", "Сириус"),
+        ("г. Москва, Тверская, 1", "Москва"),
+        ("ул. Ленина, 5", None),
+        # Не помещается в cities.name — без города
+        ("г. " + "А" * 150 + ", ул. Ленина, 5", None),
+    ],
+)
+def test_parse_city(location, city):
+    assert parse_city(location) == city
+
+
+def test_cities_index_suggest():
+    index = CitiesIndex()
+    index.add([City(id=2, name="Сочи"), City(id=1, name="Москва"), City(id=3, name="Сортавала")])
+    index.add([City(id=3, name="Сортавала")])
+
+    assert [city.name for city in index.suggest("со")] == ["Сортавала", "Сочи"]
+    assert [city.name for city in index.suggest("СОЧ")] == ["Сочи"]
+    assert index.suggest("со", limit=1) == [City(id=3, name="Сортавала")]
+    assert index.suggest("") == []
+    assert index.suggest("Казань") == []
@@ -0,0 +1,44 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+from src.exception import ExecutorOverloadedException
+from src.utils.executor import BoundedExecutor
+
+
+async def test_bounded_executor():
+    executor = BoundedExecutor("test", workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        # Один вызов выполняется, второй ждет в очереди, третий получает отказ сразу
+        running = asyncio.create_task(executor.run(release.wait))
+        queued = asyncio.create_task(executor.run(lambda: "done"))
+        await asyncio.sleep(0.01)
+        assert executor.pending == 2
+        with pytest.raises(ExecutorOverloadedException):
+            await executor.run(lambda: None)
+        assert executor.rejected == 1
+
+        release.set()
+        assert await running is True
+        assert await queued == "done"
+        assert executor.stats().pending == 0
+        assert executor.completed == 2
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="приоритет потоков задается только в Linux")
+async def test_bounded_executor_nice():
+    executor = BoundedExecutor("test-nice", workers=1, max_queue=0, nice=5)
+    try:
+        priority = await executor.run(
+            lambda: os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+        )
+        assert priority == min(os.getpriority(os.PRIO_PROCESS, 0) + 5, 19)
+    finally:
+        executor.shutdown()
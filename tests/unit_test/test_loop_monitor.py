@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from src.utils.loop_monitor import LoopMonitor
+
+
+def hash_password_blocking():
+    time.sleep(0.3)
+
+
+async def test_loop_monitor_captures_blocking_stack():
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert monitor.blocks_total == 0
+
+        hash_password_blocking()
+        await asyncio.sleep(0.05)
+
+        assert monitor.blocks_total == 1
+        block = monitor.blocks[-1]
+        assert block.lag_ms >= 250
+        # Стек снят, пока цикл был занят, и указывает на виновника
+        assert "hash_password_blocking" in block.stack[-1]
+        assert block.task is not None
+        assert monitor.stats().max_lag_ms == block.lag_ms
+    finally:
+        monitor.stop()
+    await asyncio.sleep(0)
+    assert not monitor.running
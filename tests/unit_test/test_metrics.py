@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+from celery import signals
+from prometheus_client import REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.tasks.celery_app import celery_app_instance  # noqa: F401 подключает сигналы
+from src.utils import sql_stats
+from src.utils.metrics import install_db_metrics, observe_db_query, sql_operation
+from src.utils.sql_stats import install_sql_stats
+
+
+def test_sql_operation():
+    assert sql_operation("SELECT 1") == "select"
+    assert sql_operation("\n  with x as (select 1) select * from x") == "with"
+    assert sql_operation("SHOW transaction_read_only") == "other"
+    assert sql_operation("") == "other"
+
+
+def test_celery_task_duration():
+    class Task:
+        name = "metrics_test_task"
+
+    labels = {"task": "metrics_test_task", "state": "SUCCESS"}
+    before = REGISTRY.get_sample_value("celery_task_duration_seconds_count", labels) or 0
+    signals.task_prerun.send(sender=Task, task_id="1", task=Task)
+    signals.task_postrun.send(sender=Task, task_id="1", task=Task, state="SUCCESS")
+    assert REGISTRY.get_sample_value("celery_task_duration_seconds_count", labels) == before + 1
+
+
+def test_db_metrics_share_sql_stats_hooks():
+    install_sql_stats()
+    install_db_metrics()
+    install_db_metrics()
+    # Учет по запросам и гистограмма Prometheus — одна пара обработчиков на Engine
+    assert event.contains(Engine, "before_cursor_execute", sql_stats._before_cursor_execute)
+    assert sql_stats._query_observers.count(observe_db_query) == 1
+
+
+def test_celery_worker_records_db_metrics():
+    # Воркер Celery не создает приложение и PrometheusMiddleware: проверяем в чистом процессе
+    code = (
+        "from src.tasks.celery_app import celery_app_instance\n"
+        "from src.utils.metrics import observe_db_query\n"
+        "from src.utils.sql_stats import _query_observers\n"
+        "assert observe_db_query in _query_observers\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,33 @@
+from passlib.hash import bcrypt
+
+from src.utils.password_hashing import MAX_ROUNDS, MIN_ROUNDS, calibrate_rounds, crypt_context
+
+
+def test_calibrate_rounds_bounds():
+    # Бюджет меньше минимальной стоимости — минимум, огромный бюджет — не выше максимума
+    assert calibrate_rounds("argon2", target_ms=0.01, argon2_memory_kib=1024) == MIN_ROUNDS["argon2"]
+    assert calibrate_rounds("argon2", target_ms=10**9, argon2_memory_kib=1024) == MAX_ROUNDS["argon2"]
+    assert MIN_ROUNDS["bcrypt"] <= calibrate_rounds("bcrypt", target_ms=200) <= MAX_ROUNDS["bcrypt"]
+
+
+def test_crypt_context_needs_update():
+    context = crypt_context("argon2", rounds=3, argon2_memory_kib=1024)
+    hashed = context.hash("1234")
+    assert hashed.startswith("$argon2id$")
+    assert not context.needs_update(hashed)
+
+    # Другая схема, память или стоимость дешевле — пересчет, дороже — нет: подобранная
+    # стоимость хеш не ослабляет
+    assert context.needs_update(bcrypt.using(rounds=4).hash("1234"))
+    assert context.needs_update(crypt_context("argon2", 2, 1024).hash("1234"))
+    assert not context.needs_update(crypt_context("argon2", 8, 1024).hash("1234"))
+    assert context.needs_update(crypt_context("argon2", 3, 2048).hash("1234"))
+
+    # Явно заданная стоимость пересчитывает и более дорогие хеши
+    pinned = crypt_context("bcrypt", rounds=10, pinned=True)
+    assert pinned.needs_update(bcrypt.using(rounds=12).hash("1234"))
+    assert not pinned.needs_update(bcrypt.using(rounds=10).hash("1234"))
+    assert not crypt_context("bcrypt", rounds=10).needs_update(bcrypt.using(rounds=12).hash("1234"))
+
+    # Без заданной стоимости хеши своей схемы не устаревают
+    assert not crypt_context("bcrypt").needs_update(bcrypt.using(rounds=4).hash("1234"))